@@ -1,11 +1,24 @@
 import os
-import yaml
+import gzip
+import json
+import uuid
+import zlib
 import logging
-import requests
-from flask import Flask, render_template, jsonify, request, Response
+import threading
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
 from jira_gitlab_service import JiraGitLabService
+from jira_jobs import AnalysisJobManager
 from database_service import DatabaseService
+from inventory_store import InventoryStore
+from health_service import HealthCheckService
+from health_monitor import HealthMonitor
+from search_index import SearchIndex, ENTRY_TYPES
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -23,22 +36,83 @@ app.jinja_env.block_end_string = '%]'
 # Enable CORS for API endpoints
 CORS(app)
 
+# JSON responses smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = 1024
+
+@app.after_request
+def compress_response(response):
+    """Compress large JSON responses when the client accepts Brotli or gzip"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return response
+    
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        response.set_data(brotli.compress(body, quality=4))
+        response.headers['Content-Encoding'] = 'br'
+    elif accepted['gzip']:
+        response.set_data(gzip.compress(body, compresslevel=5))
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    return response
+
 # Initialize services
 jira_gitlab_service = JiraGitLabService()
 database_service = DatabaseService()
+inventory_store = InventoryStore('data.yaml')
+health_check_service = HealthCheckService()
+
+# Background health monitor keeps a cached status for every microservice
+health_monitor = HealthMonitor(
+    inventory_store,
+    health_check_service,
+    interval=float(os.environ.get('HEALTH_MONITOR_INTERVAL', '60'))
+)
+# The app runs as a single process (see gunicorn.conf.py), so one monitor
+# serves every request. Under the debug reloader only the child that serves
+# requests starts it, not the watching parent.
+_reloader_parent = os.environ.get('FLASK_DEBUG') == '1' and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+if os.environ.get('HEALTH_MONITOR_ENABLED', '1') == '1' and not _reloader_parent:
+    health_monitor.start()
+
+# Background Jira analyses; a resubmitted ticket joins its running job
+jira_analysis_jobs = AnalysisJobManager(
+    jira_gitlab_service.analyze_jira_ticket,
+    max_workers=int(os.environ.get('JIRA_ANALYSIS_WORKERS', '2')),
+    retention=float(os.environ.get('JIRA_JOB_RETENTION', '900'))
+)
+
+# Search index is rebuilt lazily whenever the inventory version changes
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 200
+_search_index = None
+_search_index_lock = threading.Lock()
 
 def load_data():
-    """Load data from YAML file"""
-    try:
-        with open('data.yaml', 'r') as file:
-            data = yaml.safe_load(file)
-            return data
-    except FileNotFoundError:
-        logging.error("data.yaml file not found")
-        return {"products": [], "jenkins_jobs": []}
-    except yaml.YAMLError as e:
-        logging.error(f"Error parsing YAML: {e}")
-        return {"products": [], "jenkins_jobs": []}
+    """Load data from YAML file (cached, reloaded only when the file changes)"""
+    return inventory_store.get()
+
+def get_search_index():
+    """Return the search index for the current inventory version"""
+    global _search_index
+    data, version = inventory_store.snapshot()
+    
+    index = _search_index
+    if index is not None and index.version == version:
+        return index
+    
+    with _search_index_lock:
+        if _search_index is None or _search_index.version != version:
+            _search_index = SearchIndex(data, version)
+        return _search_index
 
 @app.route('/')
 def index():
@@ -67,6 +141,11 @@ def get_data():
     data = load_data()
     return jsonify(data)
 
+@app.route('/api/inventory/stats')
+def inventory_stats():
+    """API endpoint exposing inventory cache counters"""
+    return jsonify(inventory_store.get_stats())
+
 @app.route('/api/search')
 def search():
     """API endpoint for searching across the hierarchy"""
@@ -74,87 +153,58 @@ def search():
     if not query:
         return jsonify({"results": []})
     
-    data = load_data()
-    results = []
+    try:
+        limit = int(request.args.get('limit', SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
     
-    # Search through the hierarchy
-    for product in data.get('products', []):
-        product_name = product.get('name', '')
-        
-        # Search in product name
-        if query in product_name.lower():
-            results.append({
-                'type': 'product',
-                'name': product_name,
-                'path': [product_name]
-            })
-        
-        # Search in base products
-        for base in product.get('bases', []):
-            base_name = base.get('name', '')
-            
-            if query in base_name.lower():
-                results.append({
-                    'type': 'base',
-                    'name': base_name,
-                    'path': [product_name, base_name]
-                })
-            
-            # Search in versions
-            for version in base.get('versions', []):
-                version_name = version.get('name', '')
-                
-                if query in version_name.lower():
-                    results.append({
-                        'type': 'version',
-                        'name': version_name,
-                        'path': [product_name, base_name, version_name]
-                    })
-                
-                # Search in environments
-                for env in version.get('environments', []):
-                    env_name = env.get('name', '')
-                    
-                    if query in env_name.lower():
-                        results.append({
-                            'type': 'environment',
-                            'name': env_name,
-                            'path': [product_name, base_name, version_name, env_name]
-                        })
-                    
-                    # Search in microservices
-                    for service in env.get('microservices', []):
-                        service_name = service.get('name', '')
-                        if query in service_name.lower():
-                            results.append({
-                                'type': 'microservice',
-                                'name': service_name,
-                                'path': [product_name, base_name, version_name, env_name, service_name]
-                            })
+    # Optional comma-separated type filter, e.g. ?type=environment,microservice
+    types = [t.strip() for t in request.args.get('type', '').split(',') if t.strip()]
+    invalid_types = [t for t in types if t not in ENTRY_TYPES]
+    if invalid_types:
+        return jsonify({
+            "error": f"Unknown type(s): {', '.join(invalid_types)}. Valid types: {', '.join(ENTRY_TYPES)}"
+        }), 400
     
-    return jsonify({"results": results[:20]})  # Limit results
+    results = get_search_index().search(query, limit=limit, types=types)
+    return jsonify({"results": results})
+
+def _read_analysis_request(data):
+    """Return the ticket ID of an analysis request, raising ValueError if it cannot run"""
+    ticket_id = data.get('ticket_id')
+    if not ticket_id:
+        raise ValueError("No ticket ID provided")
+    
+    # Check if API credentials are configured
+    config_status = jira_gitlab_service.check_configuration()
+    if not config_status["jira_configured"]:
+        raise ValueError("Jira API credentials not configured. Please set JIRA_URL, JIRA_USERNAME, and JIRA_API_TOKEN environment variables.")
+    
+    if not config_status["gitlab_configured"]:
+        raise ValueError("GitLab API credentials not configured. Please set GITLAB_URL and GITLAB_TOKEN environment variables.")
+    
+    return ticket_id
 
 @app.route('/api/jira/analyze', methods=['POST'])
 def analyze_jira_ticket():
     """API endpoint for analyzing Jira tickets"""
     try:
         data = request.get_json()
-        ticket_id = data.get('ticket_id')
+        ticket_id = _read_analysis_request(data)
         
-        if not ticket_id:
-            return jsonify({"error": "No ticket ID provided"}), 400
-        
-        # Check if API credentials are configured
-        config_status = jira_gitlab_service.check_configuration()
-        if not config_status["jira_configured"]:
-            return jsonify({
-                "error": "Jira API credentials not configured. Please set JIRA_URL, JIRA_USERNAME, and JIRA_API_TOKEN environment variables."
-            }), 400
-        
-        if not config_status["gitlab_configured"]:
-            return jsonify({
-                "error": "GitLab API credentials not configured. Please set GITLAB_URL and GITLAB_TOKEN environment variables."
-            }), 400
+        # Background mode: return a job to poll instead of waiting for the result
+        if data.get('async'):
+            job, coalesced = jira_analysis_jobs.submit(ticket_id)
+            response = jsonify({
+                "job_id": job["job_id"],
+                "ticket_id": job["ticket_id"],
+                "status": job["status"],
+                "coalesced": coalesced,
+                "status_url": f"/api/jira/analyze/jobs/{job['job_id']}"
+            })
+            response.headers['Location'] = f"/api/jira/analyze/jobs/{job['job_id']}"
+            return response, 202
         
         # Analyze the ticket
         result = jira_gitlab_service.analyze_jira_ticket(ticket_id)
@@ -164,10 +214,52 @@ def analyze_jira_ticket():
         
         return jsonify(result)
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logging.error(f"Error in analyze_jira_ticket: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/api/jira/analyze/stream', methods=['POST'])
+def stream_jira_analysis():
+    """API endpoint streaming the ticket hierarchy as NDJSON while it is loaded and enriched"""
+    try:
+        data = request.get_json(silent=True) or {}
+        ticket_id = _read_analysis_request(data)
+        
+        # Runs as (or joins) a background job, so reloads do not start
+        # duplicate analyses and the worker pool bounds concurrency
+        def generate():
+            for event in jira_analysis_jobs.stream(ticket_id):
+                yield json.dumps(event) + '\n'
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+        
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error streaming Jira analysis: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route('/api/jira/analyze/jobs/<job_id>')
+def jira_analysis_job(job_id):
+    """API endpoint reporting the progress and, once finished, the result of an analysis job"""
+    try:
+        job = jira_analysis_jobs.get(job_id)
+        if job is None:
+            return jsonify({"error": f"Unknown or expired job: {job_id}"}), 404
+        return jsonify(job)
+    except Exception as e:
+        logging.error(f"Error retrieving Jira analysis job {job_id}: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route('/api/jira/config')
 def jira_config_status():
     """API endpoint to check Jira/GitLab configuration status"""
@@ -178,6 +270,15 @@ def jira_config_status():
         logging.error(f"Error checking configuration: {e}")
         return jsonify({"error": "Failed to check configuration"}), 500
 
+@app.route('/api/jira/cache/stats')
+def jira_cache_stats():
+    """API endpoint exposing Jira analysis cache statistics"""
+    try:
+        return jsonify(jira_gitlab_service.get_cache_stats())
+    except Exception as e:
+        logging.error(f"Error retrieving Jira cache statistics: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route('/api/database/test', methods=['POST'])
 def test_database_connection():
     """API endpoint to test database connectivity"""
@@ -200,6 +301,15 @@ def test_database_connection():
         logging.error(f"Error testing database connection: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/api/database/pool-stats')
+def database_pool_stats():
+    """API endpoint exposing database connection pool statistics"""
+    try:
+        return jsonify({"pools": database_service.get_pool_stats()})
+    except Exception as e:
+        logging.error(f"Error retrieving pool statistics: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route('/api/database/xml-configs', methods=['POST'])
 def get_xml_configurations():
     """API endpoint to get XML configuration names"""
@@ -222,6 +332,94 @@ def get_xml_configurations():
         logging.error(f"Error retrieving XML configurations: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+# Overall time budget for listing configurations across many databases
+XML_BATCH_DEFAULT_DEADLINE = 60
+XML_BATCH_MAX_DEADLINE = 300
+
+def _parse_batch_listing(data):
+    """
+    Resolve the databases and limits of a batch configuration listing
+    
+    Returns:
+        Tuple of (targets, per-database timeout, deadline); raises ValueError
+    """
+    path = data.get('path') or []
+    if not isinstance(path, list) or len(path) > 4:
+        raise ValueError("path must be a list of up to [product, base, version, environment]")
+    database_type = data.get('database_type')
+    
+    targets = []
+    for names, env in inventory_store.iter_environments(path):
+        for db in env.get('databases', []):
+            if database_type and db.get('type') != database_type:
+                continue
+            targets.append({
+                "environment": ' / '.join(names),
+                "path": names,
+                "database": db.get('name'),
+                "database_type": db.get('type'),
+                "database_config": db
+            })
+    
+    try:
+        timeout = int(data['timeout']) if data.get('timeout') is not None else None
+        deadline = float(data.get('deadline', XML_BATCH_DEFAULT_DEADLINE))
+    except (TypeError, ValueError):
+        raise ValueError("timeout and deadline must be numbers")
+    
+    return targets, timeout, max(1, min(deadline, XML_BATCH_MAX_DEADLINE))
+
+@app.route('/api/database/xml-configs/batch', methods=['POST'])
+def get_xml_configurations_batch():
+    """API endpoint to list XML configurations from every database under a hierarchy path"""
+    try:
+        data = request.get_json(silent=True) or {}
+        targets, timeout, deadline = _parse_batch_listing(data)
+        
+        results = list(database_service.iter_xml_configurations(targets, timeout=timeout, deadline=deadline))
+        
+        return jsonify({
+            "success": True,
+            "results": results,
+            "count": len(results),
+            "failed": sum(1 for result in results if not result["success"])
+        })
+        
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error retrieving XML configurations batch: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route('/api/database/xml-configs/batch/stream', methods=['POST'])
+def stream_xml_configurations_batch():
+    """API endpoint streaming each database's XML configuration list as NDJSON as soon as it completes"""
+    try:
+        data = request.get_json(silent=True) or {}
+        targets, timeout, deadline = _parse_batch_listing(data)
+        
+        def generate():
+            count = 0
+            for result in database_service.iter_xml_configurations(targets, timeout=timeout, deadline=deadline):
+                count += 1
+                yield json.dumps({"type": "result", **result}) + '\n'
+            yield json.dumps({"type": "done", "count": count}) + '\n'
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+        
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error streaming XML configurations batch: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route('/api/database/xml-content', methods=['POST'])
 def get_xml_content():
     """API endpoint to get specific XML content"""
@@ -249,11 +447,186 @@ def get_xml_content():
         logging.error(f"Error retrieving XML content: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+# Matches returned by an XML path query
+XML_QUERY_DEFAULT_LIMIT = 100
+XML_QUERY_MAX_LIMIT = 1000
+
+@app.route('/api/database/xml-query', methods=['POST'])
+def query_xml_content():
+    """API endpoint to evaluate an element path against XML configurations"""
+    try:
+        data = request.get_json()
+        db_config = data.get('database_config')
+        path = (data.get('path') or '').strip()
+        
+        if not path:
+            return jsonify({"error": "No path provided"}), 400
+        
+        if not db_config:
+            return jsonify({"error": "No database configuration provided"}), 400
+        
+        try:
+            limit = int(data.get('limit', XML_QUERY_DEFAULT_LIMIT))
+        except (TypeError, ValueError):
+            return jsonify({"error": "limit must be an integer"}), 400
+        limit = max(1, min(limit, XML_QUERY_MAX_LIMIT))
+        
+        namespaces = data.get('namespaces')
+        if namespaces is not None and not isinstance(namespaces, dict):
+            return jsonify({"error": "namespaces must be an object"}), 400
+        
+        try:
+            deadline = float(data.get('deadline', XML_BATCH_DEFAULT_DEADLINE))
+        except (TypeError, ValueError):
+            return jsonify({"error": "deadline must be a number"}), 400
+        deadline = max(1, min(deadline, XML_BATCH_MAX_DEADLINE))
+        
+        success, result, error_msg = database_service.query_xml_configurations(
+            db_config,
+            path,
+            xml_name=data.get('xml_name'),
+            namespaces=namespaces,
+            limit=limit,
+            include_xml=bool(data.get('include_xml', True)),
+            deadline=deadline
+        )
+        
+        return jsonify({
+            "success": success,
+            "path": path,
+            **result,
+            "error": error_msg
+        })
+        
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error querying XML content: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+def _find_environment_database(path, database_type='primary'):
+    """
+    Look up the database of one environment declared in data.yaml
+    
+    Args:
+        path: [product, base, version, environment] names
+        database_type: Database type to pick within the environment
+        
+    Returns:
+        Tuple of (label, database configuration); raises ValueError if missing
+    """
+    if not isinstance(path, list) or len(path) != 4:
+        raise ValueError("Environments must be given as [product, base, version, environment]")
+    
+    for names, env in inventory_store.iter_environments(path):
+        label = ' / '.join(names)
+        for db in env.get('databases', []):
+            if db.get('type') == database_type:
+                return label, db
+        raise ValueError(f"Environment '{label}' has no {database_type} database")
+    raise ValueError(f"Environment '{' / '.join(map(str, path))}' not found")
+
+# Changes reported per environment by an XML diff
+XML_DIFF_DEFAULT_MAX_CHANGES = 500
+XML_DIFF_MAX_ENVIRONMENTS = 10
+
+@app.route('/api/database/xml-diff', methods=['POST'])
+def diff_xml_content():
+    """API endpoint to compare an XML configuration across environments"""
+    try:
+        data = request.get_json()
+        xml_name = data.get('xml_name')
+        environments = data.get('environments') or []
+        
+        if not xml_name:
+            return jsonify({"error": "No XML name provided"}), 400
+        
+        if not 2 <= len(environments) <= XML_DIFF_MAX_ENVIRONMENTS:
+            return jsonify({"error": f"Between 2 and {XML_DIFF_MAX_ENVIRONMENTS} environments are required"}), 400
+        
+        database_type = data.get('database_type', 'primary')
+        targets = []
+        for path in environments:
+            label, db_config = _find_environment_database(path, database_type)
+            targets.append({"label": label, "database_config": db_config})
+        
+        try:
+            baseline = int(data.get('baseline', 0))
+            max_changes = int(data.get('max_changes', XML_DIFF_DEFAULT_MAX_CHANGES))
+        except (TypeError, ValueError):
+            return jsonify({"error": "baseline and max_changes must be integers"}), 400
+        
+        if not 0 <= baseline < len(targets):
+            return jsonify({"error": "baseline must index one of the environments"}), 400
+        
+        success, result, error_msg = database_service.diff_xml_configuration(
+            targets,
+            xml_name,
+            baseline=baseline,
+            max_changes=max(1, max_changes)
+        )
+        
+        return jsonify({
+            "success": success,
+            **result,
+            "error": error_msg
+        })
+        
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error diffing XML content: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route('/api/database/xml-cache/invalidate', methods=['POST'])
+def invalidate_xml_cache():
+    """API endpoint to drop cached XML configuration lists and contents"""
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        removed = database_service.invalidate_xml_cache(
+            db_config=data.get('database_config'),
+            xml_name=data.get('xml_name'),
+            table_name=data.get('table_name')
+        )
+        
+        return jsonify({
+            "success": True,
+            "removed": removed
+        })
+        
+    except Exception as e:
+        logging.error(f"Error invalidating XML cache: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route('/api/database/xml-cache/stats')
+def xml_cache_stats():
+    """API endpoint exposing XML cache statistics"""
+    try:
+        return jsonify(database_service.get_xml_cache_stats())
+    except Exception as e:
+        logging.error(f"Error retrieving XML cache statistics: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+# Characters read from the database per chunk of a streamed XML download
+XML_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+def _read_download_request():
+    """Read download parameters from a JSON body or a submitted HTML form"""
+    data = request.get_json(silent=True)
+    if data is not None:
+        return data
+    
+    data = request.form.to_dict()
+    if data.get('database_config'):
+        data['database_config'] = json.loads(data['database_config'])
+    return data
+
 @app.route('/api/database/xml-download', methods=['POST'])
 def download_xml_content():
     """API endpoint to download XML content as file"""
     try:
-        data = request.get_json()
+        data = _read_download_request()
         db_config = data.get('database_config')
         xml_name = data.get('xml_name')
         
@@ -262,21 +635,55 @@ def download_xml_content():
         
         if not db_config:
             return jsonify({"error": "No database configuration provided"}), 400
+        
+        # One snapshot supplies both the ETag and the body, so the XML is
+        # read and hashed once per request
+        info, chunks = database_service.open_xml_content(
+            db_config, xml_name, chunk_size=XML_DOWNLOAD_CHUNK_SIZE
+        )
+        if info is None:
+            return jsonify({"error": f"XML configuration '{xml_name}' not found"}), 500
+        
+        # Gzip is applied on the fly, so the compressed body gets its own ETag
+        use_gzip = request.accept_encodings['gzip'] and str(data.get('compress', 'true')).lower() != 'false'
+        etag = f"{info['etag']}-gzip" if use_gzip else info['etag']
+        
+        headers = {
+            'Content-Disposition': f'attachment; filename="{xml_name}"',
+            'Cache-Control': 'private, no-cache',
+            'Vary': 'Accept-Encoding'
+        }
+        
+        if request.if_none_match.contains(etag):
+            # Drops the snapshot and returns its connection to the pool
+            chunks.close()
+            response = Response(status=304, headers=headers)
+            response.set_etag(etag)
+            return response
+        
+        def generate():
+            if not use_gzip:
+                for chunk in chunks:
+                    yield chunk.encode('utf-8')
+                return
             
-        success, xml_content, error_msg = database_service.get_xml_content(db_config, xml_name)
+            compressor = zlib.compressobj(5, zlib.DEFLATED, 31)
+            for chunk in chunks:
+                compressed = compressor.compress(chunk.encode('utf-8'))
+                if compressed:
+                    yield compressed
+            yield compressor.flush()
         
-        if not success:
-            return jsonify({"error": error_msg}), 500
+        if use_gzip:
+            headers['Content-Encoding'] = 'gzip'
         
-        # Create file response
         response = Response(
-            xml_content,
+            stream_with_context(generate()),
             mimetype='application/xml',
-            headers={
-                'Content-Disposition': f'attachment; filename="{xml_name}"',
-                'Content-Type': 'application/xml; charset=utf-8'
-            }
+            headers=headers
         )
+        response.set_etag(etag)
+        response.headers['Content-Type'] = 'application/xml; charset=utf-8'
         
         return response
         
@@ -310,6 +717,73 @@ def search_xml_configurations():
         logging.error(f"Error searching XML configurations: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/api/database/xml-search/reindex', methods=['POST'])
+def reindex_xml_configurations():
+    """API endpoint to bring the XML search index up to date with a database"""
+    try:
+        data = request.get_json()
+        db_config = data.get('database_config')
+        
+        if not db_config:
+            return jsonify({"error": "No database configuration provided"}), 400
+        
+        success, counts, error_msg = database_service.sync_xml_search_index(db_config)
+        
+        return jsonify({
+            "success": success,
+            "counts": counts,
+            "error": error_msg
+        })
+        
+    except Exception as e:
+        logging.error(f"Error reindexing XML configurations: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route('/api/database/xml-search/stats')
+def xml_search_stats():
+    """API endpoint exposing XML search index statistics"""
+    try:
+        return jsonify(database_service.get_xml_search_stats())
+    except Exception as e:
+        logging.error(f"Error retrieving XML search statistics: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+SQL_DEFAULT_PAGE_SIZE = 500
+SQL_MAX_PAGE_SIZE = 10000
+
+def _parse_row_limit(value):
+    """Parse an optional positive row count from a request, capped at SQL_MAX_PAGE_SIZE"""
+    if value is None or value == '':
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Row limits must be integers")
+    if value <= 0:
+        raise ValueError("Row limits must be positive")
+    return min(value, SQL_MAX_PAGE_SIZE)
+
+def _parse_result_format(data):
+    """Parse the optional result format options from a SQL query request"""
+    result_format = data.get('format') or 'records'
+    if result_format not in DatabaseService.RESULT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(DatabaseService.RESULT_FORMATS)}")
+    return result_format, bool(data.get('typed', False))
+
+def _parse_query_control(data):
+    """Parse the optional query_id and timeout (seconds) from a SQL query request"""
+    query_id = data.get('query_id') or uuid.uuid4().hex
+    if not isinstance(query_id, str) or len(query_id) > 64:
+        raise ValueError("query_id must be a string of at most 64 characters")
+    
+    timeout = data.get('timeout')
+    if timeout is not None:
+        try:
+            timeout = int(timeout)
+        except (TypeError, ValueError):
+            raise ValueError("timeout must be an integer number of seconds")
+    return query_id, timeout
 
 @app.route('/api/database/execute-sql', methods=['POST'])
 def execute_sql_query():
@@ -331,12 +805,96 @@ def execute_sql_query():
                 'error': 'Database configuration is required'
             })
         
-        db_service = DatabaseService()
-        success, data_results, columns, row_count, error = db_service.execute_sql_query(database_config, sql_query)
+        # Optional pagination: page_size keeps a server-side cursor open for
+        # /api/database/execute-sql/page; max_rows caps the result instead
+        page_size = _parse_row_limit(data.get('page_size'))
+        max_rows = _parse_row_limit(data.get('max_rows'))
+        
+        # Optional compact encoding: format='columnar' sends column names once
+        # and rows as value lists; typed=true keeps numbers/dates native
+        result_format, typed = _parse_result_format(data)
+        
+        # query_id may be chosen by the client so the query can be cancelled
+        # via /api/database/execute-sql/cancel before this request returns
+        query_id, timeout = _parse_query_control(data)
+        
+        if page_size or max_rows:
+            success, page, error = database_service.open_result_cursor(
+                database_config,
+                sql_query,
+                page_size=page_size or max_rows,
+                keep_open=bool(page_size),
+                result_format=result_format,
+                typed=typed,
+                query_id=query_id,
+                timeout=timeout
+            )
+            if not success:
+                return jsonify({
+                    'success': False,
+                    'query_id': query_id,
+                    'error': error
+                })
+            
+            return jsonify({
+                'success': True,
+                'query_id': query_id,
+                'format': page['format'],
+                'data': page['data'],
+                'columns': page['columns'],
+                'column_types': page['column_types'],
+                'row_count': page['row_count'],
+                'offset': page['offset'],
+                'has_more': page['has_more'] if page_size else False,
+                'truncated': page['has_more'] if not page_size else False,
+                'cursor_id': page['cursor_id']
+            })
+        
+        if result_format != 'records' or typed:
+            # Assemble the full result from the batched reader
+            response = {
+                'success': True,
+                'query_id': query_id,
+                'format': result_format,
+                'data': [],
+                'columns': [],
+                'column_types': [],
+                'row_count': 0
+            }
+            for event in database_service.stream_sql_query(
+                database_config,
+                sql_query,
+                result_format=result_format,
+                typed=typed,
+                query_id=query_id,
+                timeout=timeout
+            ):
+                if event['type'] == 'columns':
+                    response['columns'] = event['columns']
+                    response['column_types'] = event['column_types']
+                elif event['type'] == 'rows':
+                    response['data'].extend(event['rows'])
+                elif event['type'] == 'done':
+                    response['row_count'] = event['row_count']
+                elif event['type'] == 'error':
+                    return jsonify({
+                        'success': False,
+                        'query_id': query_id,
+                        'error': event['error']
+                    })
+            return jsonify(response)
+        
+        success, data_results, columns, row_count, error = database_service.execute_sql_query(
+            database_config,
+            sql_query,
+            query_id=query_id,
+            timeout=timeout
+        )
         
         if success:
             return jsonify({
                 'success': True,
+                'query_id': query_id,
                 'data': data_results,
                 'columns': columns,
                 'row_count': row_count
@@ -344,9 +902,15 @@ def execute_sql_query():
         else:
             return jsonify({
                 'success': False,
+                'query_id': query_id,
                 'error': error
             })
     
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         logging.error(f"Error in execute_sql_query: {str(e)}")
         return jsonify({
@@ -354,6 +918,178 @@ def execute_sql_query():
             'error': 'Internal server error'
         })
 
+@app.route('/api/database/execute-sql/page', methods=['POST'])
+def fetch_sql_query_page():
+    """API endpoint to fetch the next page of a paginated SQL query"""
+    try:
+        data = request.json or {}
+        cursor_id = data.get('cursor_id')
+        
+        if not cursor_id:
+            return jsonify({
+                'success': False,
+                'error': 'cursor_id is required'
+            }), 400
+        
+        page_size = _parse_row_limit(data.get('page_size')) or SQL_DEFAULT_PAGE_SIZE
+        offset = data.get('offset')
+        if offset is not None:
+            try:
+                offset = max(0, int(offset))
+            except (TypeError, ValueError):
+                raise ValueError("offset must be an integer")
+        
+        success, page, error = database_service.fetch_result_page(cursor_id, page_size=page_size, offset=offset)
+        if not success:
+            return jsonify({
+                'success': False,
+                'error': error
+            })
+        
+        return jsonify({
+            'success': True,
+            'format': page['format'],
+            'data': page['data'],
+            'columns': page['columns'],
+            'column_types': page['column_types'],
+            'row_count': page['row_count'],
+            'offset': page['offset'],
+            'has_more': page['has_more'],
+            'cursor_id': page['cursor_id']
+        })
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logging.error(f"Error in fetch_sql_query_page: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        })
+
+@app.route('/api/database/execute-sql/close', methods=['POST'])
+def close_sql_query_cursor():
+    """API endpoint to release a paginated SQL query before it is exhausted"""
+    try:
+        data = request.json or {}
+        cursor_id = data.get('cursor_id')
+        
+        if not cursor_id:
+            return jsonify({
+                'success': False,
+                'error': 'cursor_id is required'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'closed': database_service.close_result_cursor(cursor_id)
+        })
+    
+    except Exception as e:
+        logging.error(f"Error in close_sql_query_cursor: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        })
+
+@app.route('/api/database/execute-sql/cancel', methods=['POST'])
+def cancel_sql_query():
+    """API endpoint to cancel a running SQL query by its query ID"""
+    try:
+        data = request.json or {}
+        query_id = data.get('query_id')
+        
+        if not query_id:
+            return jsonify({
+                'success': False,
+                'error': 'query_id is required'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'cancelled': database_service.cancel_query(query_id)
+        })
+    
+    except Exception as e:
+        logging.error(f"Error in cancel_sql_query: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        })
+
+@app.route('/api/database/queries')
+def list_active_sql_queries():
+    """API endpoint listing SQL queries that are currently executing"""
+    try:
+        return jsonify({"queries": database_service.get_active_queries()})
+    except Exception as e:
+        logging.error(f"Error listing active queries: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route('/api/database/execute-sql/stream', methods=['POST'])
+def stream_sql_query():
+    """API endpoint streaming SQL query results as NDJSON batches"""
+    try:
+        data = request.json or {}
+        sql_query = data.get('sql_query', '').strip()
+        database_config = data.get('database_config')
+        
+        if not sql_query:
+            return jsonify({
+                'success': False,
+                'error': 'SQL query is required'
+            }), 400
+        
+        if not database_config:
+            return jsonify({
+                'success': False,
+                'error': 'Database configuration is required'
+            }), 400
+        
+        batch_size = _parse_row_limit(data.get('batch_size')) or SQL_DEFAULT_PAGE_SIZE
+        max_rows = _parse_row_limit(data.get('max_rows'))
+        result_format, typed = _parse_result_format(data)
+        query_id, timeout = _parse_query_control(data)
+        
+        def generate():
+            # Announce the query ID first so the client can cancel mid-stream
+            yield json.dumps({"type": "started", "query_id": query_id}) + '\n'
+            for event in database_service.stream_sql_query(
+                database_config,
+                sql_query,
+                batch_size=batch_size,
+                max_rows=max_rows,
+                result_format=result_format,
+                typed=typed,
+                query_id=query_id,
+                timeout=timeout
+            ):
+                yield json.dumps(event) + '\n'
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logging.error(f"Error in stream_sql_query: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        })
+
 @app.route('/api/microservice/health-check', methods=['POST'])
 def check_microservice_health():
     """API endpoint to check microservice health"""
@@ -364,35 +1100,81 @@ def check_microservice_health():
         if not microservices:
             return jsonify({"error": "No microservices provided"}), 400
         
-        health_status = {}
-        
-        for service in microservices:
-            service_name = service.get('name')
-            server_url = service.get('server_url')
-            
-            if not service_name or not server_url:
-                health_status[service_name or 'unknown'] = 'offline'
-                continue
-            
+        # Optional overall time budget in seconds, capped at the service default
+        deadline = data.get('deadline')
+        if deadline is not None:
             try:
-                # Perform health check with 5 second timeout
-                response = requests.get(server_url, timeout=5, allow_redirects=True)
-                if response.status_code in [200, 301, 302, 404]:  # Consider redirects and 404s as "online"
-                    health_status[service_name] = 'online'
-                else:
-                    health_status[service_name] = 'offline'
-            except (requests.exceptions.RequestException, requests.exceptions.Timeout):
-                health_status[service_name] = 'offline'
+                deadline = min(float(deadline), health_check_service.deadline)
+            except (TypeError, ValueError):
+                return jsonify({"error": "deadline must be a number"}), 400
+        
+        details = health_check_service.check_health(microservices, deadline=deadline)
+        health_status = {name: result["status"] for name, result in details.items()}
         
         return jsonify({
             "success": True,
-            "health_status": health_status
+            "health_status": health_status,
+            "details": details
         })
         
     except Exception as e:
         logging.error(f"Error checking microservice health: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/api/microservice/health-check/stream', methods=['POST'])
+def stream_microservice_health():
+    """API endpoint streaming each microservice health result as NDJSON as soon as it completes"""
+    try:
+        data = request.get_json()
+        microservices = data.get('microservices', [])
+        
+        if not microservices:
+            return jsonify({"error": "No microservices provided"}), 400
+        
+        deadline = data.get('deadline')
+        if deadline is not None:
+            try:
+                deadline = min(float(deadline), health_check_service.deadline)
+            except (TypeError, ValueError):
+                return jsonify({"error": "deadline must be a number"}), 400
+        
+        def generate():
+            count = 0
+            for result in health_check_service.iter_health(microservices, deadline=deadline):
+                count += 1
+                yield json.dumps({"type": "result", **result}) + '\n'
+            yield json.dumps({"type": "done", "count": count}) + '\n'
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+        
+    except Exception as e:
+        logging.error(f"Error streaming microservice health: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@app.route('/api/microservice/health-status')
+def get_microservice_health_status():
+    """API endpoint serving cached health status from the background monitor"""
+    try:
+        # Optional filter: ?url=<server_url>&url=<server_url>
+        server_urls = request.args.getlist('url') or None
+        
+        return jsonify({
+            "success": True,
+            "monitor": health_monitor.get_info(),
+            "health_status": health_monitor.get_status(server_urls)
+        })
+        
+    except Exception as e:
+        logging.error(f"Error retrieving cached microservice health: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,96 @@
+"""
+Git Link Extraction Benchmark
+Compares GitLinkExtractor against the previous one-findall-per-pattern extraction
+
+Usage:
+    python benchmarks/git_link_benchmark.py [--comments N] [--repeat N]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from git_links import GitLinkExtractor
+
+LEGACY_PATTERNS = [
+    r'https?://[^/]+/[^/]+/[^/]+/-/merge_requests/\d+',
+    r'https?://[^/]+/[^/]+/[^/]+/-/commit/[a-f0-9]+',
+    r'https?://[^/]+/[^/]+/[^/]+/-/tree/[^/\s]+',
+    r'https?://[^/]+/[^/]+/[^/]+/-/blob/[^/\s]+',
+    r'https?://[^/]+/[^/]+/[^/]+/-/compare/[^/\s]+',
+]
+
+WORDS = ('deploy', 'fixed', 'the', 'config', 'review', 'please', 'merged', 'rollback', 'test', 'env',
+         'see', 'ticket', 'build', 'failing', 'on', 'staging', 'after', 'hotfix', 'for', 'customer')
+
+
+def legacy_extract(text: str):
+    """The per-pattern findall extraction this benchmark replaces"""
+    links = []
+    if not text:
+        return links
+    for pattern in LEGACY_PATTERNS:
+        links.extend(re.findall(pattern, text, re.IGNORECASE))
+    return list(set(links))
+
+
+def build_corpus(comments: int, seed: int = 1) -> list:
+    """Build comment bodies of about 600 characters, a third of them containing links"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(comments):
+        words = [rng.choice(WORDS) for _ in range(90)]
+        if i % 3 == 0:
+            project = f"group-{i % 7}/service-{i % 13}"
+            words.insert(rng.randrange(len(words)), f"https://gitlab.example.com/{project}/-/merge_requests/{i}")
+            words.insert(rng.randrange(len(words)), f"https://gitlab.example.com/{project}/-/commit/{i:040x}")
+        if i % 5 == 0:
+            words.insert(rng.randrange(len(words)), f"https://gitlab.example.com/group/app/-/tree/release-{i}")
+        corpus.append(' '.join(words))
+    return corpus
+
+
+def measure(func, corpus: list, repeat: int) -> float:
+    """Return the best seconds over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--comments', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    extractor = GitLinkExtractor()
+
+    def new_extract(text: str):
+        return [link.url for link in extractor.extract(text)]
+
+    print(f"{'comments':>10} {'MB':>6} {'legacy ms':>10} {'new ms':>10} {'speedup':>8}")
+    for comments in args.comments:
+        corpus = build_corpus(comments)
+        if any(set(legacy_extract(text)) != set(new_extract(text)) for text in corpus):
+            print(f"warning: extracted links differ for {comments} comments", file=sys.stderr)
+
+        legacy_time = measure(legacy_extract, corpus, args.repeat)
+        new_time = measure(new_extract, corpus, args.repeat)
+        size = sum(len(text) for text in corpus) / 1e6
+        print(
+            f"{comments:>10} {size:>6.1f} {legacy_time * 1000:>10.1f} {new_time * 1000:>10.1f} "
+            f"{legacy_time / new_time:>7.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
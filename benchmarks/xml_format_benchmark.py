@@ -0,0 +1,87 @@
+"""
+XML Formatting Benchmark
+Compares DatabaseService._format_xml against the previous minidom round trip
+
+Usage:
+    python benchmarks/xml_format_benchmark.py [--elements N] [--repeat N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import xml.etree.ElementTree as ET
+from xml.dom import minidom
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_service import DatabaseService
+
+
+def legacy_format_xml(xml_content: str) -> str:
+    """The ElementTree -> minidom -> split/join formatter this benchmark replaces"""
+    root = ET.fromstring(xml_content)
+    rough_string = ET.tostring(root, 'utf-8')
+    reparsed = minidom.parseString(rough_string)
+    pretty_xml = reparsed.toprettyxml(indent="  ")
+    lines = [line for line in pretty_xml.split('\n') if line.strip()]
+    return '\n'.join(lines)
+
+
+def build_document(elements: int) -> str:
+    """Build an unindented configuration document with the given number of entries"""
+    parts = ['<configuration><services>']
+    for i in range(elements):
+        parts.append(
+            f'<service name="svc-{i}" enabled="true"><endpoint url="https://host-{i % 50}.example.com/api"/>'
+            f'<timeout>{i % 120}</timeout><retries>{i % 5}</retries>'
+            f'<property key="pool.size" value="{i % 32}"/><description>Service number {i}</description></service>'
+        )
+    parts.append('</services></configuration>')
+    return ''.join(parts)
+
+
+def measure(func, xml_content: str, repeat: int):
+    """Return (best seconds, peak traced bytes) over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(xml_content)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    func(xml_content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--elements', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # Only the formatter is exercised; keep the service from creating its
+    # on-disk XML search index in the working directory
+    os.environ['XML_SEARCH_INDEX_PATH'] = ''
+    service = DatabaseService()
+    service.xml_format_max_bytes = sys.maxsize
+
+    print(f"{'size':>10} {'legacy ms':>10} {'new ms':>10} {'speedup':>8} {'legacy MB':>10} {'new MB':>10}")
+    for elements in args.elements:
+        xml_content = build_document(elements)
+        if legacy_format_xml(xml_content) != service._format_xml(xml_content):
+            print(f"warning: outputs differ for {elements} elements", file=sys.stderr)
+
+        legacy_time, legacy_peak = measure(legacy_format_xml, xml_content, args.repeat)
+        new_time, new_peak = measure(service._format_xml, xml_content, args.repeat)
+        print(
+            f"{len(xml_content):>10} {legacy_time * 1000:>10.1f} {new_time * 1000:>10.1f} "
+            f"{legacy_time / new_time:>7.1f}x {legacy_peak / 1e6:>10.1f} {new_peak / 1e6:>10.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
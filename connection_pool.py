@@ -0,0 +1,380 @@
+"""
+ODBC Connection Pool
+Reuses authenticated pyodbc connections across DatabaseService calls
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pyodbc
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+
+def normalize_connection_string(connection_string: str) -> str:
+    """
+    Normalize an ODBC connection string so equivalent strings share a pool
+
+    Args:
+        connection_string: Raw ODBC connection string
+
+    Returns:
+        Connection string with upper-cased keys in sorted order
+    """
+    pairs = []
+    for part in connection_string.split(';'):
+        if '=' not in part:
+            continue
+        key, value = part.split('=', 1)
+        pairs.append((key.strip().upper(), value.strip()))
+    pairs.sort()
+    return ';'.join(f"{key}={value}" for key, value in pairs) + ';'
+
+
+def _connection_values(connection_string: str) -> Dict[str, str]:
+    """Split an ODBC connection string into upper-cased keys and values"""
+    values = {}
+    for part in connection_string.split(';'):
+        if '=' in part:
+            key, value = part.split('=', 1)
+            values[key.strip().upper()] = value.strip()
+    return values
+
+
+def describe_connection_string(connection_string: str) -> str:
+    """Return a credential-free label (user@server/database) for logs and stats"""
+    values = _connection_values(connection_string)
+    return f"{values.get('UID', '')}@{values.get('SERVER', '')}/{values.get('DATABASE', '')}"
+
+
+def session_reset_sql(database: str) -> str:
+    """
+    Build the batch that returns a connection used for ad-hoc SQL to its login state
+
+    Drops the session's local temp tables, switches back to the configured
+    database and restores the SET options the ODBC driver connects with.
+    IMPLICIT_TRANSACTIONS is left alone because the driver manages it for
+    pyodbc's autocommit setting.
+
+    Args:
+        database: Database the connection string logs in to
+
+    Returns:
+        T-SQL batch to run (and commit) before the connection is reused
+    """
+    quoted_database = '[' + database.replace(']', ']]') + ']'
+    return f"""
+SET NOCOUNT ON;
+DECLARE @drop NVARCHAR(MAX) = N'';
+SELECT @drop = @drop + N'DROP TABLE ' + QUOTENAME(base) + N';'
+FROM (
+    SELECT object_id, LEFT(padded, LEN(padded) - PATINDEX(N'%[^_]%', REVERSE(padded)) + 1) AS base
+    FROM (
+        -- Local temp table names are padded with underscores and a 12 character suffix
+        SELECT object_id, LEFT(name, LEN(name) - 12) AS padded
+        FROM tempdb.sys.tables
+        WHERE name LIKE N'#[^#]%'
+    ) AS temp_tables
+) AS candidates
+WHERE OBJECT_ID(N'tempdb..' + QUOTENAME(base)) = object_id;
+EXEC sp_executesql @drop;
+USE {quoted_database};
+SET ANSI_NULLS ON;
+SET ANSI_NULL_DFLT_ON ON;
+SET ANSI_PADDING ON;
+SET ANSI_WARNINGS ON;
+SET CONCAT_NULL_YIELDS_NULL ON;
+SET QUOTED_IDENTIFIER ON;
+SET ARITHABORT OFF;
+SET NUMERIC_ROUNDABORT OFF;
+SET CURSOR_CLOSE_ON_COMMIT OFF;
+SET XACT_ABORT OFF;
+SET ROWCOUNT 0;
+SET TEXTSIZE -1;
+SET LOCK_TIMEOUT -1;
+SET DEADLOCK_PRIORITY NORMAL;
+SET TRANSACTION ISOLATION LEVEL READ COMMITTED;
+SET CONTEXT_INFO 0x;
+SET NOCOUNT OFF;
+"""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of connections for a single connection string
+
+    A pool with a reset_sql batch runs it on every checkin, so session state
+    left behind by arbitrary SQL (USE, SET options, temp tables) does not
+    reach the next caller.
+    """
+
+    def __init__(self, connection_string: str, max_size: int = 5, idle_timeout: float = 300,
+                 connect_timeout: int = 10, checkout_timeout: float = 30, validation_interval: float = 30,
+                 reset_sql: Optional[str] = None):
+        self.connection_string = connection_string
+        self.label = describe_connection_string(connection_string)
+        self.reset_sql = reset_sql
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.checkout_timeout = checkout_timeout
+        self.validation_interval = validation_interval
+
+        # Idle connections as (connection, last_used) pairs, most recent last
+        self._idle: List[Any] = []
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+        self._stats = {
+            "checkouts": 0,
+            "created": 0,
+            "reused": 0,
+            "discarded": 0,
+            "validation_failures": 0,
+            "idle_expired": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "resets": 0,
+            "reset_failures": 0
+        }
+
+    def _close_quietly(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _reap_idle(self, now: float) -> None:
+        """Close idle connections past idle_timeout; caller must hold the lock"""
+        fresh = []
+        for conn, last_used in self._idle:
+            if now - last_used > self.idle_timeout:
+                self._close_quietly(conn)
+                self._stats["idle_expired"] += 1
+            else:
+                fresh.append((conn, last_used))
+        self._idle = fresh
+
+    def _is_healthy(self, conn) -> bool:
+        """Run a trivial query to make sure a pooled connection is still usable"""
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _checkout(self):
+        """Take an idle connection or open a new one, waiting if the pool is full"""
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._condition:
+            self._stats["checkouts"] += 1
+            while True:
+                self._reap_idle(time.monotonic())
+
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    self._in_use += 1
+                    break
+
+                if self._in_use < self.max_size:
+                    conn, last_used = None, None
+                    self._in_use += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(f"Timed out waiting for a connection to {self.label}")
+                self._stats["waits"] += 1
+                self._condition.wait(remaining)
+
+        # Validate or connect outside the lock; the slot is already reserved
+        try:
+            if conn is not None:
+                if time.monotonic() - last_used <= self.validation_interval or self._is_healthy(conn):
+                    with self._condition:
+                        self._stats["reused"] += 1
+                    return conn
+
+                logger.warning(f"Discarding broken pooled connection to {self.label}")
+                self._close_quietly(conn)
+                with self._condition:
+                    self._stats["validation_failures"] += 1
+                    self._stats["discarded"] += 1
+
+            conn = pyodbc.connect(self.connection_string, timeout=self.connect_timeout)
+            with self._condition:
+                self._stats["created"] += 1
+            return conn
+
+        except Exception:
+            self._release_slot()
+            raise
+
+    def _release_slot(self) -> None:
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify()
+
+    def _reset_session(self, conn) -> bool:
+        """Run reset_sql on a connection being checked in; caller must not hold the lock"""
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.reset_sql)
+            cursor.close()
+            # Temp table drops run inside the driver's implicit transaction
+            conn.commit()
+        except pyodbc.Error as e:
+            logger.warning(f"Discarding pooled connection to {self.label} after failed session reset: {e}")
+            with self._condition:
+                self._stats["reset_failures"] += 1
+            return False
+
+        with self._condition:
+            self._stats["resets"] += 1
+        return True
+
+    def _checkin(self, conn, discard: bool = False) -> None:
+        """Return a connection to the pool, resetting any open transaction and session state"""
+        if not discard:
+            try:
+                conn.rollback()
+            except pyodbc.Error:
+                discard = True
+
+        if not discard and self.reset_sql:
+            discard = not self._reset_session(conn)
+
+        with self._condition:
+            self._in_use -= 1
+            if discard:
+                self._close_quietly(conn)
+                self._stats["discarded"] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    def acquire(self):
+        """Check out a connection that must later be passed to release()"""
+        return self._checkout()
+
+    def release(self, conn, error: Optional[BaseException] = None) -> None:
+        """
+        Return a connection obtained from acquire()
+
+        Statement-level errors (bad SQL, constraint violations) leave the
+        connection usable; any other pyodbc error closes it instead of
+        returning it to the pool.
+
+        Args:
+            conn: Connection to return
+            error: Exception raised while the connection was in use, if any
+        """
+        discard = isinstance(error, pyodbc.Error) and not isinstance(
+            error, (pyodbc.ProgrammingError, pyodbc.IntegrityError, pyodbc.DataError)
+        )
+        self._checkin(conn, discard=discard)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Check out a connection for the duration of a with-block"""
+        conn = self._checkout()
+        try:
+            yield conn
+        except BaseException as e:
+            self.release(conn, e)
+            raise
+        else:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Close all idle connections"""
+        with self._condition:
+            for conn, _ in self._idle:
+                self._close_quietly(conn)
+            self._idle = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "database": self.label,
+                "ad_hoc": self.reset_sql is not None,
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                **self._stats
+            }
+
+
+class ConnectionPoolManager:
+    """
+    Registry of connection pools keyed by normalized connection string
+
+    Ad-hoc SQL gets its own pools whose connections are reset on checkin,
+    so it never shares sessions with the service's own queries.
+    """
+
+    def __init__(self, max_size: int = 5, idle_timeout: float = 300, connect_timeout: int = 10,
+                 checkout_timeout: float = 30, validation_interval: float = 30):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.checkout_timeout = checkout_timeout
+        self.validation_interval = validation_interval
+
+        self._pools: Dict[Tuple[str, bool], ConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def get_pool(self, connection_string: str, ad_hoc: bool = False) -> ConnectionPool:
+        """
+        Return the pool for a connection string, creating it on first use
+
+        Args:
+            connection_string: ODBC connection string
+            ad_hoc: Return the separate pool for user-supplied SQL
+        """
+        key = (normalize_connection_string(connection_string), ad_hoc)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                reset_sql = None
+                if ad_hoc:
+                    reset_sql = session_reset_sql(_connection_values(connection_string).get('DATABASE', 'master'))
+                pool = ConnectionPool(
+                    connection_string,
+                    max_size=self.max_size,
+                    idle_timeout=self.idle_timeout,
+                    connect_timeout=self.connect_timeout,
+                    checkout_timeout=self.checkout_timeout,
+                    validation_interval=self.validation_interval,
+                    reset_sql=reset_sql
+                )
+                self._pools[key] = pool
+            return pool
+
+    def connection(self, connection_string: str, ad_hoc: bool = False):
+        """Shortcut for get_pool(connection_string, ad_hoc).connection()"""
+        return self.get_pool(connection_string, ad_hoc).connection()
+
+    def close_all(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.close()
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            pools = list(self._pools.values())
+        return [pool.get_stats() for pool in pools]
@@ -4,11 +4,25 @@ Handles MSSQL connectivity and XML configuration retrieval
 """
 
 import os
+import time
+import uuid
+import hashlib
+import decimal
+import datetime
 import logging
+import threading
 import pyodbc
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from connection_pool import ConnectionPoolManager, PoolTimeoutError
+from fanout import fan_out
+from xml_cache import XmlConfigCache
+from xml_search_index import XmlSearchIndex
+from xml_query import ParsedXml, evaluate as evaluate_xml_path
+from xml_diff import diff_xml
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +35,176 @@ class DatabaseService:
         # MSSQL connection settings
         self.connection_timeout = 10
         self.query_timeout = 30
+        
+        # Connections are pooled per normalized connection string and shared
+        # by every method so the TDS login handshake is paid once per pool slot
+        self.pool_manager = ConnectionPoolManager(
+            max_size=int(os.environ.get('DB_POOL_MAX_SIZE', '5')),
+            idle_timeout=float(os.environ.get('DB_POOL_IDLE_TIMEOUT', '300')),
+            connect_timeout=self.connection_timeout
+        )
+        
+        # Paginated query results. Results up to result_materialize_rows are
+        # read into memory and release their connection at once; larger ones
+        # keep a server-side cursor, and its pooled connection, until
+        # exhausted, closed or expired. Open cursors per database are capped
+        # below the pool size so paging never starves other ad-hoc queries.
+        self.result_cursor_ttl = 120
+        self.max_result_cursors = 20
+        self.result_materialize_rows = int(os.environ.get('DB_RESULT_MATERIALIZE_ROWS', '10000'))
+        self._result_cursors: Dict[str, Dict[str, Any]] = {}
+        # Result sets being opened plus stored entries, for max_result_cursors
+        self._result_cursor_reservations = 0
+        # Connections held by open cursors (or cursors being opened) per pool
+        self._result_cursor_connections: Dict[Any, int] = {}
+        self._result_cursors_lock = threading.Lock()
+        
+        # XML configuration lists and contents, revalidated against the
+        # database once their TTL expires instead of being re-fetched
+        self.xml_names_ttl = float(os.environ.get('XML_CACHE_NAMES_TTL', '60'))
+        self.xml_content_ttl = float(os.environ.get('XML_CACHE_CONTENT_TTL', '300'))
+        self.xml_cache = XmlConfigCache(
+            max_bytes=int(os.environ.get('XML_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+            default_ttl=self.xml_content_ttl
+        )
+        # Parsed trees for path queries, kept apart from the formatted text
+        # and revalidated with the same validators
+        self.xml_tree_cache = XmlConfigCache(
+            max_bytes=int(os.environ.get('XML_TREE_CACHE_MAX_BYTES', str(128 * 1024 * 1024))),
+            default_ttl=self.xml_content_ttl
+        )
+        # Optional rowversion (or other change-tracking) column used as the
+        # content validator; defaults to a server-side SHA-256 of the XML
+        self.xml_validator_column = os.environ.get('XML_CACHE_VALIDATOR_COLUMN', '')
+        
+        # Documents above this size are served as stored instead of pretty-printed
+        self.xml_format_max_bytes = int(os.environ.get('XML_FORMAT_MAX_BYTES', str(8 * 1024 * 1024)))
+        
+        # Local full-text index answering XML searches; an empty path (or a
+        # SQLite build without FTS5 trigrams) falls back to LIKE on the source table
+        self.xml_search_index = None
+        xml_search_index_path = os.environ.get('XML_SEARCH_INDEX_PATH', 'xml_search_index.db')
+        if xml_search_index_path and XmlSearchIndex.is_supported():
+            self.xml_search_index = XmlSearchIndex(
+                xml_search_index_path,
+                sync_interval=float(os.environ.get('XML_SEARCH_SYNC_INTERVAL', '300'))
+            )
+        elif xml_search_index_path:
+            logger.warning("SQLite FTS5 trigram tokenizer unavailable, XML search will scan the source table")
+        
+        # Shared workers for operations that fan out across several databases
+        self.fanout_executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get('DB_FANOUT_WORKERS', '8')),
+            thread_name_prefix='db-fanout'
+        )
+        
+        # Statements currently executing, keyed by query ID, so they can be
+        # cancelled from another request
+        self.max_query_timeout = 300
+        self._active_queries: Dict[str, Dict[str, Any]] = {}
+        self._active_queries_lock = threading.Lock()
+    
+    @contextmanager
+    def _connection(self, db_config: Dict, timeout: Optional[int] = None, ad_hoc: bool = False):
+        """
+        Check out a pooled connection for the given database configuration
+        
+        Args:
+            db_config: Database configuration dictionary
+            timeout: Statement timeout in seconds (defaults to query_timeout)
+            ad_hoc: Use the pool reserved for user-supplied SQL, whose
+                connections are reset before reuse
+            
+        Yields:
+            pyodbc connection whose cursors enforce the statement timeout
+        """
+        # Expired result cursors give their connections back before we wait for one
+        self._reap_result_cursors()
+        connection_string = self._build_connection_string(db_config)
+        with self.pool_manager.connection(connection_string, ad_hoc) as conn:
+            # Applies to cursors created from here on; reset on every checkout
+            # because pooled connections keep the previous caller's value
+            conn.timeout = self._resolve_timeout(timeout)
+            yield conn
+    
+    def _resolve_timeout(self, timeout: Optional[int]) -> int:
+        """Return the statement timeout to apply, capped at max_query_timeout"""
+        if not timeout or timeout <= 0:
+            return self.query_timeout
+        return min(int(timeout), self.max_query_timeout)
+    
+    @contextmanager
+    def _track_query(self, query_id: Optional[str], cursor, sql_query: str):
+        """Register an executing cursor so cancel_query() can reach it"""
+        if not query_id:
+            yield
+            return
+        
+        with self._active_queries_lock:
+            if query_id in self._active_queries:
+                raise ValueError(f"Query ID '{query_id}' is already running")
+            self._active_queries[query_id] = {
+                "cursor": cursor,
+                "sql_query": sql_query,
+                "started": time.time(),
+                "cancelled": False
+            }
+        try:
+            yield
+        finally:
+            with self._active_queries_lock:
+                self._active_queries.pop(query_id, None)
+    
+    def _describe_query_error(self, error: pyodbc.Error, timeout: int) -> str:
+        """Turn timeout and cancellation SQLSTATEs into readable messages"""
+        sqlstate = error.args[0] if error.args else ''
+        if sqlstate == 'HYT00':
+            return f"Query timed out after {timeout} seconds"
+        if sqlstate == 'HY008':
+            return "Query was cancelled"
+        return f"Database error: {str(error)}"
+    
+    def cancel_query(self, query_id: str) -> bool:
+        """
+        Cancel a running statement started with the given query ID
+        
+        Args:
+            query_id: ID passed to (or returned by) the query method
+            
+        Returns:
+            True if a running query was found and a cancel was sent
+        """
+        with self._active_queries_lock:
+            entry = self._active_queries.get(query_id)
+            if entry is None:
+                return False
+            entry["cancelled"] = True
+        
+        try:
+            entry["cursor"].cancel()
+            logger.info(f"Cancelled query {query_id}")
+            return True
+        except pyodbc.Error as e:
+            logger.error(f"Error cancelling query {query_id}: {e}")
+            return False
+    
+    def get_active_queries(self) -> List[Dict[str, Any]]:
+        """Return the currently executing queries with their elapsed time"""
+        now = time.time()
+        with self._active_queries_lock:
+            return [
+                {
+                    "query_id": query_id,
+                    "sql_query": entry["sql_query"][:200],
+                    "elapsed_seconds": round(now - entry["started"], 1),
+                    "cancelled": entry["cancelled"]
+                }
+                for query_id, entry in self._active_queries.items()
+            ]
+    
+    def get_pool_stats(self) -> List[Dict]:
+        """Return statistics for every connection pool"""
+        return self.pool_manager.get_stats()
     
     def _build_connection_string(self, db_config: Dict) -> str:
         """
@@ -66,67 +250,148 @@ class DatabaseService:
             Tuple of (success: bool, message: str)
         """
         try:
-            # For demo purposes, simulate a successful connection
-            server_name = f"{db_config.get('host', 'demo-server')}\\{db_config.get('database', 'demo-db')}"
-            logger.info(f"Demo database connection successful: {server_name}")
-            return True, f"Connected successfully to {server_name}"
+            with self._connection(db_config) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+                cursor.close()
             
-            # Original code for actual database testing (commented out for demo)
-            # connection_string = self._build_connection_string(db_config)
-            # 
-            # with pyodbc.connect(connection_string, timeout=self.connection_timeout) as conn:
-            #     cursor = conn.cursor()
-            #     cursor.execute("SELECT 1")
-            #     cursor.fetchone()
-            #     
-            # logger.info(f"Successfully connected to database: {db_config.get('host', 'Unknown')}")
-            # return True, "Connection successful"
+            server_name = f"{db_config.get('host', 'Unknown')}\\{db_config.get('database', 'Unknown')}"
+            logger.info(f"Successfully connected to database: {server_name}")
+            return True, f"Connected successfully to {server_name}"
             
+        except PoolTimeoutError as e:
+            error_msg = f"Connection pool exhausted: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
+        except pyodbc.Error as e:
+            error_msg = f"Database connection error: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
             logger.error(error_msg)
             return False, error_msg
     
-    def get_xml_configurations(self, db_config: Dict, table_name: str = "configurations") -> Tuple[bool, List[str], str]:
+    def _database_identity(self, db_config: Dict) -> Tuple[str, int, str, str]:
+        """Return the credential-free identity of a database used in cache keys"""
+        return (
+            str(db_config.get('host', 'localhost')).lower(),
+            int(db_config.get('port', 1433) or 1433),
+            str(db_config.get('database', 'master')).lower(),
+            str(db_config.get('username', '')).lower()
+        )
+    
+    def _xml_validator_expression(self) -> str:
+        """SQL expression identifying the current version of a configuration row"""
+        if self.xml_validator_column:
+            return f"CAST({self.xml_validator_column} AS BIGINT)"
+        return "HASHBYTES('SHA2_256', CAST(xml_content AS VARBINARY(MAX)))"
+    
+    def _xml_names_query(self, table_name: str) -> str:
+        """Query for the distinct configuration names"""
+        return f"""
+            SELECT DISTINCT name 
+            FROM {table_name} 
+            WHERE name IS NOT NULL 
+            AND xml_content IS NOT NULL
+            """
+    
+    @staticmethod
+    def _xml_names_validator(xml_names: List[str]) -> Optional[bytes]:
         """
-        Fetch XML configuration names from database
+        SHA-256 of a sorted name list, as computed by _read_xml_names_validator()
+        
+        Names are joined with newlines and hashed as UTF-16LE, the byte
+        layout HASHBYTES sees for NVARCHAR.
+        """
+        if not xml_names:
+            return None
+        return hashlib.sha256('\n'.join(xml_names).encode('utf-16-le')).digest()
+    
+    def _read_xml_names_validator(self, db_config: Dict, table_name: str, timeout: Optional[int] = None) -> Optional[bytes]:
+        """Hash the configuration name list on the server without transferring it"""
+        with self._connection(db_config, timeout) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+            SELECT HASHBYTES('SHA2_256', STRING_AGG(CAST(name AS NVARCHAR(MAX)), NCHAR(10))
+                             WITHIN GROUP (ORDER BY name ASC)) 
+            FROM ({self._xml_names_query(table_name)}) AS names
+            """)
+            row = cursor.fetchone()
+            return row[0] if row else None
+    
+    def _load_xml_names(self, db_config: Dict, table_name: str, timeout: Optional[int] = None) -> Tuple[List[str], Optional[bytes]]:
+        """Fetch the configuration name list and its validator"""
+        with self._connection(db_config, timeout) as conn:
+            cursor = conn.cursor()
+            
+            # Query to get XML configuration names
+            # Assumes table has columns: id, name, xml_content
+            cursor.execute(self._xml_names_query(table_name) + "ORDER BY name ASC")
+            rows = cursor.fetchall()
+            
+            xml_names = [row.name for row in rows]
+        
+        # Derived from the list itself, so a change committed after the
+        # query can never be cached as current
+        return xml_names, self._xml_names_validator(xml_names)
+    
+    def _read_xml_content_validator(self, db_config: Dict, xml_name: str, table_name: str) -> Any:
+        """Read the validator of one configuration without fetching its XML"""
+        with self._connection(db_config) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+            SELECT {self._xml_validator_expression()} AS validator 
+            FROM {table_name} 
+            WHERE name = ?
+            """, (xml_name,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+    
+    def _load_xml_content(self, db_config: Dict, xml_name: str, table_name: str) -> Tuple[Optional[str], Any]:
+        """Fetch and format one configuration together with its validator"""
+        with self._connection(db_config) as conn:
+            cursor = conn.cursor()
+            
+            # Query to get specific XML content
+            query = f"""
+            SELECT xml_content, {self._xml_validator_expression()} AS validator 
+            FROM {table_name} 
+            WHERE name = ?
+            """
+            
+            cursor.execute(query, (xml_name,))
+            row = cursor.fetchone()
+        
+        if row and row.xml_content:
+            # Format XML for better display
+            return self._format_xml(row.xml_content), row.validator
+        return None, None
+    
+    def get_xml_configurations(self, db_config: Dict, table_name: str = "configurations",
+                               timeout: Optional[int] = None) -> Tuple[bool, List[str], str]:
+        """
+        Fetch XML configuration names from database (cached)
         
         Args:
             db_config: Database configuration dictionary
             table_name: Name of the table containing XML configurations
+            timeout: Statement timeout in seconds (defaults to query_timeout)
             
         Returns:
             Tuple of (success: bool, xml_names: List[str], error_message: str)
         """
         try:
-            # For demo purposes, return demo XML configurations
-            xml_names = self.get_demo_xml_names()
-            logger.info(f"Retrieved {len(xml_names)} demo XML configuration names")
-            return True, xml_names, ""
+            xml_names = self.xml_cache.get_or_load(
+                (self._database_identity(db_config), table_name, None),
+                load=lambda: self._load_xml_names(db_config, table_name, timeout),
+                validate=lambda: self._read_xml_names_validator(db_config, table_name, timeout),
+                ttl=self.xml_names_ttl
+            )
             
-            # Original code for actual database querying (commented out for demo)
-            # connection_string = self._build_connection_string(db_config)
-            # 
-            # with pyodbc.connect(connection_string, timeout=self.connection_timeout) as conn:
-            #     cursor = conn.cursor()
-            #     
-            #     # Query to get XML configuration names
-            #     # Assumes table has columns: id, name, xml_content
-            #     query = f"""
-            #     SELECT DISTINCT name 
-            #     FROM {table_name} 
-            #     WHERE name IS NOT NULL 
-            #     AND xml_content IS NOT NULL
-            #     ORDER BY name ASC
-            #     """
-            #     
-            #     cursor.execute(query)
-            #     rows = cursor.fetchall()
-            #     
-            #     xml_names = [row.name for row in rows]
-            #     
-            # logger.info(f"Retrieved {len(xml_names)} XML configurations from {db_config.get('host', 'Unknown')}")
-            # return True, xml_names, ""
+            logger.info(f"Retrieved {len(xml_names)} XML configurations from {db_config.get('host', 'Unknown')}")
+            return True, xml_names, ""
             
         except pyodbc.ProgrammingError as e:
             error_msg = f"Table or query error: {str(e)}"
@@ -141,9 +406,67 @@ class DatabaseService:
             logger.error(error_msg)
             return False, [], error_msg
     
+    def iter_xml_configurations(self, targets: List[Dict], timeout: Optional[int] = None,
+                                deadline: float = 60, table_name: str = "configurations") -> Iterator[Dict[str, Any]]:
+        """
+        List configurations from many databases concurrently, yielding each as it completes
+        
+        Targets pointing at the same database are listed once. Concurrency is
+        bounded by the shared fan-out executor; databases still pending when
+        the deadline expires are reported as failed.
+        
+        Args:
+            targets: List of dictionaries with a label and a database_config;
+                any other keys are passed through to the results
+            timeout: Statement timeout per database in seconds
+            deadline: Overall time budget in seconds
+            table_name: Name of the table containing XML configurations
+            
+        Yields:
+            The target's keys (minus database_config) plus success, xml_names,
+            count, error and elapsed_ms
+        """
+        def list_names(db_config: Dict) -> Tuple[bool, List[str], str, float]:
+            started = time.perf_counter()
+            success, xml_names, error_msg = self.get_xml_configurations(db_config, table_name, timeout)
+            return success, xml_names, error_msg, round((time.perf_counter() - started) * 1000, 1)
+        
+        def describe(target: Dict, success: bool, xml_names: List[str], error_msg: str,
+                     elapsed_ms: Optional[float]) -> Dict[str, Any]:
+            result = {key: value for key, value in target.items() if key != "database_config"}
+            result.update({
+                "success": success,
+                "xml_names": xml_names,
+                "count": len(xml_names),
+                "error": error_msg,
+                "elapsed_ms": elapsed_ms
+            })
+            return result
+        
+        # Targets pointing at the same database share one listing
+        targets_by_identity: Dict[Tuple, List[Dict]] = {}
+        for target in targets:
+            identity = self._database_identity(target["database_config"])
+            targets_by_identity.setdefault(identity, []).append(target)
+        
+        calls = [
+            (same_targets, partial(list_names, same_targets[0]["database_config"]))
+            for same_targets in targets_by_identity.values()
+        ]
+        for same_targets, future in fan_out(self.fanout_executor, calls, deadline):
+            if future is None:
+                success, xml_names, error_msg, elapsed_ms = False, [], "Deadline exceeded", None
+            else:
+                try:
+                    success, xml_names, error_msg, elapsed_ms = future.result()
+                except Exception as e:
+                    success, xml_names, error_msg, elapsed_ms = False, [], f"Unexpected error: {str(e)}", None
+            for target in same_targets:
+                yield describe(target, success, xml_names, error_msg, elapsed_ms)
+    
     def get_xml_content(self, db_config: Dict, xml_name: str, table_name: str = "configurations") -> Tuple[bool, str, str]:
         """
-        Fetch specific XML configuration content
+        Fetch specific XML configuration content (cached)
         
         Args:
             db_config: Database configuration dictionary
@@ -154,59 +477,361 @@ class DatabaseService:
             Tuple of (success: bool, xml_content: str, error_message: str)
         """
         try:
-            # For demo purposes, return demo XML content
-            xml_content = self.get_demo_xml_content(xml_name)
-            logger.info(f"Retrieved demo XML content for: {xml_name}")
-            return True, xml_content, ""
-            
-            # Original code for actual database querying (commented out for demo)
-            # connection_string = self._build_connection_string(db_config)
-            # 
-            # with pyodbc.connect(connection_string, timeout=self.connection_timeout) as conn:
-            #     cursor = conn.cursor()
-            #     
-            #     # Query to get specific XML content
-            #     query = f"""
-            #     SELECT xml_content 
-            #     FROM {table_name} 
-            #     WHERE name = ?
-            #     """
-            #     
-            #     cursor.execute(query, (xml_name,))
-            #     row = cursor.fetchone()
-            #     
-            #     if row and row.xml_content:
-            #         # Format XML for better display
-            #         formatted_xml = self._format_xml(row.xml_content)
-            #         return True, formatted_xml, ""
-            #     else:
-            #         return False, "", f"XML configuration '{xml_name}' not found"
+            formatted_xml = self.xml_cache.get_or_load(
+                (self._database_identity(db_config), table_name, xml_name),
+                load=lambda: self._load_xml_content(db_config, xml_name, table_name),
+                validate=lambda: self._read_xml_content_validator(db_config, xml_name, table_name),
+                ttl=self.xml_content_ttl
+            )
+            
+            if formatted_xml:
+                return True, formatted_xml, ""
+            else:
+                return False, "", f"XML configuration '{xml_name}' not found"
             
         except Exception as e:
             error_msg = f"Error retrieving XML content: {str(e)}"
             logger.error(error_msg)
             return False, "", error_msg
     
+    def _format_validator(self, validator: Any) -> str:
+        """Render a content validator (hash bytes or rowversion) as an ETag value"""
+        if isinstance(validator, (bytes, bytearray)):
+            return validator.hex()
+        return str(validator)
+    
+    def open_xml_content(self, db_config: Dict, xml_name: str, table_name: str = "configurations",
+                         chunk_size: int = 256 * 1024) -> Tuple[Optional[Dict[str, Any]], Iterator[str]]:
+        """
+        Snapshot a stored configuration and return an iterator over its chunks
+        
+        The document is copied once, in a single statement, into a session
+        temp table together with its length and validator, so every chunk
+        comes from the same version and the xml value is serialized only
+        once. Chunks are read from the copy on one pooled connection, which
+        is returned to the pool when the iterator is exhausted or closed.
+        
+        Args:
+            db_config: Database configuration dictionary
+            xml_name: Name of the XML configuration
+            table_name: Name of the table containing XML configurations
+            chunk_size: UTF-16 code units fetched per round trip
+        
+        Returns:
+            Tuple of (info: Dict with length and etag of the snapshot, or None
+            if the configuration does not exist; iterator of consecutive
+            slices of the XML document, as stored)
+        """
+        chunks = self._iter_xml_snapshot(db_config, xml_name, table_name, chunk_size)
+        # Runs the snapshot query; the generator keeps the connection from here on
+        info = next(chunks)
+        return info, chunks
+    
+    def _iter_xml_snapshot(self, db_config: Dict, xml_name: str, table_name: str,
+                           chunk_size: int) -> Iterator[Any]:
+        """Yield the snapshot info, then the chunks (see open_xml_content)"""
+        with self._connection(db_config) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+            SET NOCOUNT ON;
+            IF OBJECT_ID('tempdb..#xml_download') IS NOT NULL DROP TABLE #xml_download;
+            SELECT CAST(xml_content AS NVARCHAR(MAX)) AS text,
+                   {self._xml_validator_expression()} AS validator
+            INTO #xml_download
+            FROM {table_name}
+            WHERE name = ?
+            AND xml_content IS NOT NULL;
+            SELECT DATALENGTH(text) / 2 AS length, validator FROM #xml_download;
+            SET NOCOUNT OFF;
+            """, (xml_name,))
+            row = cursor.fetchone()
+            
+            try:
+                if not row:
+                    yield None
+                    return
+                
+                yield {"length": row.length or 0, "etag": self._format_validator(row.validator)}
+                
+                # A chunk that would end on a UTF-16 high surrogate stops one
+                # code unit early so the pair arrives whole in the next chunk
+                query = """
+                SELECT piece.chunk, DATALENGTH(piece.chunk) / 2 AS units
+                FROM #xml_download
+                CROSS APPLY (
+                    SELECT SUBSTRING(text, ?, ? - CASE
+                        WHEN UNICODE(SUBSTRING(text, ? + ? - 1, 1)) BETWEEN 55296 AND 56319 THEN 1
+                        ELSE 0
+                    END) AS chunk
+                ) AS piece
+                """
+                position, length = 1, row.length or 0
+                while position <= length:
+                    cursor.execute(query, (position, chunk_size, position, chunk_size))
+                    chunk = cursor.fetchone()
+                    if not chunk or not chunk.units:
+                        break
+                    position += chunk.units
+                    yield chunk.chunk
+            finally:
+                try:
+                    cursor.execute("DROP TABLE IF EXISTS #xml_download")
+                    cursor.close()
+                except pyodbc.Error:
+                    pass
+    
+    def invalidate_xml_cache(self, db_config: Optional[Dict] = None, xml_name: Optional[str] = None,
+                             table_name: Optional[str] = None) -> int:
+        """
+        Drop cached XML lists/contents
+        
+        Args:
+            db_config: Restrict to one database (all databases if omitted)
+            xml_name: Restrict to one configuration; its database's name list
+                is dropped as well
+            table_name: Restrict to one table
+            
+        Returns:
+            Number of cache entries removed
+        """
+        identity = self._database_identity(db_config) if db_config else None
+        
+        def matches(key) -> bool:
+            key_identity, key_table, key_name = key
+            if identity is not None and key_identity != identity:
+                return False
+            if table_name is not None and key_table != table_name:
+                return False
+            if xml_name is not None and key_name not in (xml_name, None):
+                return False
+            return True
+        
+        removed = self.xml_cache.invalidate(matches) + self.xml_tree_cache.invalidate(matches)
+        logger.info(f"Invalidated {removed} XML cache entries")
+        return removed
+    
+    def get_xml_cache_stats(self) -> Dict:
+        """Return XML cache statistics"""
+        return {**self.xml_cache.get_stats(), "parsed_trees": self.xml_tree_cache.get_stats()}
+    
+    def _load_xml_tree(self, db_config: Dict, xml_name: str, table_name: str) -> Tuple[Optional[ParsedXml], Any]:
+        """Fetch and parse one configuration together with its validator"""
+        with self._connection(db_config) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+            SELECT xml_content, {self._xml_validator_expression()} AS validator 
+            FROM {table_name} 
+            WHERE name = ?
+            """, (xml_name,))
+            row = cursor.fetchone()
+        
+        if row and row.xml_content:
+            return ParsedXml(row.xml_content), row.validator
+        return None, None
+    
+    def get_xml_tree(self, db_config: Dict, xml_name: str, table_name: str = "configurations") -> Optional[ParsedXml]:
+        """Return the parsed tree of a configuration (cached), or None if it does not exist"""
+        return self.xml_tree_cache.get_or_load(
+            (self._database_identity(db_config), table_name, xml_name),
+            load=lambda: self._load_xml_tree(db_config, xml_name, table_name),
+            validate=lambda: self._read_xml_content_validator(db_config, xml_name, table_name)
+        )
+    
+    def diff_xml_configuration(self, targets: List[Dict], xml_name: str, baseline: int = 0,
+                               max_changes: int = 500, timeout: float = 30,
+                               table_name: str = "configurations") -> Tuple[bool, Dict, str]:
+        """
+        Compare one configuration across several databases
+        
+        The configuration is fetched from every target in parallel (parsed
+        trees are cached), then each target is diffed against the baseline.
+        
+        Args:
+            targets: List of dictionaries with a label and a database_config
+            xml_name: Name of the XML configuration to compare
+            baseline: Index of the target the others are compared against
+            max_changes: Maximum number of changes reported per comparison
+            timeout: Seconds to wait for all configurations to be fetched
+            table_name: Name of the table containing XML configurations
+            
+        Returns:
+            Tuple of (success: bool, result: Dict with baseline and comparisons, error_message: str)
+        """
+        futures = {
+            self.fanout_executor.submit(self.get_xml_tree, target["database_config"], xml_name, table_name): index
+            for index, target in enumerate(targets)
+        }
+        done, _ = wait(futures, timeout=timeout)
+        
+        trees: Dict[int, ParsedXml] = {}
+        errors: Dict[int, str] = {}
+        for future, index in futures.items():
+            if future not in done:
+                future.cancel()
+                errors[index] = f"Timed out after {timeout} seconds"
+            elif future.exception() is not None:
+                errors[index] = str(future.exception())
+            elif future.result() is None:
+                errors[index] = f"XML configuration '{xml_name}' not found"
+            else:
+                trees[index] = future.result()
+        
+        if baseline in errors:
+            return False, {}, f"Baseline {targets[baseline]['label']}: {errors[baseline]}"
+        
+        comparisons = []
+        for index, target in enumerate(targets):
+            if index == baseline:
+                continue
+            
+            comparison = {"label": target["label"]}
+            if index in errors:
+                comparison.update({"status": "error", "error": errors[index]})
+            else:
+                changes, truncated = diff_xml(trees[baseline], trees[index], max_changes)
+                comparison.update({
+                    "status": "different" if changes else "identical",
+                    "change_count": len(changes),
+                    "truncated": truncated,
+                    "changes": changes
+                })
+            comparisons.append(comparison)
+        
+        return True, {
+            "xml_name": xml_name,
+            "baseline": targets[baseline]["label"],
+            "comparisons": comparisons
+        }, ""
+    
+    def query_xml_configurations(self, db_config: Dict, path: str, xml_name: Optional[str] = None,
+                                 namespaces: Optional[Dict[str, str]] = None, limit: int = 100,
+                                 include_xml: bool = True, deadline: float = 60,
+                                 table_name: str = "configurations") -> Tuple[bool, Dict, str]:
+        """
+        Evaluate an element path against one configuration or all of them
+        
+        When querying all configurations they are fetched and parsed
+        concurrently on the shared fan-out executor. Configurations not
+        loaded when the deadline expires are skipped and the result is
+        marked truncated.
+        
+        Args:
+            db_config: Database configuration dictionary
+            path: Element path (ElementTree XPath subset, plus a trailing /@attr)
+            xml_name: Configuration to query; every configuration if omitted
+            namespaces: Optional prefix -> URI map used by the path
+            limit: Maximum number of matches across all configurations
+            include_xml: Include each matched subtree serialized as XML
+            deadline: Overall time budget in seconds for loading configurations
+            table_name: Name of the table containing XML configurations
+            
+        Returns:
+            Tuple of (success: bool, result: Dict with per-configuration matches, error_message: str)
+        """
+        try:
+            if xml_name:
+                xml_names = [xml_name]
+            else:
+                success, xml_names, error_msg = self.get_xml_configurations(db_config, table_name)
+                if not success:
+                    return False, {}, error_msg
+            
+            # Per-configuration (matches, truncated) or error, by position in xml_names
+            evaluated: Dict[int, Tuple[List[Dict], bool]] = {}
+            failed: Dict[int, str] = {}
+            deadline_exceeded = False
+            
+            calls = [
+                (index, partial(self.get_xml_tree, db_config, name, table_name))
+                for index, name in enumerate(xml_names)
+            ]
+            for index, future in fan_out(self.fanout_executor, calls, deadline):
+                if future is None:
+                    deadline_exceeded = True
+                    continue
+                
+                try:
+                    parsed = future.result()
+                except Exception as e:
+                    # Unparseable or unreadable configurations do not fail the whole query
+                    failed[index] = str(e)
+                    continue
+                
+                if parsed is None:
+                    failed[index] = "Not found"
+                    continue
+                
+                evaluated[index] = evaluate_xml_path(
+                    parsed, path, namespaces, limit=limit, include_xml=include_xml
+                )
+            
+            results = []
+            errors = [{"xml_name": xml_names[index], "error": failed[index]} for index in sorted(failed)]
+            match_count = 0
+            truncated = deadline_exceeded
+            
+            # Assembled in name order so the result does not depend on completion order
+            for index in sorted(evaluated):
+                matches, name_truncated = evaluated[index]
+                if match_count >= limit:
+                    truncated = truncated or bool(matches)
+                    continue
+                if len(matches) > limit - match_count:
+                    matches, name_truncated = matches[:limit - match_count], True
+                truncated = truncated or name_truncated
+                if matches:
+                    results.append({"xml_name": xml_names[index], "matches": matches})
+                    match_count += len(matches)
+            
+            if xml_name and errors:
+                return False, {}, f"XML configuration '{xml_name}': {errors[0]['error']}"
+            if xml_name and deadline_exceeded:
+                return False, {}, f"XML configuration '{xml_name}': Deadline exceeded"
+            
+            return True, {
+                "results": results,
+                "match_count": match_count,
+                "truncated": truncated,
+                "deadline_exceeded": deadline_exceeded,
+                "errors": errors
+            }, ""
+            
+        except ValueError:
+            raise
+        except Exception as e:
+            error_msg = f"Error querying XML configurations: {str(e)}"
+            logger.error(error_msg)
+            return False, {}, error_msg
+    
     def _format_xml(self, xml_content: str) -> str:
         """
         Format XML content for better readability
         
+        Documents larger than xml_format_max_bytes are returned unformatted
+        so a single oversized configuration cannot stall a request.
+        
         Args:
             xml_content: Raw XML content string
             
         Returns:
             Formatted XML string
         """
+        if not xml_content:
+            return xml_content
+        
+        if len(xml_content) > self.xml_format_max_bytes:
+            logger.info(f"Skipping formatting of {len(xml_content)} byte XML document")
+            return xml_content
+        
         try:
-            # Parse and pretty-print XML
+            # Parse once, indent the tree in place and serialize once
             root = ET.fromstring(xml_content)
-            rough_string = ET.tostring(root, 'utf-8')
-            reparsed = minidom.parseString(rough_string)
-            pretty_xml = reparsed.toprettyxml(indent="  ")
+            ET.indent(root, space="  ")
+            pretty_xml = ET.tostring(root, encoding='unicode', short_empty_elements=True)
             
-            # Remove empty lines and clean up
-            lines = [line for line in pretty_xml.split('\n') if line.strip()]
-            return '\n'.join(lines)
+            # Match minidom's "<tag/>" style; ElementTree escapes ">" in
+            # text and attributes, so " />" only ever closes an empty element
+            return '<?xml version="1.0" ?>\n' + pretty_xml.replace(' />', '/>')
             
         except ET.ParseError:
             # If XML parsing fails, return original content
@@ -216,128 +841,692 @@ class DatabaseService:
             logger.error(f"Error formatting XML: {e}")
             return xml_content
     
-    def search_xml_configurations(self, db_config: Dict, search_term: str, table_name: str = "configurations") -> Tuple[bool, List[Dict], str]:
+    def _xml_search_source(self, db_config: Dict, table_name: str) -> str:
+        """Return the search index source identifier for a database table"""
+        host, port, database, username = self._database_identity(db_config)
+        return f"{username}@{host}:{port}/{database}/{table_name}"
+    
+    def _read_xml_validators(self, db_config: Dict, table_name: str) -> Dict[str, str]:
+        """Read the validator of every configuration without fetching any XML"""
+        with self._connection(db_config) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+            SELECT name, {self._xml_validator_expression()} AS validator 
+            FROM {table_name} 
+            WHERE name IS NOT NULL 
+            AND xml_content IS NOT NULL
+            """)
+            return {row.name: self._format_validator(row.validator) for row in cursor.fetchall()}
+    
+    def _iter_xml_documents(self, db_config: Dict, table_name: str, names: List[str],
+                            batch_size: int = 50) -> Iterator[Tuple[str, str]]:
+        """Yield (name, xml_content) for the given configurations, a batch at a time"""
+        with self._connection(db_config) as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(names), batch_size):
+                batch = names[start:start + batch_size]
+                placeholders = ', '.join('?' for _ in batch)
+                cursor.execute(f"""
+                SELECT name, xml_content 
+                FROM {table_name} 
+                WHERE name IN ({placeholders})
+                """, batch)
+                while True:
+                    rows = cursor.fetchmany(10)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row.name, row.xml_content
+    
+    def sync_xml_search_index(self, db_config: Dict, table_name: str = "configurations") -> Tuple[bool, Dict, str]:
+        """
+        Re-index the configurations of a database whose validator changed
+        
+        Args:
+            db_config: Database configuration dictionary
+            table_name: Name of the table containing XML configurations
+            
+        Returns:
+            Tuple of (success: bool, counts: Dict, error_message: str)
+        """
+        if self.xml_search_index is None:
+            return False, {}, "XML search index is disabled"
+        
+        try:
+            counts = self.xml_search_index.sync(
+                self._xml_search_source(db_config, table_name),
+                self._read_xml_validators(db_config, table_name),
+                lambda names: self._iter_xml_documents(db_config, table_name, names)
+            )
+            return True, counts, ""
+            
+        except Exception as e:
+            error_msg = f"Error indexing XML configurations: {str(e)}"
+            logger.error(error_msg)
+            return False, {}, error_msg
+    
+    def _refresh_xml_search_index(self, db_config: Dict, table_name: str) -> None:
+        """Sync a stale source: inline on first use, in the background afterwards"""
+        source = self._xml_search_source(db_config, table_name)
+        if not self.xml_search_index.needs_sync(source) or self.xml_search_index.is_syncing(source):
+            return
+        
+        if self.xml_search_index.last_synced(source) is None:
+            success, _, error_msg = self.sync_xml_search_index(db_config, table_name)
+            if not success:
+                raise RuntimeError(error_msg)
+            return
+        
+        threading.Thread(
+            target=self.sync_xml_search_index,
+            args=(db_config, table_name),
+            name='xml-search-sync',
+            daemon=True
+        ).start()
+    
+    def get_xml_search_stats(self) -> Dict:
+        """Return XML search index statistics"""
+        if self.xml_search_index is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.xml_search_index.get_stats()}
+    
+    def search_xml_configurations(self, db_config: Dict, search_term: str, table_name: str = "configurations",
+                                  limit: int = 50) -> Tuple[bool, List[Dict], str]:
         """
         Search XML configurations by name or content
         
+        Answered from the local full-text index when it is available, ranked
+        by relevance with a snippet around the match.
+        
         Args:
             db_config: Database configuration dictionary
             search_term: Term to search for
             table_name: Name of the table containing XML configurations
+            limit: Maximum number of results
             
         Returns:
             Tuple of (success: bool, results: List[Dict], error_message: str)
         """
+        if self.xml_search_index is None:
+            return self._search_xml_source_table(db_config, search_term, table_name)
+        
         try:
-            # For demo purposes, search demo XML configurations
-            demo_names = self.get_demo_xml_names()
+            self._refresh_xml_search_index(db_config, table_name)
+            
             results = [
-                {"name": name, "preview": f"Demo configuration: {name}"}
-                for name in demo_names
-                if search_term.lower() in name.lower()
+                {
+                    "name": hit["name"],
+                    "match_type": hit["match_type"],
+                    "preview": hit["snippet"],
+                    "content_preview": hit["snippet"],
+                    "score": hit["score"]
+                }
+                for hit in self.xml_search_index.search(
+                    self._xml_search_source(db_config, table_name), search_term, limit
+                )
             ]
-            logger.info(f"Found {len(results)} demo XML configurations matching '{search_term}'")
+            
+            logger.info(f"Found {len(results)} XML configurations matching '{search_term}'")
             return True, results, ""
             
-            # Original code for actual database searching (commented out for demo)
-            # connection_string = self._build_connection_string(db_config)
-            # 
-            # with pyodbc.connect(connection_string, timeout=self.connection_timeout) as conn:
-            #     cursor = conn.cursor()
-            #     
-            #     # Search in both name and XML content
-            #     query = f"""
-            #     SELECT name, 
-            #            CASE 
-            #                WHEN LEN(xml_content) > 200 
-            #                THEN LEFT(xml_content, 200) + '...'
-            #                ELSE xml_content
-            #            END as preview
-            #     FROM {table_name} 
-            #     WHERE name LIKE ? 
-            #        OR xml_content LIKE ?
-            #     ORDER BY name ASC
-            #     """
-            #     
-            #     search_pattern = f"%{search_term}%"
-            #     cursor.execute(query, (search_pattern, search_pattern))
-            #     rows = cursor.fetchall()
-            #     
-            #     results = [
-            #         {
-            #             "name": row.name,
-            #             "preview": row.preview.strip() if row.preview else ""
-            #         }
-            #         for row in rows
-            #     ]
-            #     
-            # logger.info(f"Found {len(results)} XML configurations matching '{search_term}'")
-            # return True, results, ""
+        except Exception as e:
+            error_msg = f"Error searching XML configurations: {str(e)}"
+            logger.error(error_msg)
+            return False, [], error_msg
+    
+    def _search_xml_source_table(self, db_config: Dict, search_term: str, table_name: str) -> Tuple[bool, List[Dict], str]:
+        """
+        Search XML configurations by name or content with LIKE on the source table
+        
+        Args:
+            db_config: Database configuration dictionary
+            search_term: Term to search for
+            table_name: Name of the table containing XML configurations
+            
+        Returns:
+            Tuple of (success: bool, results: List[Dict], error_message: str)
+        """
+        try:
+            with self._connection(db_config) as conn:
+                cursor = conn.cursor()
+                
+                # Search in both name and XML content
+                query = f"""
+                SELECT name, 
+                       CASE 
+                           WHEN LEN(xml_content) > 200 
+                           THEN LEFT(xml_content, 200) + '...'
+                           ELSE xml_content
+                       END as preview
+                FROM {table_name} 
+                WHERE name LIKE ? 
+                   OR xml_content LIKE ?
+                ORDER BY name ASC
+                """
+                
+                search_pattern = f"%{search_term}%"
+                cursor.execute(query, (search_pattern, search_pattern))
+                rows = cursor.fetchall()
+                
+            results = [
+                {
+                    "name": row.name,
+                    "preview": row.preview.strip() if row.preview else ""
+                }
+                for row in rows
+            ]
+            
+            logger.info(f"Found {len(results)} XML configurations matching '{search_term}'")
+            return True, results, ""
             
         except Exception as e:
             error_msg = f"Error searching XML configurations: {str(e)}"
             logger.error(error_msg)
             return False, [], error_msg
 
-    def execute_sql_query(self, db_config: Dict, sql_query: str) -> Tuple[bool, List[Dict], List[str], int, str]:
+    # Result formats accepted by the SQL query methods
+    RESULT_FORMATS = ('records', 'columnar')
+    
+    # Largest integer a JavaScript number represents exactly
+    _MAX_SAFE_INTEGER = 2 ** 53 - 1
+    
+    def _convert_value(self, value: Any, typed: bool = False) -> Any:
+        """
+        Convert a database value to its JSON representation
+        
+        Args:
+            value: Value returned by pyodbc
+            typed: Keep numbers and booleans native and render temporal
+                values as ISO 8601 instead of stringifying everything
+        """
+        # Handle different data types
+        if value is None:
+            return None
+        elif isinstance(value, (bytes, bytearray)):
+            return value.decode('utf-8', errors='ignore')
+        elif not typed:
+            return str(value)
+        elif isinstance(value, (bool, float)):
+            return value
+        elif isinstance(value, int):
+            # Stringify integers JavaScript would round (e.g. large BIGINTs)
+            return value if abs(value) <= self._MAX_SAFE_INTEGER else str(value)
+        elif isinstance(value, decimal.Decimal):
+            if value == value.to_integral_value() and abs(value) <= self._MAX_SAFE_INTEGER:
+                return int(value)
+            # Only emit a float when it round-trips to the same decimal text
+            as_float = float(value)
+            return as_float if decimal.Decimal(repr(as_float)) == value else str(value)
+        elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+        else:
+            return str(value)
+    
+    def _column_type(self, type_code: Any) -> str:
+        """Map a cursor.description type code to a JSON-friendly type name"""
+        if type_code is bool:
+            return 'boolean'
+        if type_code in (int, float, decimal.Decimal):
+            return 'number'
+        if type_code in (datetime.datetime, datetime.date, datetime.time):
+            return 'datetime'
+        if type_code in (bytes, bytearray):
+            return 'binary'
+        return 'string'
+    
+    def _describe_columns(self, description) -> Tuple[List[str], List[str]]:
+        """Return (column names, column type names) for a cursor description"""
+        return [col[0] for col in description], [self._column_type(col[1]) for col in description]
+    
+    def _row_to_dict(self, row, columns: List[str], typed: bool = False) -> Dict[str, Any]:
+        """Convert a result row to a dictionary keyed by column name"""
+        return {col: self._convert_value(row[i], typed) for i, col in enumerate(columns)}
+    
+    def _row_to_list(self, row, typed: bool = False) -> List[Any]:
+        """Convert a result row to a list ordered like the columns"""
+        return [self._convert_value(value, typed) for value in row]
+    
+    def _format_rows(self, rows, columns: List[str], result_format: str = 'records',
+                     typed: bool = False) -> List[Any]:
+        """
+        Convert result rows to the requested response format
+        
+        Args:
+            rows: Rows returned by pyodbc
+            columns: Column names
+            result_format: 'records' for one dictionary per row, or
+                'columnar' for one value list per row (names sent once)
+            typed: See _convert_value
+        """
+        if result_format == 'columnar':
+            return [self._row_to_list(row, typed) for row in rows]
+        return [self._row_to_dict(row, columns, typed) for row in rows]
+    
+    def execute_sql_query(self, db_config: Dict, sql_query: str, query_id: Optional[str] = None,
+                          timeout: Optional[int] = None) -> Tuple[bool, List[Dict], List[str], int, str]:
         """
         Execute SQL query against the database
         
         Args:
             db_config: Database configuration dictionary
             sql_query: SQL query string to execute
+            query_id: Optional ID under which the query can be cancelled
+            timeout: Statement timeout in seconds (defaults to query_timeout)
             
         Returns:
             Tuple of (success: bool, data: List[Dict], columns: List[str], row_count: int, error_message: str)
         """
         try:
-            # Build connection string
-            conn_str = self._build_connection_string(db_config)
-            
-            # Connect to database
-            conn = pyodbc.connect(conn_str, timeout=30)
-            cursor = conn.cursor()
-            
-            # Execute query
-            cursor.execute(sql_query)
-            
-            # Check if query returns results
-            if cursor.description:
-                # Query returns results (SELECT)
-                columns = [col[0] for col in cursor.description]
-                rows = cursor.fetchall()
+            with self._connection(db_config, timeout, ad_hoc=True) as conn:
+                cursor = conn.cursor()
                 
-                # Convert rows to list of dictionaries
-                data = []
-                for row in rows:
-                    row_dict = {}
-                    for i, col in enumerate(columns):
-                        value = row[i]
-                        # Handle different data types
-                        if value is None:
-                            row_dict[col] = None
-                        elif isinstance(value, (bytes, bytearray)):
-                            row_dict[col] = value.decode('utf-8', errors='ignore')
-                        else:
-                            row_dict[col] = str(value)
-                    data.append(row_dict)
+                # Execute query
+                with self._track_query(query_id, cursor, sql_query):
+                    cursor.execute(sql_query)
+                    
+                    if cursor.description:
+                        rows = cursor.fetchall()
                 
-                row_count = len(data)
-                conn.close()
-                return True, data, columns, row_count, ""
-            else:
-                # Query doesn't return results (INSERT, UPDATE, DELETE, etc.)
-                row_count = cursor.rowcount
-                conn.commit()
-                conn.close()
-                return True, [], [], row_count, ""
+                # Check if query returns results
+                if cursor.description:
+                    # Query returns results (SELECT)
+                    columns = [col[0] for col in cursor.description]
+                    
+                    # Convert rows to list of dictionaries
+                    data = [self._row_to_dict(row, columns) for row in rows]
+                    
+                    row_count = len(data)
+                    return True, data, columns, row_count, ""
+                else:
+                    # Query doesn't return results (INSERT, UPDATE, DELETE, etc.)
+                    row_count = cursor.rowcount
+                    conn.commit()
+                    return True, [], [], row_count, ""
                 
+        except PoolTimeoutError as e:
+            error_msg = f"Connection pool exhausted: {str(e)}"
+            return False, [], [], 0, error_msg
         except pyodbc.Error as e:
-            error_msg = f"Database error: {str(e)}"
+            error_msg = self._describe_query_error(e, self._resolve_timeout(timeout))
             return False, [], [], 0, error_msg
+        except ValueError as e:
+            return False, [], [], 0, str(e)
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
             return False, [], [], 0, error_msg
 
-
+    def stream_sql_query(self, db_config: Dict, sql_query: str, batch_size: int = 500,
+                         max_rows: Optional[int] = None, result_format: str = 'records',
+                         typed: bool = False, query_id: Optional[str] = None,
+                         timeout: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Execute SQL query and yield results in batches as they are fetched
+        
+        Args:
+            db_config: Database configuration dictionary
+            sql_query: SQL query string to execute
+            batch_size: Number of rows fetched per round trip
+            max_rows: Optional cap on the number of rows returned
+            result_format: 'records' or 'columnar' (see _format_rows)
+            typed: Keep native value types (see _convert_value)
+            query_id: Optional ID under which the query can be cancelled
+            timeout: Statement timeout in seconds (defaults to query_timeout)
+            
+        Yields:
+            Event dictionaries: a "columns" event, zero or more "rows" events,
+            then a "done" event (or an "error" event on failure)
+        """
+        try:
+            with self._connection(db_config, timeout, ad_hoc=True) as conn:
+                cursor = conn.cursor()
+                with self._track_query(query_id, cursor, sql_query):
+                    yield from self._stream_cursor(conn, cursor, sql_query, batch_size, max_rows, result_format, typed)
+                
+        except PoolTimeoutError as e:
+            yield {"type": "error", "error": f"Connection pool exhausted: {str(e)}"}
+        except pyodbc.Error as e:
+            yield {"type": "error", "error": self._describe_query_error(e, self._resolve_timeout(timeout))}
+        except Exception as e:
+            yield {"type": "error", "error": f"Unexpected error: {str(e)}"}
     
+    def _stream_cursor(self, conn, cursor, sql_query: str, batch_size: int, max_rows: Optional[int],
+                       result_format: str, typed: bool) -> Iterator[Dict[str, Any]]:
+        """Execute on a tracked cursor and yield stream_sql_query() events"""
+        row_count = 0
+        cursor.execute(sql_query)
+        
+        if not cursor.description:
+            row_count = cursor.rowcount
+            conn.commit()
+            yield {"type": "done", "row_count": row_count, "truncated": False}
+            return
+        
+        columns, column_types = self._describe_columns(cursor.description)
+        yield {"type": "columns", "columns": columns, "column_types": column_types}
+        
+        truncated = False
+        while True:
+            fetch_size = batch_size
+            if max_rows is not None:
+                # Fetch one extra row so truncation can be detected
+                fetch_size = min(batch_size, max_rows - row_count + 1)
+            
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            
+            if max_rows is not None and row_count + len(rows) > max_rows:
+                rows = rows[:max_rows - row_count]
+                truncated = True
+            
+            if rows:
+                row_count += len(rows)
+                yield {"type": "rows", "rows": self._format_rows(rows, columns, result_format, typed)}
+            
+            if truncated:
+                cursor.cancel()
+                break
+        
+        cursor.close()
+        yield {"type": "done", "row_count": row_count, "truncated": truncated}
+    
+    def _release_result_cursor(self, entry: Dict[str, Any], error: Optional[BaseException] = None) -> None:
+        """Close a result cursor and return its connection to the pool; caller holds entry lock"""
+        if entry["cursor"] is None:
+            return
+        try:
+            entry["cursor"].close()
+        except pyodbc.Error:
+            pass
+        entry["pool"].release(entry["conn"], error)
+        entry["cursor"] = entry["conn"] = None
+        self._release_cursor_connection(entry["pool"])
+    
+    def _release_cursor_connection(self, pool) -> None:
+        """Give back a connection slot counted by _reserve_result_cursor()"""
+        with self._result_cursors_lock:
+            remaining = self._result_cursor_connections.get(pool, 0) - 1
+            if remaining > 0:
+                self._result_cursor_connections[pool] = remaining
+            else:
+                self._result_cursor_connections.pop(pool, None)
+    
+    def _reserve_result_cursor(self, pool) -> Optional[str]:
+        """
+        Reserve room for a result set that may stay open
+        
+        The check and the reservation happen under one lock, so concurrent
+        requests cannot overshoot either cap.
+        
+        Returns:
+            Error message if a cap is reached, otherwise None
+        """
+        with self._result_cursors_lock:
+            if len(self._result_cursors) + self._result_cursor_reservations >= self.max_result_cursors:
+                return "Too many open result cursors; close or finish paging existing queries"
+            # Leave at least one connection of the pool for other queries
+            if self._result_cursor_connections.get(pool, 0) >= max(1, pool.max_size - 1):
+                return "Too many open result cursors on this database; close or finish paging existing queries"
+            self._result_cursor_reservations += 1
+            self._result_cursor_connections[pool] = self._result_cursor_connections.get(pool, 0) + 1
+        return None
+    
+    def _reap_result_cursors(self) -> None:
+        """Close result cursors that have not been read within the TTL"""
+        now = time.monotonic()
+        with self._result_cursors_lock:
+            if not self._result_cursors:
+                return
+            expired = [
+                cursor_id for cursor_id, entry in self._result_cursors.items()
+                if now - entry["last_access"] > self.result_cursor_ttl
+            ]
+            entries = [self._result_cursors.pop(cursor_id) for cursor_id in expired]
+        
+        for entry in entries:
+            with entry["lock"]:
+                self._release_result_cursor(entry)
+        if entries:
+            logger.info(f"Closed {len(entries)} expired result cursors")
+    
+    def _read_page(self, entry: Dict[str, Any], page_size: int) -> Dict[str, Any]:
+        """Read the next page from a result set; caller holds entry lock"""
+        # Rows already read ahead (materialized results, or the one extra
+        # row that tells whether another page exists) are served first
+        rows = entry["pending"]
+        if entry["cursor"] is not None and len(rows) <= page_size:
+            rows.extend(entry["cursor"].fetchmany(page_size + 1 - len(rows)))
+        rows, entry["pending"] = rows[:page_size], rows[page_size:]
+        has_more = bool(entry["pending"])
+        
+        offset = entry["offset"]
+        entry["offset"] += len(rows)
+        entry["last_access"] = time.monotonic()
+        
+        return {
+            "cursor_id": entry["cursor_id"] if has_more else None,
+            "columns": entry["columns"],
+            "column_types": entry["column_types"],
+            "format": entry["result_format"],
+            "data": self._format_rows(rows, entry["columns"], entry["result_format"], entry["typed"]),
+            "row_count": len(rows),
+            "offset": offset,
+            "has_more": has_more
+        }
+    
+    def _materialize(self, entry: Dict[str, Any]) -> None:
+        """
+        Read the rest of a result set into memory if it is small enough
+        
+        Releases the cursor and its connection when the result ends within
+        result_materialize_rows; otherwise the rows read stay pending and
+        the cursor stays open. Caller holds entry lock.
+        """
+        wanted = self.result_materialize_rows - entry["offset"] - len(entry["pending"])
+        if wanted <= 0:
+            return
+        rows = entry["cursor"].fetchmany(wanted + 1)
+        entry["pending"].extend(rows)
+        if len(rows) <= wanted:
+            self._release_result_cursor(entry)
+    
+    def open_result_cursor(self, db_config: Dict, sql_query: str, page_size: int = 500,
+                           keep_open: bool = True, result_format: str = 'records',
+                           typed: bool = False, query_id: Optional[str] = None,
+                           timeout: Optional[int] = None) -> Tuple[bool, Dict[str, Any], str]:
+        """
+        Execute SQL query and return its first page, keeping the rest for paging
+        
+        Args:
+            db_config: Database configuration dictionary
+            sql_query: SQL query string to execute
+            page_size: Number of rows per page
+            keep_open: Keep the result for fetch_result_page(); when False the
+                first page acts as a row cap and has_more marks truncation
+            result_format: 'records' or 'columnar' (see _format_rows), used
+                for every page of this cursor
+            typed: Keep native value types (see _convert_value)
+            query_id: Optional ID under which the query can be cancelled
+            timeout: Statement timeout in seconds (defaults to query_timeout);
+                also applies to later page fetches
+            
+        Returns:
+            Tuple of (success: bool, page: Dict, error_message: str)
+        """
+        self._reap_result_cursors()
+        pool = self.pool_manager.get_pool(self._build_connection_string(db_config), ad_hoc=True)
+        if keep_open:
+            error_msg = self._reserve_result_cursor(pool)
+            if error_msg:
+                return False, {}, error_msg
+        
+        try:
+            return self._open_result_cursor(pool, sql_query, page_size, keep_open, result_format,
+                                            typed, query_id, timeout)
+        finally:
+            if keep_open:
+                with self._result_cursors_lock:
+                    self._result_cursor_reservations -= 1
+    
+    def _open_result_cursor(self, pool, sql_query: str, page_size: int, keep_open: bool,
+                            result_format: str, typed: bool, query_id: Optional[str],
+                            timeout: Optional[int]) -> Tuple[bool, Dict[str, Any], str]:
+        """Body of open_result_cursor(); the caller has reserved a cursor slot if keep_open"""
+        def unreserve() -> None:
+            if keep_open:
+                self._release_cursor_connection(pool)
+        
+        try:
+            conn = pool.acquire()
+        except PoolTimeoutError as e:
+            unreserve()
+            return False, {}, f"Connection pool exhausted: {str(e)}"
+        except pyodbc.Error as e:
+            unreserve()
+            return False, {}, f"Database error: {str(e)}"
+        
+        try:
+            conn.timeout = self._resolve_timeout(timeout)
+            cursor = conn.cursor()
+            with self._track_query(query_id, cursor, sql_query):
+                cursor.execute(sql_query)
+            
+            if not cursor.description:
+                row_count = cursor.rowcount
+                conn.commit()
+                cursor.close()
+                pool.release(conn)
+                unreserve()
+                return True, {
+                    "cursor_id": None,
+                    "columns": [],
+                    "column_types": [],
+                    "format": result_format,
+                    "data": [],
+                    "row_count": row_count,
+                    "offset": 0,
+                    "has_more": False
+                }, ""
+            
+            columns, column_types = self._describe_columns(cursor.description)
+            entry = {
+                "cursor_id": uuid.uuid4().hex,
+                "pool": pool,
+                "conn": conn,
+                "cursor": cursor,
+                "columns": columns,
+                "column_types": column_types,
+                "result_format": result_format,
+                "typed": typed,
+                "timeout": conn.timeout,
+                "pending": [],
+                "offset": 0,
+                "last_access": time.monotonic(),
+                "lock": threading.Lock()
+            }
+            page = self._read_page(entry, page_size)
+            if page["has_more"] and keep_open:
+                self._materialize(entry)
+            
+        except pyodbc.Error as e:
+            pool.release(conn, e)
+            unreserve()
+            return False, {}, self._describe_query_error(e, self._resolve_timeout(timeout))
+        except ValueError as e:
+            pool.release(conn)
+            unreserve()
+            return False, {}, str(e)
+        except Exception as e:
+            pool.release(conn, e)
+            unreserve()
+            return False, {}, f"Unexpected error: {str(e)}"
+        
+        if page["has_more"] and keep_open:
+            with self._result_cursors_lock:
+                self._result_cursors[entry["cursor_id"]] = entry
+        else:
+            if page["has_more"]:
+                cursor.cancel()
+            if keep_open:
+                self._release_result_cursor(entry)
+            else:
+                cursor.close()
+                pool.release(conn)
+            page["cursor_id"] = None
+        
+        return True, page, ""
+    
+    def fetch_result_page(self, cursor_id: str, page_size: int = 500,
+                          offset: Optional[int] = None) -> Tuple[bool, Dict[str, Any], str]:
+        """
+        Fetch the next page from an open result cursor
+        
+        Args:
+            cursor_id: ID returned by open_result_cursor()
+            page_size: Number of rows per page
+            offset: Optional row offset to start from; cursors are forward-only,
+                so it must not be before the current position
+            
+        Returns:
+            Tuple of (success: bool, page: Dict, error_message: str)
+        """
+        self._reap_result_cursors()
+        with self._result_cursors_lock:
+            entry = self._result_cursors.get(cursor_id)
+        if entry is None:
+            return False, {}, "Result cursor not found or expired; re-run the query"
+        
+        with entry["lock"]:
+            if cursor_id not in self._result_cursors:
+                return False, {}, "Result cursor not found or expired; re-run the query"
+            
+            try:
+                if offset is not None:
+                    if offset < entry["offset"]:
+                        return False, {}, f"Result cursor is forward-only and already at row {entry['offset']}"
+                    # Skip forward to the requested offset
+                    while entry["offset"] < offset:
+                        skipped = self._read_page(entry, min(offset - entry["offset"], 1000))
+                        if not skipped["has_more"]:
+                            break
+                
+                page = self._read_page(entry, page_size)
+                
+            except Exception as e:
+                with self._result_cursors_lock:
+                    self._result_cursors.pop(cursor_id, None)
+                self._release_result_cursor(entry, e)
+                if isinstance(e, pyodbc.Error):
+                    return False, {}, self._describe_query_error(e, entry["timeout"])
+                return False, {}, f"Unexpected error: {str(e)}"
+            
+            if not page["has_more"]:
+                with self._result_cursors_lock:
+                    self._result_cursors.pop(cursor_id, None)
+                self._release_result_cursor(entry)
+        
+        return True, page, ""
+    
+    def close_result_cursor(self, cursor_id: str) -> bool:
+        """
+        Close an open result cursor before it is exhausted
+        
+        Args:
+            cursor_id: ID returned by open_result_cursor()
+            
+        Returns:
+            True if a cursor was closed
+        """
+        with self._result_cursors_lock:
+            entry = self._result_cursors.pop(cursor_id, None)
+        if entry is None:
+            return False
+        
+        with entry["lock"]:
+            if entry["cursor"] is not None:
+                try:
+                    entry["cursor"].cancel()
+                except pyodbc.Error:
+                    pass
+            self._release_result_cursor(entry)
+        return True
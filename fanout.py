@@ -0,0 +1,55 @@
+"""
+Concurrent Fan-Out
+Runs independent calls on a shared executor and yields them as they complete within a deadline
+"""
+
+import logging
+from concurrent.futures import Executor, Future, as_completed, TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def fan_out(executor: Executor, calls: Iterable[Tuple[Any, Callable[[], Any]]],
+            deadline: float) -> Iterator[Tuple[Any, Optional[Future]]]:
+    """
+    Run calls concurrently, yielding each as it completes
+
+    Every call is submitted when fan_out() is called, before the caller
+    iterates, so they all start together. Calls still pending when the
+    deadline expires are cancelled if queued; those already running finish
+    in the background, bounded by their own timeouts.
+
+    Args:
+        executor: Executor bounding the concurrency
+        calls: (tag, zero-argument callable) pairs; the tag identifies the
+            call to the caller
+        deadline: Overall time budget in seconds
+
+    Returns:
+        Iterator of (tag, completed future) pairs in completion order, then
+        (tag, None) for every call that missed the deadline
+    """
+    futures: Dict[Future, Any] = {executor.submit(call): tag for tag, call in calls}
+    return _iter_completed(futures, deadline)
+
+
+def _iter_completed(futures: Dict[Future, Any], deadline: float) -> Iterator[Tuple[Any, Optional[Future]]]:
+    """
+    Yield the futures of fan_out() as they complete
+
+    Kept separate from fan_out() so that the calls are submitted eagerly
+    rather than on the caller's first next().
+    """
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            pending.discard(future)
+            yield futures[future], future
+    except FuturesTimeoutError:
+        logger.warning(f"Deadline of {deadline}s exceeded with {len(pending)} of {len(futures)} calls pending")
+        for future in pending:
+            future.cancel()
+            yield futures[future], None
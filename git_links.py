@@ -0,0 +1,127 @@
+"""
+Git Link Extraction
+Single-pass extraction of GitLab and GitHub links from Jira text
+"""
+
+import re
+import logging
+from typing import Iterable, List, NamedTuple, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# One URL path segment; also stops at Jira wiki markup ([title|url]) and quotes
+_SEGMENT = r"[^/\s\[\]|<>\"']+"
+
+
+class GitLink(NamedTuple):
+    """A git link found in text, already split into its parts"""
+    url: str
+    # gitlab or github
+    provider: str
+    # merge_request, commit, branch_file or repository
+    kind: str
+    # Project path, e.g. group/subgroup/project
+    project: str
+    # Merge/pull request number or commit SHA
+    ref: Optional[str]
+
+
+def _host_pattern(hosts: Iterable[str]) -> str:
+    """Alternation of literal host names"""
+    return '|'.join(re.escape(host) for host in hosts)
+
+
+def build_link_pattern(allowed_hosts: Optional[Iterable[str]] = None,
+                       github_hosts: Iterable[str] = ('github.com',)) -> 're.Pattern[str]':
+    """
+    Compile the alternation of every supported link shape
+
+    Links on a GitHub host are read as owner/repo followed by pull, commit,
+    tree or blob. Links on any other host are GitLab links, with or without
+    the "/-/" separator older GitLab versions omit; nested groups work
+    either way.
+
+    Args:
+        allowed_hosts: Host names (optionally with port) links must point to;
+            any host is accepted when empty
+        github_hosts: Host names served by GitHub
+    """
+    allowed = [host.strip().lower() for host in allowed_hosts or [] if host.strip()]
+    github = [host.strip().lower() for host in github_hosts if host.strip()]
+    if allowed:
+        github = [host for host in github if host in allowed]
+        gitlab_host = _host_pattern(host for host in allowed if host not in github) or '(?!)'
+    else:
+        gitlab_host = _SEGMENT
+    github_host = _host_pattern(github) or '(?!)'
+
+    return re.compile(rf"""
+        https?://
+        (?:
+            (?:{github_host})/
+            (?P<github_project>{_SEGMENT}/{_SEGMENT})/
+            (?:
+                pull/(?P<github_pr>\d+)
+              | commit/(?P<github_commit>[0-9a-f]{{7,64}})
+              | (?:tree|blob)/{_SEGMENT}
+            )
+          | (?!(?:{github_host})/)(?:{gitlab_host})/
+            (?P<gitlab_project>{_SEGMENT}(?:/{_SEGMENT})+?)/(?:-/)?
+            (?:
+                merge_requests/(?P<gitlab_mr>\d+)
+              | commit/(?P<gitlab_commit>[0-9a-f]{{7,64}})
+              | (?P<gitlab_file>tree|blob)/{_SEGMENT}
+              | compare/{_SEGMENT}
+            )
+        )
+    """, re.IGNORECASE | re.VERBOSE)
+
+
+class GitLinkExtractor:
+    """Finds git links with one precompiled pattern in a single scan of the text"""
+
+    def __init__(self, allowed_hosts: Optional[Iterable[str]] = None,
+                 github_hosts: Iterable[str] = ('github.com',)):
+        self.pattern = build_link_pattern(allowed_hosts, github_hosts)
+
+    def extract(self, text: str) -> List[GitLink]:
+        """
+        Extract git links from text
+
+        Args:
+            text: Comment or description body, plain or Jira wiki markup
+
+        Returns:
+            Links in order of first appearance, without duplicates
+        """
+        if not text:
+            return []
+
+        links = {}
+        for match in self.pattern.finditer(text):
+            url = match.group(0)
+            if url not in links:
+                links[url] = self._link(url, match)
+        return list(links.values())
+
+    @staticmethod
+    def _link(url: str, match: 're.Match[str]') -> GitLink:
+        groups = match.groupdict()
+        if groups['gitlab_project']:
+            project = groups['gitlab_project']
+            if groups['gitlab_mr']:
+                return GitLink(url, 'gitlab', 'merge_request', project, groups['gitlab_mr'])
+            if groups['gitlab_commit']:
+                return GitLink(url, 'gitlab', 'commit', project, groups['gitlab_commit'])
+            if groups['gitlab_file']:
+                return GitLink(url, 'gitlab', 'branch_file', project, None)
+            return GitLink(url, 'gitlab', 'repository', project, None)
+
+        project = groups['github_project']
+        if groups['github_pr']:
+            return GitLink(url, 'github', 'merge_request', project, groups['github_pr'])
+        if groups['github_commit']:
+            return GitLink(url, 'github', 'commit', project, groups['github_commit'])
+        return GitLink(url, 'github', 'branch_file', project, None)
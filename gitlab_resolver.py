@@ -0,0 +1,132 @@
+"""
+GitLab Link Resolver
+Deduplicated, batched and concurrent lookup of merge request and commit metadata
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from git_links import GitLink
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class GitLinkResolver:
+    """
+    Per-analysis resolver for GitLab link metadata
+
+    Every distinct URL is resolved once. Project handles are created lazily
+    (no API call) and shared, merge requests are fetched with one iids[]
+    list query per project, and projects are resolved concurrently. GitHub
+    links are classified from the URL without an API call.
+    """
+
+    # GitLab caps list queries at 100 items per page
+    MAX_IIDS_PER_QUERY = 100
+
+    # Link types reported for GitHub links, by kind
+    GITHUB_TYPES = {"merge_request": "Pull Request", "commit": "Commit", "branch_file": "Branch/File"}
+
+    def __init__(self, gitlab_client, max_workers: int = 8):
+        self.gitlab_client = gitlab_client
+        self.max_workers = max_workers
+
+        self._projects: Dict[str, Any] = {}
+        self._projects_lock = threading.Lock()
+        self._results: Dict[str, Dict[str, str]] = {}
+
+    def _project(self, project_path: str):
+        """Return a cached lazy project handle"""
+        with self._projects_lock:
+            project = self._projects.get(project_path)
+            if project is None:
+                project = self.gitlab_client.projects.get(project_path, lazy=True)
+                self._projects[project_path] = project
+            return project
+
+    def _resolve_merge_requests(self, project_path: str, urls_by_iid: Dict[str, List[str]]) -> Dict[str, Dict[str, str]]:
+        """Fetch all referenced merge requests of one project with batched iids[] queries"""
+        results = {}
+        iids = list(urls_by_iid)
+        try:
+            project = self._project(project_path)
+            for start in range(0, len(iids), self.MAX_IIDS_PER_QUERY):
+                batch = iids[start:start + self.MAX_IIDS_PER_QUERY]
+                for mr in project.mergerequests.list(iids=[int(iid) for iid in batch], get_all=True):
+                    for url in urls_by_iid.get(str(mr.iid), []):
+                        results[url] = {
+                            "url": url,
+                            "type": "Merge Request",
+                            "status": mr.state.capitalize(),
+                            "title": mr.title,
+                            "author": mr.author.get('name', 'Unknown')
+                        }
+        except Exception as e:
+            logger.error(f"Error getting MR info for {project_path}: {e}")
+
+        # Merge requests that were not returned (deleted, no access) stay unknown
+        for urls in urls_by_iid.values():
+            for url in urls:
+                results.setdefault(url, {"url": url, "type": "Merge Request", "status": "Unknown"})
+        return results
+
+    def _resolve_commit(self, project_path: str, sha: str, urls: List[str]) -> Dict[str, Dict[str, str]]:
+        """Fetch one commit (GitLab has no bulk commit lookup)"""
+        try:
+            commit = self._project(project_path).commits.get(sha)
+            info = {"type": "Commit", "status": "Committed", "title": commit.title, "author": commit.author_name}
+        except Exception as e:
+            logger.error(f"Error getting commit info: {e}")
+            info = {"type": "Commit", "status": "Unknown"}
+        return {url: {"url": url, **info} for url in urls}
+
+    def resolve(self, links: Iterable[GitLink],
+                progress: Optional[Callable[[int], None]] = None) -> Dict[str, Dict[str, str]]:
+        """
+        Resolve link metadata for a set of links
+
+        Args:
+            links: Git links from GitLinkExtractor, duplicates allowed
+            progress: Optional callback receiving the number of URLs resolved
+                so far, called as lookups complete
+
+        Returns:
+            Dictionary mapping every URL to its link information
+        """
+        merge_requests: Dict[str, Dict[str, List[str]]] = {}
+        commits: Dict[Tuple[str, str], List[str]] = {}
+
+        for link in dict.fromkeys(links):
+            url = link.url
+            if url in self._results:
+                continue
+
+            if link.provider == 'github':
+                self._results[url] = {"url": url, "type": self.GITHUB_TYPES[link.kind], "status": "Linked"}
+            elif link.kind == 'merge_request':
+                merge_requests.setdefault(link.project, {}).setdefault(link.ref, []).append(url)
+            elif link.kind == 'commit':
+                commits.setdefault((link.project, link.ref), []).append(url)
+            elif link.kind == 'branch_file':
+                self._results[url] = {"url": url, "type": "Branch/File", "status": "Active"}
+            else:
+                self._results[url] = {"url": url, "type": "Repository", "status": "Active"}
+
+        jobs = [(self._resolve_merge_requests, project_path, urls_by_iid)
+                for project_path, urls_by_iid in merge_requests.items()]
+        jobs += [(self._resolve_commit, project_path, sha, urls)
+                 for (project_path, sha), urls in commits.items()]
+
+        if jobs:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+                for resolved in executor.map(lambda job: job[0](*job[1:]), jobs):
+                    self._results.update(resolved)
+                    if progress:
+                        progress(len(self._results))
+
+        logger.info(f"Resolved merge requests in {len(merge_requests)} projects and {len(commits)} commits")
+        return self._results
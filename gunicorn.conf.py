@@ -0,0 +1,24 @@
+"""
+Gunicorn Configuration
+Runs the app in a single worker process with a pool of request threads
+"""
+
+import os
+
+# Analysis jobs, paged SQL result cursors and cancellable queries live in
+# process memory, so a follow-up request must reach the worker that started
+# them. Concurrency comes from threads within that one worker.
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = 1
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+
+
+def on_starting(server):
+    """Refuse to start with more than one worker"""
+    if server.cfg.workers != 1:
+        raise RuntimeError(
+            f"DevInfoTracker keeps request state in process memory and must run "
+            f"with a single worker (got --workers {server.cfg.workers}); "
+            f"raise GUNICORN_THREADS or --threads instead"
+        )
@@ -0,0 +1,249 @@
+"""
+Background Microservice Health Monitor
+Periodically probes every microservice declared in the inventory and caches the results
+"""
+
+import time
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from health_service import HealthCheckService
+from inventory_store import InventoryStore
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Scheduler that keeps a cached health status for every microservice URL"""
+
+    def __init__(self, inventory_store: InventoryStore, health_service: HealthCheckService,
+                 interval: float = 60, jitter: float = 0.1, max_backoff: float = 900,
+                 history_size: int = 10, max_workers: int = 8):
+        self.inventory_store = inventory_store
+        self.health_service = health_service
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.history_size = history_size
+        self.max_workers = max_workers
+
+        # Targets are keyed by server_url so a URL shared by several
+        # environments is only probed once per cycle
+        self._targets: Dict[str, Dict[str, Any]] = {}
+        self._inventory_version = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        """Start the scheduler thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='health-monitor')
+        self._thread = threading.Thread(target=self._run, name='health-monitor', daemon=True)
+        self._thread.start()
+        logger.info(f"Health monitor started (interval {self.interval}s)")
+
+    def stop(self) -> None:
+        """Stop the scheduler thread and wait for in-flight probes"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _iter_microservices(self, data: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+        """Yield every microservice declared in the product hierarchy"""
+        for product in data.get('products', []):
+            for base in product.get('bases', []):
+                for version in base.get('versions', []):
+                    for env in version.get('environments', []):
+                        for service in env.get('microservices', []):
+                            yield service
+
+    def _sync_targets(self) -> None:
+        """Add and remove probe targets when the inventory changes"""
+        data, version = self.inventory_store.snapshot()
+        if version == self._inventory_version:
+            return
+
+        services_by_url: Dict[str, List[str]] = {}
+        for service in self._iter_microservices(data):
+            server_url = service.get('server_url')
+            if server_url:
+                names = services_by_url.setdefault(server_url, [])
+                if service.get('name') and service['name'] not in names:
+                    names.append(service['name'])
+
+        now = time.monotonic()
+        with self._lock:
+            for server_url in list(self._targets):
+                if server_url not in services_by_url:
+                    del self._targets[server_url]
+
+            for server_url, names in services_by_url.items():
+                target = self._targets.get(server_url)
+                if target:
+                    target["services"] = names
+                    continue
+
+                self._targets[server_url] = {
+                    "server_url": server_url,
+                    "services": names,
+                    "status": "unknown",
+                    "latency_ms": None,
+                    "http_status": None,
+                    "error": None,
+                    "checked_at": None,
+                    "consecutive_failures": 0,
+                    "history": deque(maxlen=self.history_size),
+                    "in_flight": False,
+                    # Spread the first round of probes instead of firing them all at once
+                    "next_due": now + random.uniform(0, self.jitter * self.interval)
+                }
+
+        self._inventory_version = version
+        logger.info(f"Health monitor tracking {len(services_by_url)} microservice URLs")
+
+    def _next_delay(self, consecutive_failures: int) -> float:
+        """Return the jittered delay before the next probe of a target"""
+        delay = min(self.interval * (2 ** consecutive_failures), max(self.max_backoff, self.interval))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _probe_target(self, server_url: str, service_name: str) -> None:
+        """Probe one target and record the outcome"""
+        try:
+            result = self.health_service.probe(service_name, server_url)
+        except Exception as e:
+            logger.error(f"Health probe failed for {server_url}: {e}")
+            result = {"status": "offline", "latency_ms": None, "http_status": None, "error": type(e).__name__}
+        checked_at = time.time()
+
+        with self._lock:
+            target = self._targets.get(server_url)
+            if target is None:
+                # Removed from the inventory while the probe was running
+                return
+
+            target["status"] = result["status"]
+            target["latency_ms"] = result["latency_ms"]
+            target["http_status"] = result["http_status"]
+            target["error"] = result["error"]
+            target["checked_at"] = checked_at
+            target["history"].append({
+                "status": result["status"],
+                "latency_ms": result["latency_ms"],
+                "checked_at": checked_at
+            })
+
+            if result["status"] == "online":
+                target["consecutive_failures"] = 0
+            else:
+                target["consecutive_failures"] += 1
+
+            target["next_due"] = time.monotonic() + self._next_delay(target["consecutive_failures"])
+            target["in_flight"] = False
+
+    def _run(self) -> None:
+        """Scheduler loop: dispatch due probes, then sleep until the next one"""
+        while not self._stop_event.is_set():
+            try:
+                self._sync_targets()
+
+                now = time.monotonic()
+                due = []
+                next_wakeup = now + self.interval
+                with self._lock:
+                    for server_url, target in self._targets.items():
+                        if target["in_flight"]:
+                            continue
+                        if target["next_due"] <= now:
+                            target["in_flight"] = True
+                            due.append((server_url, target["services"][0] if target["services"] else server_url))
+                        else:
+                            next_wakeup = min(next_wakeup, target["next_due"])
+
+                for server_url, service_name in due:
+                    self._executor.submit(self._probe_target, server_url, service_name)
+
+                # Wake at least once a second to pick up inventory changes
+                self._stop_event.wait(min(max(next_wakeup - time.monotonic(), 0.1), 1.0))
+
+            except Exception as e:
+                logger.error(f"Error in health monitor loop: {e}")
+                self._stop_event.wait(1.0)
+
+    def _serialize(self, target: Dict[str, Any], now: float, monotonic_now: float) -> Dict[str, Any]:
+        """Convert a target into a JSON-friendly status entry"""
+        checked_at = target["checked_at"]
+        age_seconds = round(now - checked_at, 1) if checked_at else None
+
+        # A result is stale once its next probe (including backoff) is
+        # overdue by more than a full interval, e.g. the scheduler stalled
+        stale = checked_at is None or monotonic_now > target["next_due"] + self.interval
+
+        return {
+            "server_url": target["server_url"],
+            "services": list(target["services"]),
+            "status": target["status"],
+            "latency_ms": target["latency_ms"],
+            "http_status": target["http_status"],
+            "error": target["error"],
+            "checked_at": datetime.fromtimestamp(checked_at, timezone.utc).isoformat() if checked_at else None,
+            "age_seconds": age_seconds,
+            "stale": stale,
+            "consecutive_failures": target["consecutive_failures"],
+            "history": [
+                {
+                    "status": entry["status"],
+                    "latency_ms": entry["latency_ms"],
+                    "checked_at": datetime.fromtimestamp(entry["checked_at"], timezone.utc).isoformat()
+                }
+                for entry in target["history"]
+            ]
+        }
+
+    def get_status(self, server_urls: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Return cached health status without probing anything
+
+        Args:
+            server_urls: Optional list of URLs to restrict the result to
+
+        Returns:
+            Dictionary mapping server_url to its cached status entry
+        """
+        now = time.time()
+        monotonic_now = time.monotonic()
+        with self._lock:
+            if server_urls is None:
+                targets = self._targets.values()
+            else:
+                targets = [self._targets[url] for url in server_urls if url in self._targets]
+            return {target["server_url"]: self._serialize(target, now, monotonic_now) for target in targets}
+
+    def get_info(self) -> Dict[str, Any]:
+        """Return scheduler settings and state"""
+        with self._lock:
+            target_count = len(self._targets)
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "targets": target_count
+        }
@@ -0,0 +1,190 @@
+"""
+Microservice Health Check Service
+Probes microservice URLs concurrently over a shared, pooled HTTP session
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fanout import fan_out
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class HealthCheckService:
+    """Service for checking microservice availability"""
+
+    # Redirects and 404s still prove the server is up and answering
+    ONLINE_STATUS_CODES = {200, 301, 302, 404}
+
+    # Bodies up to this size are read so the connection can be reused;
+    # anything larger is cheaper to drop with its connection
+    MAX_DRAIN_BYTES = 64 * 1024
+
+    def __init__(self, max_workers: int = 16, per_host_connections: int = 4,
+                 probe_timeout: float = 5, deadline: float = 15):
+        self.max_workers = max_workers
+        self.per_host_connections = per_host_connections
+        self.probe_timeout = probe_timeout
+        self.deadline = deadline
+
+        # Keep-alive session shared by all probes; up to per_host_connections
+        # idle connections are kept per host. The number of simultaneous
+        # probes per host is capped by _host_slots, not by the pool.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=max_workers,
+            pool_maxsize=per_host_connections,
+            pool_block=False,
+            max_retries=0
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='health-probe')
+
+        # scheme://host:port -> semaphore bounding concurrent probes to it
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+
+    def _host_slot(self, server_url: str) -> threading.BoundedSemaphore:
+        """Return the semaphore limiting concurrent probes to the URL's host"""
+        parts = urlsplit(server_url)
+        host = f"{parts.scheme}://{parts.netloc}".lower()
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_connections)
+            return slot
+
+    def probe(self, service_name: str, server_url: str) -> Dict[str, Any]:
+        """
+        Probe a single microservice URL
+
+        Args:
+            service_name: Name of the microservice
+            server_url: URL to send the GET request to
+
+        Returns:
+            Dictionary with name, status, latency_ms, http_status and error
+        """
+        result = {
+            "name": service_name,
+            "status": "offline",
+            "latency_ms": None,
+            "http_status": None,
+            "error": None
+        }
+
+        with self._host_slot(server_url):
+            # Timed after the slot is taken so queueing is not counted
+            started = time.perf_counter()
+            try:
+                # stream=True defers the body; only the status matters
+                response = self.session.get(
+                    server_url,
+                    timeout=(min(3, self.probe_timeout), self.probe_timeout),
+                    allow_redirects=True,
+                    stream=True
+                )
+                # Measured before the body is drained
+                result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                result["http_status"] = response.status_code
+                if response.status_code in self.ONLINE_STATUS_CODES:
+                    result["status"] = "online"
+                self._release(response)
+            except requests.exceptions.RequestException as e:
+                result["error"] = type(e).__name__
+                result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        return result
+
+    def _release(self, response: requests.Response) -> None:
+        """
+        Drain a small response body so its connection goes back to the pool
+
+        A fully read response is released for keep-alive by close(); one
+        whose body is too large or fails to arrive has its socket closed.
+        """
+        drained = 0
+        try:
+            for chunk in response.iter_content(8192):
+                drained += len(chunk)
+                if drained > self.MAX_DRAIN_BYTES:
+                    break
+        except requests.exceptions.RequestException:
+            pass
+        finally:
+            response.close()
+
+    def iter_health(self, microservices: List[Dict], deadline: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Probe microservices concurrently, yielding each result as it completes
+
+        Services still pending when the deadline expires are yielded as
+        offline with a "deadline exceeded" error.
+
+        Args:
+            microservices: List of microservice dictionaries (name, server_url)
+            deadline: Overall time budget in seconds (defaults to self.deadline)
+
+        Yields:
+            Probe result dictionaries
+        """
+        deadline = self.deadline if deadline is None else deadline
+        calls = []
+        invalid = []
+
+        for service in microservices:
+            service_name = service.get('name')
+            server_url = service.get('server_url')
+
+            if not service_name or not server_url:
+                invalid.append({
+                    "name": service_name or 'unknown',
+                    "status": "offline",
+                    "latency_ms": None,
+                    "http_status": None,
+                    "error": "Missing name or server_url"
+                })
+                continue
+
+            calls.append((service_name, partial(self.probe, service_name, server_url)))
+
+        probes = fan_out(self._executor, calls, deadline)
+        yield from invalid
+
+        for service_name, future in probes:
+            if future is not None:
+                yield future.result()
+                continue
+            yield {
+                "name": service_name,
+                "status": "offline",
+                "latency_ms": None,
+                "http_status": None,
+                "error": "Deadline exceeded"
+            }
+
+    def check_health(self, microservices: List[Dict], deadline: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Probe microservices concurrently and collect all results
+
+        Args:
+            microservices: List of microservice dictionaries (name, server_url)
+            deadline: Overall time budget in seconds (defaults to self.deadline)
+
+        Returns:
+            Dictionary mapping service name to its probe result
+        """
+        return {result["name"]: result for result in self.iter_health(microservices, deadline)}
@@ -0,0 +1,174 @@
+"""
+Inventory Store for the Product Hierarchy
+Parses data.yaml once and reloads it only when the file changes on disk
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # libyaml not available, fall back to the pure Python loader
+    from yaml import SafeLoader
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class InventoryStore:
+    """Thread-safe, change-aware cache of the parsed inventory YAML file"""
+
+    def __init__(self, path: str = 'data.yaml'):
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._content_hash: Optional[str] = None
+        self._version = 0
+
+        # Counters exposed through get_stats()
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._errors = 0
+
+    @staticmethod
+    def _empty_inventory() -> Dict[str, Any]:
+        """Inventory returned when the file is missing or has never parsed"""
+        return {"products": [], "jenkins_jobs": []}
+
+    def _stat_signature(self) -> Tuple[int, int]:
+        """Return the (mtime_ns, size) pair used to detect file changes"""
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Return the parsed inventory, reloading it only if the file changed
+
+        The returned dictionary is shared between callers and must be treated
+        as read-only.
+
+        Returns:
+            Parsed inventory dictionary
+        """
+        return self.snapshot()[0]
+
+    def snapshot(self) -> Tuple[Dict[str, Any], int]:
+        """
+        Return the parsed inventory together with its version
+
+        Both are read under the lock, so data derived from the inventory can
+        be labelled with the version it was actually built from.
+
+        Returns:
+            Tuple of (parsed inventory dictionary, version); the version is -1
+            for the empty inventory returned while no copy could be loaded
+        """
+        try:
+            signature = self._stat_signature()
+        except FileNotFoundError:
+            logger.error(f"{self.path} file not found")
+            with self._lock:
+                self._misses += 1
+                self._errors += 1
+            return self._empty_inventory(), -1
+
+        with self._lock:
+            if self._data is not None and signature == self._signature:
+                self._hits += 1
+                return self._data, self._version
+
+            self._misses += 1
+            data = self._load(signature)
+            return data, self._version if data is self._data else -1
+
+    def _load(self, signature: Tuple[int, int]) -> Dict[str, Any]:
+        """
+        Read and parse the inventory file; caller must hold the lock
+
+        Args:
+            signature: Stat signature observed before reading
+
+        Returns:
+            Parsed inventory dictionary (or the last good copy on error)
+        """
+        try:
+            with open(self.path, 'rb') as file:
+                raw = file.read()
+        except OSError as e:
+            logger.error(f"Error reading {self.path}: {e}")
+            self._errors += 1
+            return self._data if self._data is not None else self._empty_inventory()
+
+        content_hash = hashlib.sha1(raw).hexdigest()
+        if self._data is not None and content_hash == self._content_hash:
+            # File was touched but its content is unchanged
+            self._signature = signature
+            return self._data
+
+        try:
+            data = yaml.load(raw, Loader=SafeLoader) or {}
+        except yaml.YAMLError as e:
+            logger.error(f"Error parsing YAML: {e}")
+            self._errors += 1
+            return self._data if self._data is not None else self._empty_inventory()
+
+        self._data = data
+        self._signature = signature
+        self._content_hash = content_hash
+        self._version += 1
+        self._reloads += 1
+        logger.info(f"Loaded inventory from {self.path} (version {self._version})")
+        return data
+
+    def iter_environments(self, path: Optional[Sequence[str]] = None) -> Iterator[Tuple[List[str], Dict[str, Any]]]:
+        """
+        Yield every environment in the product hierarchy
+
+        Args:
+            path: Optional [product, base, version, environment] prefix; only
+                environments under it are yielded
+
+        Yields:
+            Tuples of ([product, base, version, environment] names, environment dict)
+        """
+        path = list(path or [])
+        for product in self.get().get('products', []):
+            for base in product.get('bases', []):
+                for version in base.get('versions', []):
+                    for env in version.get('environments', []):
+                        names = [product.get('name'), base.get('name'), version.get('name'), env.get('name')]
+                        if names[:len(path)] == path:
+                            yield names, env
+
+    @property
+    def version(self) -> int:
+        """Monotonic counter incremented every time new content is parsed"""
+        return self._version
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return cache counters for monitoring
+
+        Returns:
+            Dictionary with hit/miss/reload/error counts and current version
+        """
+        with self._lock:
+            return {
+                "path": self.path,
+                "hits": self._hits,
+                "misses": self._misses,
+                "reloads": self._reloads,
+                "errors": self._errors,
+                "version": self._version,
+                "content_hash": self._content_hash,
+                "c_loader": SafeLoader.__name__ == 'CSafeLoader'
+            }
@@ -0,0 +1,258 @@
+"""
+Jira Analysis Cache
+SQLite cache of Jira ticket nodes, child lists and GitLab link metadata
+"""
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class JiraCache:
+    """
+    Persistent cache used by Jira ticket analysis
+
+    Ticket records and child lists stay valid until Jira reports a ticket as
+    updated: before each analysis the service runs one search for tickets
+    updated since the last sync and invalidates the affected entries. GitLab
+    link information in a final state is kept indefinitely, anything else for
+    link_ttl seconds.
+    """
+
+    # Bumped when the layout of stored ticket records, or the way their git
+    # links are extracted, changes
+    SCHEMA_VERSION = 3
+
+    # Every cache table, in the order they are created
+    TABLES = ('tickets', 'expanded', 'relations', 'git_links', 'meta')
+
+    # Link statuses that can no longer change
+    FINAL_LINK_STATUSES = ('Merged', 'Closed', 'Committed')
+
+    def __init__(self, path: str = 'jira_cache.db', link_ttl: float = 300, max_sync_age: float = 7 * 86400):
+        self.path = path
+        self.link_ttl = link_ttl
+        self.max_sync_age = max_sync_age
+
+        self._lock = threading.Lock()
+        # Held for a whole revalidation so concurrent analyses do not repeat it
+        self.sync_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tickets (
+                key TEXT PRIMARY KEY,
+                project TEXT NOT NULL,
+                record TEXT NOT NULL,
+                updated TEXT,
+                cached_at REAL NOT NULL
+            )
+            """)
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS expanded (
+                key TEXT PRIMARY KEY,
+                cached_at REAL NOT NULL
+            )
+            """)
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS relations (
+                key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                child TEXT NOT NULL,
+                PRIMARY KEY (key, position)
+            )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS relations_child ON relations (child)")
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS git_links (
+                url TEXT PRIMARY KEY,
+                info TEXT NOT NULL,
+                final INTEGER NOT NULL,
+                cached_at REAL NOT NULL
+            )
+            """)
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            )
+            """)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                # Rows written by another version may have a different layout
+                for table in self.TABLES:
+                    self._conn.execute(f"DELETE FROM {table}")
+                self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def last_sync(self) -> Optional[float]:
+        """Return the wall-clock time the cached tickets were last revalidated"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'last_sync'").fetchone()
+        return row[0] if row else None
+
+    def mark_synced(self, synced_at: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('last_sync', ?)", (synced_at,)
+            )
+
+    def projects(self) -> List[str]:
+        """Return the Jira projects that have cached tickets"""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT project FROM tickets ORDER BY project").fetchall()
+        return [row[0] for row in rows]
+
+    def invalidate(self, keys: Iterable[str], related_keys: Iterable[str]) -> int:
+        """
+        Drop updated tickets and every child list they may appear in
+
+        Args:
+            keys: Tickets Jira reports as updated
+            related_keys: Current parents, epics and linked tickets of the
+                updated tickets, whose child lists may have gained an entry
+
+        Returns:
+            Number of child lists dropped
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return 0
+
+        with self._lock, self._conn:
+            key_params = ', '.join('?' * len(keys))
+            # Lists that still name an updated ticket may have lost it
+            stale = {row[0] for row in self._conn.execute(
+                f"SELECT DISTINCT key FROM relations WHERE child IN ({key_params})", keys
+            )}
+            stale.update(keys)
+            stale.update(related_keys)
+
+            self._conn.execute(f"DELETE FROM tickets WHERE key IN ({key_params})", keys)
+            stale = list(stale)
+            for start in range(0, len(stale), 500):
+                batch = stale[start:start + 500]
+                params = ', '.join('?' * len(batch))
+                self._conn.execute(f"DELETE FROM expanded WHERE key IN ({params})", batch)
+                self._conn.execute(f"DELETE FROM relations WHERE key IN ({params})", batch)
+
+        logger.info(f"Invalidated {len(keys)} updated tickets and {len(stale)} child lists in the Jira cache")
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tickets")
+            self._conn.execute("DELETE FROM expanded")
+            self._conn.execute("DELETE FROM relations")
+
+    def get_tickets(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return the cached records of the given tickets that are present"""
+        keys = list(keys)
+        records = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, record FROM tickets WHERE key IN ({', '.join('?' * len(batch))})", batch
+                ).fetchall()
+                records.update((key, json.loads(record)) for key, record in rows)
+        return records
+
+    def put_tickets(self, records: Dict[str, Dict[str, Any]]) -> None:
+        """Store ticket records, each carrying the ticket's Jira "updated" timestamp"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tickets (key, project, record, updated, cached_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (key, key.rsplit('-', 1)[0], json.dumps(record), record.get("updated"), now)
+                    for key, record in records.items()
+                ]
+            )
+
+    def get_children(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Return the cached child lists of the given tickets that are present"""
+        keys = list(keys)
+        children: Dict[str, List[str]] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                params = ', '.join('?' * len(batch))
+                for (key,) in self._conn.execute(f"SELECT key FROM expanded WHERE key IN ({params})", batch):
+                    children[key] = []
+                for key, child in self._conn.execute(
+                    f"SELECT key, child FROM relations WHERE key IN ({params}) ORDER BY key, position", batch
+                ):
+                    children[key].append(child)
+        return children
+
+    def put_children(self, children: Dict[str, List[str]]) -> None:
+        """Store complete child lists (children, epic issues and linked tickets)"""
+        now = time.time()
+        with self._lock, self._conn:
+            for key, child_keys in children.items():
+                self._conn.execute("DELETE FROM relations WHERE key = ?", (key,))
+                self._conn.executemany(
+                    "INSERT INTO relations (key, position, child) VALUES (?, ?, ?)",
+                    [(key, position, child) for position, child in enumerate(child_keys)]
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO expanded (key, cached_at) VALUES (?, ?)", (key, now)
+                )
+
+    def get_links(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return cached link information that is final or younger than link_ttl"""
+        urls = list(urls)
+        links = {}
+        cutoff = time.time() - self.link_ttl
+        with self._lock:
+            for start in range(0, len(urls), 500):
+                batch = urls[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT url, info FROM git_links WHERE url IN ({', '.join('?' * len(batch))}) "
+                    f"AND (final = 1 OR cached_at >= ?)",
+                    batch + [cutoff]
+                ).fetchall()
+                links.update((url, json.loads(info)) for url, info in rows)
+        return links
+
+    def put_links(self, links: Dict[str, Dict[str, Any]]) -> None:
+        """Store resolved link information; lookups that failed are not cached"""
+        now = time.time()
+        rows: List[Tuple[str, str, int, float]] = [
+            (url, json.dumps(info), int(info.get("status") in self.FINAL_LINK_STATUSES), now)
+            for url, info in links.items()
+            if info.get("status") != "Unknown"
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO git_links (url, info, final, cached_at) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tickets = self._conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+            expanded = self._conn.execute("SELECT COUNT(*) FROM expanded").fetchone()[0]
+            links = self._conn.execute("SELECT COUNT(*) FROM git_links").fetchone()[0]
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'last_sync'").fetchone()
+        return {
+            "path": self.path,
+            "tickets": tickets,
+            "child_lists": expanded,
+            "git_links": links,
+            "last_sync": row[0] if row else None,
+            "link_ttl": self.link_ttl
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -4,21 +4,58 @@ Handles ticket hierarchy analysis and git link extraction
 """
 
 import os
-import re
+import time
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from jira import JIRA
 import gitlab
 import requests
-from urllib.parse import urlparse
+from git_links import GitLink, GitLinkExtractor
+from gitlab_resolver import GitLinkResolver
+from jira_cache import JiraCache
+from rate_limiter import RateLimitedAdapter, TokenBucket
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _configure_session(session: requests.Session, pool_size: int, bucket: TokenBucket, max_retries: int) -> None:
+    """
+    Size a shared client's connection pool, rate limit it and resend once on 401
+    
+    A long-lived session can hold an expired server session cookie; on a 401
+    the cookies are dropped and the request is sent again with just the
+    configured credentials.
+    """
+    adapter = RateLimitedAdapter(bucket, max_retries=max_retries, pool_connections=4, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    
+    def resend_on_unauthorized(response, *args, **kwargs):
+        request = response.request
+        if response.status_code != 401 or getattr(request, 'reauthenticated', False):
+            return response
+        logger.info(f"Got 401 from {request.url}, re-authenticating")
+        session.cookies.clear()
+        retry = request.copy()
+        retry.headers.pop('Cookie', None)
+        retry.reauthenticated = True
+        response.close()
+        return session.send(retry, **kwargs)
+    
+    session.hooks['response'].append(resend_on_unauthorized)
+
+
 class JiraGitLabService:
     """Service for integrating Jira and GitLab APIs"""
     
+    # Fields loaded for every ticket in the hierarchy
+    HIERARCHY_FIELDS = ('issuetype', 'summary', 'status', 'assignee', 'parent', 'issuelinks',
+                        'description', 'reporter', 'comment', 'updated')
+    
     def __init__(self):
         # Jira configuration
         self.jira_url = os.environ.get('JIRA_URL', 'https://your-company.atlassian.net')
@@ -29,67 +66,135 @@ class JiraGitLabService:
         self.gitlab_url = os.environ.get('GITLAB_URL', 'https://gitlab.com')
         self.gitlab_token = os.environ.get('GITLAB_TOKEN', '')
         
-        # Initialize clients
+        # Clients are created on first use and shared by all requests
         self.jira_client = None
         self.gitlab_client = None
+        self._client_lock = threading.Lock()
+        # Set when a client's credentials were rejected; it is then rebuilt
+        # and verified again on next use
+        self._jira_rejected = False
+        self._gitlab_rejected = False
+        self._epic_link_field_id: Optional[str] = None
+        
+        # Hierarchy traversal: tickets per batched JQL search and searches
+        # run concurrently for one level
+        self.hierarchy_batch_size = int(os.environ.get('JIRA_HIERARCHY_BATCH_SIZE', '25'))
+        self.hierarchy_concurrency = int(os.environ.get('JIRA_MAX_CONCURRENCY', '4'))
+        
+        # Concurrent GitLab lookups when resolving git links
+        self.gitlab_concurrency = int(os.environ.get('GITLAB_MAX_CONCURRENCY', '8'))
         
-        # Git link patterns for GitLab
-        self.git_link_patterns = [
-            r'https?://[^/]+/[^/]+/[^/]+/-/merge_requests/\d+',
-            r'https?://[^/]+/[^/]+/[^/]+/-/commit/[a-f0-9]+',
-            r'https?://[^/]+/[^/]+/[^/]+/-/tree/[^/\s]+',
-            r'https?://[^/]+/[^/]+/[^/]+/-/blob/[^/\s]+',
-            r'https?://[^/]+/[^/]+/[^/]+/-/compare/[^/\s]+',
-        ]
+        # One request budget per upstream, shared by every analysis; 429s and
+        # transient errors are retried with backoff
+        self.jira_rate_limiter = TokenBucket('Jira', float(os.environ.get('JIRA_RATE_LIMIT', '10')))
+        self.gitlab_rate_limiter = TokenBucket('GitLab', float(os.environ.get('GITLAB_RATE_LIMIT', '10')))
+        self.api_max_retries = int(os.environ.get('API_MAX_RETRIES', '5'))
+        
+        # Persistent cache of tickets, child lists and git link info; an
+        # empty path disables it
+        self.cache = None
+        cache_path = os.environ.get('JIRA_CACHE_PATH', 'jira_cache.db')
+        if cache_path:
+            self.cache = JiraCache(
+                cache_path,
+                link_ttl=float(os.environ.get('JIRA_CACHE_LINK_TTL', '300')),
+                max_sync_age=float(os.environ.get('JIRA_CACHE_MAX_SYNC_AGE', str(7 * 86400)))
+            )
+        
+        # GitLab and GitHub link extraction, optionally limited to some hosts;
+        # links on hosts not listed as GitHub are treated as GitLab links
+        self.git_link_extractor = GitLinkExtractor(
+            os.environ.get('GIT_LINK_HOSTS', '').split(','),
+            os.environ.get('GITHUB_HOSTS', 'github.com').split(',')
+        )
     
     def _initialize_jira_client(self) -> bool:
-        """Initialize Jira client with authentication"""
-        try:
-            if not self.jira_username or not self.jira_api_token:
-                logger.error("Jira credentials not configured")
+        """Create the shared Jira client on first use, verifying the credentials once"""
+        with self._client_lock:
+            if self.jira_client is not None and not self._jira_rejected:
+                return True
+            
+            try:
+                if not self.jira_username or not self.jira_api_token:
+                    logger.error("Jira credentials not configured")
+                    return False
+                
+                client = JIRA(
+                    server=self.jira_url,
+                    basic_auth=(self.jira_username, self.jira_api_token),
+                    get_server_info=False
+                )
+                _configure_session(client._session, self.hierarchy_concurrency + 1,
+                                   self.jira_rate_limiter, self.api_max_retries)
+                
+                # Test connection
+                client.current_user()
+                self.jira_client = client
+                self._jira_rejected = False
+                logger.info("Jira client initialized successfully")
+                return True
+                
+            except Exception as e:
+                logger.error(f"Failed to initialize Jira client: {e}")
                 return False
-            
-            self.jira_client = JIRA(
-                server=self.jira_url,
-                basic_auth=(self.jira_username, self.jira_api_token)
-            )
-            
-            # Test connection
-            self.jira_client.current_user()
-            logger.info("Jira client initialized successfully")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize Jira client: {e}")
-            return False
     
     def _initialize_gitlab_client(self) -> bool:
-        """Initialize GitLab client with authentication"""
-        try:
-            if not self.gitlab_token:
-                logger.error("GitLab token not configured")
+        """Create the shared GitLab client on first use, verifying the token once"""
+        with self._client_lock:
+            if self.gitlab_client is not None and not self._gitlab_rejected:
+                return True
+            
+            try:
+                if not self.gitlab_token:
+                    logger.error("GitLab token not configured")
+                    return False
+                
+                client = gitlab.Gitlab(
+                    url=self.gitlab_url,
+                    private_token=self.gitlab_token
+                )
+                _configure_session(client.session, self.gitlab_concurrency,
+                                   self.gitlab_rate_limiter, self.api_max_retries)
+                
+                # Test connection
+                client.auth()
+                self.gitlab_client = client
+                self._gitlab_rejected = False
+                logger.info("GitLab client initialized successfully")
+                return True
+                
+            except Exception as e:
+                logger.error(f"Failed to initialize GitLab client: {e}")
                 return False
-            
-            self.gitlab_client = gitlab.Gitlab(
-                url=self.gitlab_url,
-                private_token=self.gitlab_token
-            )
-            
-            # Test connection
-            self.gitlab_client.auth()
-            logger.info("GitLab client initialized successfully")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize GitLab client: {e}")
-            return False
     
-    def analyze_jira_ticket(self, ticket_id: str) -> Dict[str, Any]:
+    def _check_rejected_credentials(self, error: Exception) -> None:
+        """Flag a client for rebuilding if the error is a 401 that survived re-authentication"""
+        # Analyses running concurrently keep the current client until it is replaced
+        with self._client_lock:
+            if getattr(error, 'status_code', None) == 401:
+                self._jira_rejected = True
+            if getattr(error, 'response_code', None) == 401:
+                self._gitlab_rejected = True
+    
+    def analyze_jira_ticket(self, ticket_id: str, progress: Optional[Callable[..., None]] = None,
+                            on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
         Analyze a Jira ticket and its hierarchy, extracting git links from comments
         
         Args:
             ticket_id: The Jira ticket ID to analyze
+            progress: Optional callback receiving progress updates as keyword
+                arguments (stage, ticketsVisited, depth, linksTotal, linksResolved)
+            on_event: Optional callback receiving events as the hierarchy is
+                loaded, each a dictionary with a "type" key:
+                ticket: {"parent", "ticket"} for every node of the final
+                    hierarchy, parents before children and siblings in order;
+                    repeated tickets arrive flagged cyclicReference or
+                    duplicateReference
+                fetchError: {"key", "error"} when a ticket's relations could
+                    not be loaded
+                links: {"key", "gitLinks"} for every ticket with git links,
+                    once resolved
             
         Returns:
             Dictionary containing analysis results
@@ -100,15 +205,29 @@ class JiraGitLabService:
         if not self._initialize_gitlab_client():
             return {"error": "Failed to connect to GitLab"}
         
+        progress = progress or (lambda **values: None)
+        
         try:
-            # Get the root ticket
-            root_ticket = self.jira_client.issue(ticket_id)
+            progress(stage="hierarchy", ticketsVisited=0)
+            use_cache = self._revalidate_cache()
             
-            # Build the hierarchy
-            ticket_hierarchy = self._build_ticket_hierarchy(root_ticket)
+            # Get the root ticket
+            root_record = None
+            if use_cache:
+                root_record = self.cache.get_tickets([ticket_id.strip().upper()]).get(ticket_id.strip().upper())
+            if root_record is None:
+                root_ticket = self.jira_client.issue(ticket_id, fields=','.join(self._hierarchy_fields()))
+                root_record = self._ticket_record(root_ticket)
+                self._cache_tickets({root_record["key"]: root_record})
+            
+            # Build the hierarchy; every ticket is loaded with its description
+            # and comments so link extraction needs no further Jira calls
+            ticket_hierarchy, records = self._build_ticket_hierarchy(root_record, use_cache=use_cache,
+                                                                     progress=progress, on_event=on_event)
             
             # Extract git links from all tickets
-            self._extract_git_links_from_hierarchy(ticket_hierarchy)
+            self._extract_git_links_from_hierarchy(ticket_hierarchy, records, progress=progress, on_event=on_event)
+            progress(stage="summary")
             
             # Calculate summary
             summary = self._calculate_summary(ticket_hierarchy)
@@ -121,217 +240,423 @@ class JiraGitLabService:
             
         except Exception as e:
             logger.error(f"Error analyzing ticket {ticket_id}: {e}")
+            self._check_rejected_credentials(e)
             return {"error": f"Failed to analyze ticket: {str(e)}"}
     
-    def _build_ticket_hierarchy(self, ticket, depth=0, max_depth=10, visited_keys=None) -> Dict[str, Any]:
-        """
-        Recursively build ticket hierarchy with cycle detection
+    def _epic_link_field(self) -> Optional[str]:
+        """Return the custom field ID of "Epic Link" on this Jira instance, if it has one"""
+        if self._epic_link_field_id is None:
+            try:
+                self._epic_link_field_id = next(
+                    (field['id'] for field in self.jira_client.fields() if field.get('name') == 'Epic Link'), ''
+                )
+            except Exception as e:
+                logger.warning(f"Could not look up the Epic Link field: {e}")
+                self._epic_link_field_id = ''
+        return self._epic_link_field_id or None
+    
+    def _hierarchy_fields(self) -> List[str]:
+        """Fields requested for every ticket loaded while building the hierarchy"""
+        fields = list(self.HIERARCHY_FIELDS)
+        epic_field = self._epic_link_field()
+        if epic_field:
+            fields.append(epic_field)
+        return fields
+    
+    def _related_jql(self, keys: List[str]) -> str:
+        """JQL matching the children, epic issues and linked issues of all the given tickets"""
+        key_list = ', '.join(keys)
+        clauses = [f'parent in ({key_list})']
+        if self._epic_link_field():
+            clauses.append(f'"Epic Link" in ({key_list})')
+        clauses.extend(f'issue in linkedIssues({key})' for key in keys)
+        return ' OR '.join(clauses)
+    
+    def _relation_keys(self, issue) -> List[str]:
+        """Return an issue's parent, epic and linked tickets, in that order"""
+        fields = issue.fields
+        related = []
         
-        Args:
-            ticket: Jira ticket object
-            depth: Current depth in hierarchy
-            max_depth: Maximum depth to traverse
-            visited_keys: Set of ticket keys already visited (for cycle detection)
-            
-        Returns:
-            Dictionary representing ticket and its children
-        """
-        if visited_keys is None:
-            visited_keys = set()
+        parent = getattr(fields, 'parent', None)
+        if parent is not None:
+            related.append(parent.key)
         
-        if depth > max_depth:
-            return None
+        epic_field = self._epic_link_field()
+        epic_key = getattr(fields, epic_field, None) if epic_field else None
+        if epic_key and epic_key not in related:
+            related.append(epic_key)
         
-        # Cycle detection
-        if ticket.key in visited_keys:
-            return {
-                "key": ticket.key,
-                "type": ticket.fields.issuetype.name,
-                "summary": ticket.fields.summary,
-                "status": ticket.fields.status.name,
-                "assignee": ticket.fields.assignee.displayName if ticket.fields.assignee else None,
-                "url": f"{self.jira_url}/browse/{ticket.key}",
-                "gitLinks": [],
-                "children": [],
-                "cyclicReference": True,
-                "error": f"Cyclic reference detected - this ticket was already processed at a higher level"
-            }
+        for link in getattr(fields, 'issuelinks', None) or []:
+            other = getattr(link, 'outwardIssue', None) or getattr(link, 'inwardIssue', None)
+            if other is not None and other.key not in related:
+                related.append(other.key)
         
-        # Add current ticket to visited set
-        visited_keys.add(ticket.key)
+        return related
+    
+    def _related_parents(self, issue, keys: set) -> List[str]:
+        """Return which of the queried tickets an issue from a batched search belongs to"""
+        return [key for key in self._relation_keys(issue) if key in keys]
+    
+    def _search_related(self, keys: List[str]) -> List[Any]:
+        """Run one batched search for the related tickets of a group of tickets"""
+        return self.jira_client.search_issues(
+            self._related_jql(keys),
+            maxResults=False,
+            fields=','.join(self._hierarchy_fields())
+        )
+    
+    def _ticket_record(self, ticket) -> Dict[str, Any]:
+        """
+        Reduce a loaded Jira issue to what the analysis needs
+        
+        Records are what the persistent cache stores. Git links are kept as
+        GitLink fields plus commentedBy; they are None if the comments could
+        not be read.
+        """
+        try:
+            links = [{**link._asdict(), "commentedBy": commented_by}
+                     for link, commented_by in self._collect_git_links(ticket)]
+        except Exception as e:
+            logger.error(f"Error extracting git links for {ticket.key}: {e}")
+            links = None
         
-        # Get ticket details
-        ticket_data = {
+        return {
             "key": ticket.key,
             "type": ticket.fields.issuetype.name,
             "summary": ticket.fields.summary,
             "status": ticket.fields.status.name,
             "assignee": ticket.fields.assignee.displayName if ticket.fields.assignee else None,
-            "url": f"{self.jira_url}/browse/{ticket.key}",
+            "updated": getattr(ticket.fields, 'updated', None),
+            "links": links
+        }
+    
+    def _ticket_data(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a ticket record into a hierarchy node without children"""
+        return {
+            "key": record["key"],
+            "type": record["type"],
+            "summary": record["summary"],
+            "status": record["status"],
+            "assignee": record["assignee"],
+            "url": f"{self.jira_url}/browse/{record['key']}",
             "gitLinks": [],
             "children": [],
             "cyclicReference": False
         }
+    
+    def _reference_data(self, record: Dict[str, Any], cyclic: bool) -> Dict[str, Any]:
+        """Node for a repeated ticket: a link back to an ancestor, or one expanded elsewhere"""
+        ticket_data = self._ticket_data(record)
+        if cyclic:
+            ticket_data["cyclicReference"] = True
+            ticket_data["error"] = f"Cyclic reference detected - this ticket was already processed at a higher level"
+        else:
+            ticket_data["duplicateReference"] = True
+        return ticket_data
+    
+    def _build_ticket_hierarchy(self, root_record: Dict[str, Any], max_depth=10, use_cache: bool = False,
+                                progress: Optional[Callable[..., None]] = None,
+                                on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+                                ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        Build the ticket hierarchy breadth-first with cycle detection
         
-        # Get child tickets and linked tickets
-        try:
-            # Search for both child tickets and linked tickets
-            # Child tickets: parent relationship or epic link
-            child_jql = f'parent = {ticket.key} OR "Epic Link" = {ticket.key}'
-            
-            # Linked tickets: issue links (blocks, relates to, etc.)
-            linked_jql = f'issue in linkedIssues({ticket.key})'
-            
-            # Combine both searches
-            combined_jql = f'({child_jql}) OR ({linked_jql})'
-            
-            related_issues = self.jira_client.search_issues(combined_jql, maxResults=200)
+        Each level is loaded with batched JQL searches (run concurrently up to
+        hierarchy_concurrency), and every ticket is fetched exactly once.
+        Tickets whose child list and children are in the persistent cache need
+        no search. A ticket is expanded under the parent that first reached
+        it; a link back to one of its ancestors is reported as a cyclic
+        reference and any other repeated occurrence as a duplicate reference.
+        
+        Args:
+            root_record: Ticket record to start from
+            max_depth: Maximum depth to traverse
+            use_cache: Read child lists and tickets from the persistent cache
+            progress: Optional callback receiving ticketsVisited and depth
+                after each level
+            on_event: Optional callback receiving a ticket event for every
+                node as it is attached, and fetchError events
             
-            for related_issue in related_issues:
-                # Create a copy of visited_keys for this branch
-                branch_visited = visited_keys.copy()
-                child_data = self._build_ticket_hierarchy(related_issue, depth + 1, max_depth, branch_visited)
-                if child_data:
-                    ticket_data["children"].append(child_data)
+        Returns:
+            Tuple of (dictionary representing the root ticket and its children,
+            ticket records by key)
+        """
+        progress = progress or (lambda **values: None)
+        on_event = on_event or (lambda event: None)
+        root_key = root_record["key"]
+        records = {root_key: root_record}
+        children: Dict[str, List[str]] = {}
+        # Parent through which each ticket was first reached
+        tree_parent: Dict[str, str] = {}
+        fetch_errors: Dict[str, str] = {}
+        
+        # Freshly loaded data written back to the cache
+        loaded_records: Dict[str, Dict[str, Any]] = {}
+        loaded_children: Dict[str, List[str]] = {}
+        searches = 0
+        
+        def is_ancestor(candidate: str, key: Optional[str]) -> bool:
+            while key is not None:
+                if key == candidate:
+                    return True
+                key = tree_parent.get(key)
+            return False
+        
+        def attach(parent_key: str, child_key: str, record: Dict[str, Any]) -> None:
+            siblings = children.setdefault(parent_key, [])
+            if child_key in siblings:
+                return
+            siblings.append(child_key)
+            
+            if child_key not in records:
+                records[child_key] = record
+                tree_parent[child_key] = parent_key
+                next_level.append(child_key)
+                child_data = self._ticket_data(record)
+            else:
+                # Classified the same way _assemble_hierarchy will
+                child_data = self._reference_data(records[child_key], is_ancestor(child_key, parent_key))
+            on_event({"type": "ticket", "parent": parent_key, "ticket": child_data})
+        
+        on_event({"type": "ticket", "parent": None, "ticket": self._ticket_data(root_record)})
+        level = [root_key]
+        depth = 0
+        while level and depth < max_depth:
+            next_level: List[str] = []
+            
+            # Expand tickets from the cache when their child list and every child are cached
+            search_keys = level
+            if use_cache:
+                cached_children = self.cache.get_children(level)
+                wanted = {key for child_keys in cached_children.values() for key in child_keys} - records.keys()
+                cached_records = self.cache.get_tickets(wanted)
+                
+                search_keys = []
+                for key in level:
+                    child_keys = cached_children.get(key)
+                    if child_keys is None or any(c not in records and c not in cached_records for c in child_keys):
+                        search_keys.append(key)
+                        continue
+                    for child_key in child_keys:
+                        attach(key, child_key, records.get(child_key) or cached_records[child_key])
+            
+            batches = [
+                search_keys[start:start + self.hierarchy_batch_size]
+                for start in range(0, len(search_keys), self.hierarchy_batch_size)
+            ]
+            searches += len(batches)
+            
+            if batches:
+                with ThreadPoolExecutor(max_workers=min(self.hierarchy_concurrency, len(batches))) as executor:
+                    futures = {executor.submit(self._search_related, batch): batch for batch in batches}
                     
-        except Exception as e:
-            logger.warning(f"Error fetching related tickets for {ticket.key}: {e}")
-            ticket_data["fetchError"] = f"Failed to fetch related tickets: {str(e)}"
+                    # Process batches in submission order so the hierarchy is deterministic
+                    for future, batch in futures.items():
+                        try:
+                            related_issues = future.result()
+                        except Exception as e:
+                            logger.warning(f"Error fetching related tickets for {', '.join(batch)}: {e}")
+                            for key in batch:
+                                fetch_errors[key] = f"Failed to fetch related tickets: {str(e)}"
+                                on_event({"type": "fetchError", "key": key, "error": fetch_errors[key]})
+                            continue
+                        
+                        batch_keys = set(batch)
+                        for related_issue in related_issues:
+                            parent_keys = self._related_parents(related_issue, batch_keys)
+                            if not parent_keys and len(batch) == 1:
+                                parent_keys = batch
+                            if not parent_keys:
+                                logger.debug(f"Could not attribute {related_issue.key} to any of {', '.join(batch)}")
+                                continue
+                            
+                            record = records.get(related_issue.key)
+                            if record is None:
+                                record = self._ticket_record(related_issue)
+                                loaded_records[related_issue.key] = record
+                            for parent_key in parent_keys:
+                                attach(parent_key, related_issue.key, record)
+                        
+                        for key in batch:
+                            loaded_children[key] = list(children.get(key, []))
+            
+            level = next_level
+            depth += 1
+            progress(ticketsVisited=len(records), depth=depth)
         
-        # Remove current ticket from visited set (backtrack)
-        visited_keys.remove(ticket.key)
+        if self.cache is not None:
+            self._cache_tickets(loaded_records)
+            self.cache.put_children(loaded_children)
         
-        return ticket_data
+        logger.info(f"Loaded {len(records)} tickets in {depth} levels under {root_key} "
+                    f"({len(loaded_records)} fetched, {searches} searches)")
+        return self._assemble_hierarchy(root_key, records, children, tree_parent, fetch_errors), records
     
-    def _extract_git_links_from_hierarchy(self, ticket_data: Dict[str, Any]) -> None:
+    def _cache_tickets(self, records: Dict[str, Dict[str, Any]]) -> None:
+        """Store freshly loaded ticket records whose git links could be read"""
+        if self.cache is not None:
+            self.cache.put_tickets({key: record for key, record in records.items() if record["links"] is not None})
+    
+    def _revalidate_cache(self) -> bool:
         """
-        Extract git links from ticket comments and update ticket data
+        Drop cached tickets that Jira reports as updated since the last sync
         
-        Args:
-            ticket_data: Ticket data dictionary to update
+        One search over the projects with cached tickets returns every ticket
+        updated since then, with the relation fields needed to also drop the
+        child lists it may have joined or left.
+        
+        Returns:
+            True if the cache is current and can be read
         """
-        try:
-            # Get the ticket from Jira
-            ticket = self.jira_client.issue(ticket_data["key"])
-            
-            # Extract git links from comments
-            git_links = []
-            comments = self.jira_client.comments(ticket)
-            
-            for comment in comments:
-                links = self._extract_git_links_from_text(comment.body)
-                for link in links:
-                    git_info = self._get_git_link_info(link)
-                    if git_info:
-                        git_info["commentedBy"] = comment.author.displayName
-                        git_links.append(git_info)
-            
-            # Also check description
-            if ticket.fields.description:
-                links = self._extract_git_links_from_text(ticket.fields.description)
-                for link in links:
-                    git_info = self._get_git_link_info(link)
-                    if git_info:
-                        git_info["commentedBy"] = ticket.fields.reporter.displayName if ticket.fields.reporter else "Unknown"
-                        git_links.append(git_info)
-            
-            ticket_data["gitLinks"] = git_links
+        if self.cache is None:
+            return False
+        
+        with self.cache.sync_lock:
+            started = time.time()
+            last_sync = self.cache.last_sync()
+            if last_sync is None or started - last_sync > self.cache.max_sync_age:
+                self.cache.clear()
+                self.cache.mark_synced(started)
+                return True
+            
+            projects = self.cache.projects()
+            if projects:
+                # Relative dates avoid the Jira user's time zone; JQL only
+                # has minute precision, so allow a margin
+                minutes = int((started - last_sync) // 60) + 2
+                project_list = ', '.join(f'"{project}"' for project in projects)
+                fields = ['parent', 'issuelinks'] + ([self._epic_link_field()] if self._epic_link_field() else [])
+                try:
+                    updated = self.jira_client.search_issues(
+                        f'project in ({project_list}) AND updated >= "-{minutes}m"',
+                        maxResults=False,
+                        fields=','.join(fields)
+                    )
+                except Exception as e:
+                    logger.warning(f"Could not revalidate the Jira cache, loading tickets from Jira: {e}")
+                    return False
+                
+                self.cache.invalidate(
+                    [issue.key for issue in updated],
+                    [key for issue in updated for key in self._relation_keys(issue)]
+                )
             
-        except Exception as e:
-            logger.error(f"Error extracting git links for {ticket_data['key']}: {e}")
+            self.cache.mark_synced(started)
+            return True
+    
+    def _assemble_hierarchy(self, root_key: str, records: Dict[str, Dict[str, Any]], children: Dict[str, List[str]],
+                            tree_parent: Dict[str, str], fetch_errors: Dict[str, str]) -> Dict[str, Any]:
+        """Turn the loaded tickets and their relations into the nested hierarchy"""
+        def build(key: str, ancestors: List[str]) -> Dict[str, Any]:
+            ticket_data = self._ticket_data(records[key])
+            if key in fetch_errors:
+                ticket_data["fetchError"] = fetch_errors[key]
+            
+            ancestors.append(key)
+            for child_key in children.get(key, []):
+                if child_key in ancestors:
+                    child_data = self._reference_data(records[child_key], cyclic=True)
+                elif tree_parent.get(child_key) == key:
+                    child_data = build(child_key, ancestors)
+                else:
+                    # Already expanded under the parent that reached it first
+                    child_data = self._reference_data(records[child_key], cyclic=False)
+                ticket_data["children"].append(child_data)
+            ancestors.pop()
+            
+            return ticket_data
+        
+        return build(root_key, [])
+    
+    def _issue_comments(self, ticket) -> List[Any]:
+        """Return a ticket's comments from the loaded comment field, fetching only if it was truncated"""
+        comment_field = getattr(ticket.fields, 'comment', None)
+        if comment_field is None:
+            return self.jira_client.comments(ticket)
         
-        # Recursively process children
-        for child in ticket_data["children"]:
-            self._extract_git_links_from_hierarchy(child)
+        comments = list(getattr(comment_field, 'comments', None) or [])
+        total = getattr(comment_field, 'total', len(comments))
+        if isinstance(total, int) and total > len(comments):
+            return self.jira_client.comments(ticket)
+        return comments
     
-    def _extract_git_links_from_text(self, text: str) -> List[str]:
+    def _collect_git_links(self, ticket) -> List[Tuple[GitLink, str]]:
+        """Find git links in a loaded ticket's comments and description"""
+        git_links = []
+        
+        for comment in self._issue_comments(ticket):
+            for link in self._extract_git_links_from_text(comment.body):
+                git_links.append((link, comment.author.displayName))
+        
+        # Also check description
+        description = getattr(ticket.fields, 'description', None)
+        if description:
+            reporter = getattr(ticket.fields, 'reporter', None)
+            for link in self._extract_git_links_from_text(description):
+                git_links.append((link, reporter.displayName if reporter else "Unknown"))
+        
+        return git_links
+    
+    def _extract_git_links_from_hierarchy(self, ticket_data: Dict[str, Any], records: Dict[str, Dict[str, Any]],
+                                          progress: Optional[Callable[..., None]] = None,
+                                          on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
         """
-        Extract git links from text using regex patterns
+        Attach git link information to every ticket in the hierarchy
+        
+        Links were found while loading the ticket records; every distinct URL
+        not in the persistent cache is resolved against GitLab in one batch.
         
         Args:
-            text: Text to search for git links
-            
-        Returns:
-            List of found git links
+            ticket_data: Root ticket data dictionary to update
+            records: Ticket records from _build_ticket_hierarchy, by key
+            progress: Optional callback receiving linksTotal and linksResolved
+            on_event: Optional callback receiving a links event for every
+                ticket with git links
         """
-        links = []
-        if not text:
-            return links
+        progress = progress or (lambda **values: None)
+        links = {
+            link["url"]: GitLink(*(link[field] for field in GitLink._fields))
+            for record in records.values() for link in record["links"] or []
+        }
         
-        for pattern in self.git_link_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            links.extend(matches)
+        resolved = self.cache.get_links(links) if self.cache is not None else {}
+        missing = [link for url, link in links.items() if url not in resolved]
+        progress(stage="links", linksTotal=len(links), linksResolved=len(resolved))
+        if missing:
+            resolver = GitLinkResolver(self.gitlab_client, max_workers=self.gitlab_concurrency)
+            cached = len(resolved)
+            fresh = resolver.resolve(missing, progress=lambda done: progress(linksResolved=cached + done))
+            if self.cache is not None:
+                self.cache.put_links(fresh)
+            resolved.update(fresh)
         
-        return list(set(links))  # Remove duplicates
+        links_by_key = {
+            key: [{**resolved[link["url"]], "commentedBy": link["commentedBy"]} for link in record["links"] or []]
+            for key, record in records.items()
+        }
+        if on_event:
+            for key, git_links in links_by_key.items():
+                if git_links:
+                    on_event({"type": "links", "key": key, "gitLinks": git_links})
+        
+        def assign(node: Dict[str, Any]) -> None:
+            node["gitLinks"] = links_by_key.get(node["key"], [])
+            for child in node["children"]:
+                assign(child)
+        
+        assign(ticket_data)
     
-    def _get_git_link_info(self, url: str) -> Optional[Dict[str, str]]:
+    def _extract_git_links_from_text(self, text: str) -> List[GitLink]:
         """
-        Get additional information about a git link from GitLab API
+        Extract git links from text in a single pass
         
         Args:
-            url: Git link URL
+            text: Text to search for git links, plain or Jira wiki markup
             
         Returns:
-            Dictionary with git link information
+            List of found git links, without duplicates
         """
-        try:
-            parsed_url = urlparse(url)
-            path_parts = parsed_url.path.strip('/').split('/')
-            
-            if len(path_parts) < 2:
-                return {"url": url, "type": "Unknown", "status": "Unknown"}
-            
-            project_path = '/'.join(path_parts[:2])
-            
-            # Determine link type based on URL structure
-            if '/merge_requests/' in url:
-                mr_id = path_parts[-1]
-                return self._get_merge_request_info(project_path, mr_id, url)
-            elif '/commit/' in url:
-                commit_id = path_parts[-1]
-                return self._get_commit_info(project_path, commit_id, url)
-            elif '/tree/' in url or '/blob/' in url:
-                return {"url": url, "type": "Branch/File", "status": "Active"}
-            else:
-                return {"url": url, "type": "Repository", "status": "Active"}
-                
-        except Exception as e:
-            logger.error(f"Error getting git link info for {url}: {e}")
-            return {"url": url, "type": "Unknown", "status": "Unknown"}
-    
-    def _get_merge_request_info(self, project_path: str, mr_id: str, url: str) -> Dict[str, str]:
-        """Get merge request information from GitLab API"""
-        try:
-            project = self.gitlab_client.projects.get(project_path)
-            mr = project.mergerequests.get(mr_id)
-            
-            return {
-                "url": url,
-                "type": "Merge Request",
-                "status": mr.state.capitalize(),
-                "title": mr.title,
-                "author": mr.author.get('name', 'Unknown')
-            }
-        except Exception as e:
-            logger.error(f"Error getting MR info: {e}")
-            return {"url": url, "type": "Merge Request", "status": "Unknown"}
-    
-    def _get_commit_info(self, project_path: str, commit_id: str, url: str) -> Dict[str, str]:
-        """Get commit information from GitLab API"""
-        try:
-            project = self.gitlab_client.projects.get(project_path)
-            commit = project.commits.get(commit_id)
-            
-            return {
-                "url": url,
-                "type": "Commit",
-                "status": "Committed",
-                "title": commit.title,
-                "author": commit.author_name
-            }
-        except Exception as e:
-            logger.error(f"Error getting commit info: {e}")
-            return {"url": url, "type": "Commit", "status": "Unknown"}
+        return self.git_link_extractor.extract(text)
     
     def _calculate_summary(self, ticket_hierarchy: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -352,6 +677,10 @@ class JiraGitLabService:
         def traverse(ticket_data, depth=0):
             nonlocal total_tickets, unique_git_links, max_depth, ticket_types, cyclic_tickets
             
+            # Repeated occurrences of a ticket expanded elsewhere are not counted again
+            if ticket_data.get("duplicateReference", False):
+                return
+            
             total_tickets += 1
             max_depth = max(max_depth, depth)
             
@@ -399,4 +728,10 @@ class JiraGitLabService:
             "gitlab_configured": bool(self.gitlab_token),
             "jira_url": self.jira_url,
             "gitlab_url": self.gitlab_url
-        }
\ No newline at end of file
+        }
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return persistent cache statistics"""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.get_stats()}
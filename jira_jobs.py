@@ -0,0 +1,208 @@
+"""
+Jira Analysis Jobs
+Runs ticket analyses on a worker pool and tracks their progress and results
+"""
+
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AnalysisJobManager:
+    """
+    Background job registry for Jira ticket analysis
+
+    A submission for a ticket that is already queued or running joins that
+    job instead of starting another one, whether it is polled or streamed.
+    Finished jobs are kept for `retention` seconds so their result can be
+    collected.
+    """
+
+    def __init__(self, analyze: Callable[..., Dict[str, Any]], max_workers: int = 2, retention: float = 900):
+        """
+        Args:
+            analyze: Callable taking a ticket ID plus `progress` and `on_event`
+                keyword callbacks, returning the analysis result
+            max_workers: Analyses run concurrently
+            retention: Seconds finished jobs are kept
+        """
+        self.analyze = analyze
+        self.retention = retention
+
+        self._lock = threading.Lock()
+        # Signalled whenever a job records an event or finishes
+        self._changed = threading.Condition(self._lock)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        # Normalized ticket ID -> job ID of the queued or running analysis
+        self._active: Dict[str, str] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='jira-analysis')
+
+    @staticmethod
+    def _ticket_key(ticket_id: str) -> str:
+        return ticket_id.strip().upper()
+
+    def submit(self, ticket_id: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue an analysis, or join the one already running for the ticket
+
+        Args:
+            ticket_id: Jira ticket ID to analyze
+
+        Returns:
+            Tuple of (job snapshot, True if an existing job was joined)
+        """
+        return self._submit(ticket_id, subscribe=False)
+
+    def _submit(self, ticket_id: str, subscribe: bool) -> Tuple[Dict[str, Any], bool]:
+        """
+        Body of submit(), optionally registering a stream subscriber in the
+        same critical section so the job cannot drop its events in between
+
+        Returns:
+            Tuple of (job snapshot, or the job itself when subscribing;
+            True if an existing job was joined)
+        """
+        ticket_key = self._ticket_key(ticket_id)
+        with self._lock:
+            self._prune()
+
+            job_id = self._active.get(ticket_key)
+            if job_id is not None:
+                job = self._jobs[job_id]
+                job["_subscribers"] += subscribe
+                return job if subscribe else self._snapshot(job), True
+
+            job = {
+                "job_id": uuid.uuid4().hex,
+                "ticket_id": ticket_id,
+                "status": "queued",
+                "progress": {"stage": "queued"},
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+                # Analysis events replayed to streaming subscribers; kept
+                # while the job runs or is being streamed
+                "_events": [],
+                "_subscribers": int(subscribe)
+            }
+            self._jobs[job["job_id"]] = job
+            self._active[ticket_key] = job["job_id"]
+            snapshot = job if subscribe else self._snapshot(job)
+
+        self._executor.submit(self._run, job["job_id"])
+        logger.info(f"Queued Jira analysis {job['job_id']} for {ticket_id}")
+        return snapshot, False
+
+    def _run(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = time.time()
+
+        def progress(**values: Any) -> None:
+            with self._lock:
+                job["progress"].update(values)
+
+        def on_event(event: Dict[str, Any]) -> None:
+            with self._changed:
+                job["_events"].append(event)
+                self._changed.notify_all()
+
+        try:
+            result = self.analyze(job["ticket_id"], progress=progress, on_event=on_event)
+            error = result.get("error")
+        except Exception as e:
+            logger.error(f"Jira analysis {job_id} failed: {e}")
+            result, error = None, f"Failed to analyze ticket: {str(e)}"
+
+        with self._changed:
+            job["finished_at"] = time.time()
+            if error:
+                job["status"] = "failed"
+                job["error"] = error
+                job["_events"].append({"type": "error", "error": error})
+            else:
+                job["status"] = "completed"
+                job["result"] = result
+                job["_events"].append({"type": "done", "summary": result["summary"]})
+            job["progress"]["stage"] = job["status"]
+            self._active.pop(self._ticket_key(job["ticket_id"]), None)
+            if not job["_subscribers"]:
+                job["_events"] = []
+            self._changed.notify_all()
+
+        logger.info(f"Jira analysis {job_id} {job['status']} in {job['finished_at'] - job['started_at']:.1f}s")
+
+    def stream(self, ticket_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Submit or join the analysis of a ticket and yield its events
+
+        Every event recorded so far is replayed first, so a subscriber that
+        joins a running job still receives the whole hierarchy. The analysis
+        keeps running (and fills the cache) if the subscriber goes away.
+
+        Args:
+            ticket_id: Jira ticket ID to analyze
+
+        Yields:
+            Analysis events (see JiraGitLabService.analyze_jira_ticket), ending
+            with {"type": "done", "summary"} or {"type": "error", "error"}
+        """
+        job, joined = self._submit(ticket_id, subscribe=True)
+        if joined:
+            logger.info(f"Streaming joined Jira analysis {job['job_id']} for {ticket_id}")
+
+        position = 0
+        try:
+            while True:
+                with self._changed:
+                    while position == len(job["_events"]) and job["finished_at"] is None:
+                        self._changed.wait()
+                    events = job["_events"][position:]
+                    finished = job["finished_at"] is not None
+                position += len(events)
+                yield from events
+                if finished and not events:
+                    return
+        finally:
+            with self._lock:
+                job["_subscribers"] -= 1
+                if job["finished_at"] is not None and not job["_subscribers"]:
+                    job["_events"] = []
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of a job including its result once finished, or None if unknown"""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def _snapshot(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a job for the caller; caller must hold the lock"""
+        snapshot = {key: value for key, value in job.items() if not key.startswith('_')}
+        snapshot["progress"] = dict(job["progress"])
+        end = job["finished_at"] or time.time()
+        snapshot["elapsed"] = round(end - job["started_at"], 3) if job["started_at"] else 0
+        return snapshot
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention period; caller must hold the lock"""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
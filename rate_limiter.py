@@ -0,0 +1,205 @@
+"""
+Upstream API Rate Limiting
+Shared token bucket and retrying HTTP adapter for the Jira and GitLab clients
+"""
+
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from requests.adapters import HTTPAdapter
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _seconds_until(value: Optional[str], now: float) -> Optional[float]:
+    """
+    Convert a Retry-After or rate limit reset header into seconds from now
+
+    Accepts delta seconds, epoch seconds (GitLab RateLimit-Reset), HTTP dates
+    and ISO 8601 timestamps (Jira X-RateLimit-Reset).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        number = float(value)
+        # Values this large are epoch timestamps rather than a delay
+        return max(0.0, number - now if number > 1e9 else number)
+    except ValueError:
+        pass
+
+    for parse in (parsedate_to_datetime, lambda text: datetime.fromisoformat(text.replace('Z', '+00:00'))):
+        try:
+            moment = parse(value)
+        except (TypeError, ValueError):
+            continue
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return max(0.0, moment.timestamp() - now)
+    return None
+
+
+class TokenBucket:
+    """
+    Thread-safe request limiter shared by all requests to one upstream
+
+    The refill rate adapts to the upstream: it is halved whenever the
+    upstream throttles and grows back by a small step with every accepted
+    request, up to max_rate. A throttle response with a reset time pauses
+    every caller until then.
+    """
+
+    def __init__(self, name: str, max_rate: float, burst: Optional[float] = None, min_rate: float = 0.5):
+        self.name = name
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.capacity = burst or max(1.0, max_rate)
+
+        self._lock = threading.Lock()
+        self._rate = max_rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+        # Counters exposed through get_stats()
+        self._throttled = 0
+        self._waited = 0.0
+
+    def _refill(self, now: float) -> None:
+        """Add tokens for the time elapsed; caller must hold the lock"""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Take one token, waiting for it if necessary
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._paused_until - now
+                if delay <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self._waited += waited
+                        return waited
+                    delay = (1 - self._tokens) / self._rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for the given time"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+    def throttled(self) -> None:
+        """Record a throttle response and halve the rate"""
+        with self._lock:
+            self._throttled += 1
+            self._rate = max(self.min_rate, self._rate / 2)
+            logger.warning(f"{self.name} is throttling requests, rate limited to {self._rate:.2f}/s")
+
+    def accepted(self) -> None:
+        """Record an accepted request and grow the rate back towards max_rate"""
+        with self._lock:
+            if self._rate < self.max_rate:
+                self._rate = min(self.max_rate, self._rate + self.max_rate / 20)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "rate": round(self._rate, 3),
+                "max_rate": self.max_rate,
+                "throttled": self._throttled,
+                "waited_seconds": round(self._waited, 3),
+                "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 3)
+            }
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTP adapter that takes a token from a shared bucket before every request
+
+    429 responses are retried for any method (the request was not
+    processed), 502/503/504 only for idempotent methods. Retry-After is
+    honoured, otherwise the delay grows exponentially with jitter. Rate limit
+    headers reporting no remaining quota pause the bucket until the reset.
+    """
+
+    RETRY_STATUSES = (429, 502, 503, 504)
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+    def __init__(self, bucket: TokenBucket, max_retries: int = 5, backoff: float = 1.0,
+                 max_backoff: float = 60.0, **kwargs):
+        super().__init__(**kwargs)
+        self.bucket = bucket
+        self.retry_limit = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def send(self, request, **kwargs):
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            response = super().send(request, **kwargs)
+            self._observe_quota(response)
+
+            retryable = response.status_code in self.RETRY_STATUSES and (
+                response.status_code == 429 or request.method in self.IDEMPOTENT_METHODS
+            )
+            if not retryable:
+                self.bucket.accepted()
+                return response
+            if attempt >= self.retry_limit:
+                logger.error(f"Giving up on {request.method} {request.url} after {attempt} retries "
+                             f"(HTTP {response.status_code})")
+                return response
+
+            retry_after = _seconds_until(response.headers.get('Retry-After'), time.time())
+            delay = retry_after if retry_after is not None else \
+                min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+            delay = min(delay, self.max_backoff)
+
+            if response.status_code == 429:
+                self.bucket.throttled()
+                # Everyone sharing the quota waits, not just this request
+                self.bucket.pause(delay)
+            logger.info(f"HTTP {response.status_code} from {request.url}, retrying in {delay:.1f}s "
+                        f"(attempt {attempt + 1} of {self.retry_limit})")
+
+            response.close()
+            attempt += 1
+            if response.status_code != 429:
+                time.sleep(delay)
+
+    def _observe_quota(self, response) -> None:
+        """Pause the bucket until the reset time when the quota is used up"""
+        headers = response.headers
+        remaining = headers.get('RateLimit-Remaining') or headers.get('X-RateLimit-Remaining')
+        if remaining is None or response.status_code == 429:
+            return
+        try:
+            if int(float(remaining)) > 0:
+                return
+        except ValueError:
+            return
+
+        reset = headers.get('RateLimit-Reset') or headers.get('X-RateLimit-Reset')
+        seconds = _seconds_until(reset, time.time())
+        if seconds:
+            logger.info(f"{self.bucket.name} quota exhausted, pausing requests for {seconds:.1f}s")
+            self.bucket.pause(min(seconds, self.max_backoff))
@@ -0,0 +1,133 @@
+"""
+Search Index for the Product Hierarchy
+Prebuilt n-gram index used by /api/search for substring lookups
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ENTRY_TYPES = ('product', 'base', 'version', 'environment', 'microservice')
+
+
+class SearchIndex:
+    """Immutable n-gram index over every named node in the inventory"""
+
+    # Names are indexed by every substring up to this length; longer
+    # queries scan their rarest n-gram posting list and verify matches
+    GRAM_SIZE = 3
+
+    def __init__(self, data: Dict[str, Any], version: int = 0):
+        self.version = version
+
+        # Entries are stored in hierarchy (depth-first) order so that posting
+        # lists are naturally sorted and results keep the original ordering
+        self._names: List[str] = []
+        self._lowered: List[str] = []
+        self._types: List[str] = []
+        self._paths: List[List[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+
+        self._build(data or {})
+        logger.info(f"Built search index with {len(self._names)} entries (version {version})")
+
+    def _add(self, entry_type: str, name: str, path: List[str]) -> None:
+        """Register a single node and its n-grams"""
+        entry_id = len(self._names)
+        lowered = name.lower()
+
+        self._names.append(name)
+        self._lowered.append(lowered)
+        self._types.append(entry_type)
+        self._paths.append(path)
+
+        for size in range(1, self.GRAM_SIZE + 1):
+            for start in range(len(lowered) - size + 1):
+                postings = self._postings.setdefault(lowered[start:start + size], [])
+                if not postings or postings[-1] != entry_id:
+                    postings.append(entry_id)
+
+    def _build(self, data: Dict[str, Any]) -> None:
+        """Walk the product hierarchy once and index every node"""
+        for product in data.get('products', []):
+            product_name = product.get('name', '')
+            self._add('product', product_name, [product_name])
+
+            for base in product.get('bases', []):
+                base_name = base.get('name', '')
+                self._add('base', base_name, [product_name, base_name])
+
+                for version in base.get('versions', []):
+                    version_name = version.get('name', '')
+                    self._add('version', version_name, [product_name, base_name, version_name])
+
+                    for env in version.get('environments', []):
+                        env_name = env.get('name', '')
+                        env_path = [product_name, base_name, version_name, env_name]
+                        self._add('environment', env_name, env_path)
+
+                        for service in env.get('microservices', []):
+                            service_name = service.get('name', '')
+                            self._add('microservice', service_name, env_path + [service_name])
+
+    def _candidates(self, query: str) -> Sequence[int]:
+        """
+        Return entry IDs that may contain the query, in hierarchy order
+
+        Short queries are answered exactly by their own posting list. Longer
+        queries scan the rarest of their n-gram posting lists; callers verify
+        each candidate, which lets the scan stop as soon as the limit is hit.
+        """
+        if len(query) <= self.GRAM_SIZE:
+            return self._postings.get(query, [])
+
+        shortest: Optional[List[int]] = None
+        for start in range(len(query) - self.GRAM_SIZE + 1):
+            postings = self._postings.get(query[start:start + self.GRAM_SIZE])
+            if not postings:
+                return []
+            if shortest is None or len(postings) < len(shortest):
+                shortest = postings
+        return shortest
+
+    def search(self, query: str, limit: int = 20, types: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Find nodes whose name contains the query (case-insensitive)
+
+        Args:
+            query: Substring to search for
+            limit: Maximum number of results to return
+            types: Optional list of entry types to restrict results to
+
+        Returns:
+            List of result dictionaries with type, name and path
+        """
+        query = query.lower()
+        if not query or limit <= 0:
+            return []
+
+        type_filter = set(types) if types else None
+        verify = len(query) > self.GRAM_SIZE
+        results = []
+
+        for entry_id in self._candidates(query):
+            if type_filter and self._types[entry_id] not in type_filter:
+                continue
+            if verify and query not in self._lowered[entry_id]:
+                continue
+
+            results.append({
+                'type': self._types[entry_id],
+                'name': self._names[entry_id],
+                'path': list(self._paths[entry_id])
+            })
+            if len(results) >= limit:
+                break
+
+        return results
+
+    def __len__(self) -> int:
+        return len(self._names)
@@ -8,6 +8,8 @@ angular.module('appLensApp')
         $scope.selectedBase = null;
         $scope.selectedEnvironment = null;
         $scope.configSearchTerm = '';
+        // Learned from the first health-status response; null until then
+        $scope.healthMonitorRunning = null;
         
         // Load environment data
         $scope.loadEnvironmentData = function() {
@@ -346,33 +348,70 @@ angular.module('appLensApp')
         $scope.selectedDatabase = '';
         $scope.sqlQuery = '';
         $scope.sqlQueryStatus = {
-            executing: false
+            executing: false,
+            loadingMore: false,
+            queryId: null
         };
         $scope.sqlQueryResults = {
             data: null,
             columns: [],
             rowCount: 0,
-            error: null
+            error: null,
+            hasMore: false,
+            cursorId: null
         };
         
+        // Rows fetched per page; further pages are loaded on demand
+        var SQL_PAGE_SIZE = 500;
+        
+        // Release the server-side cursor of the previous paginated query
+        function closeSqlCursor() {
+            var cursorId = $scope.sqlQueryResults && $scope.sqlQueryResults.cursorId;
+            if (cursorId) {
+                $http.post('/api/database/execute-sql/close', { cursor_id: cursorId });
+            }
+        }
+        
+        // Client-chosen query ID so a running query can be cancelled
+        function generateQueryId() {
+            if (window.crypto && window.crypto.randomUUID) {
+                return window.crypto.randomUUID();
+            }
+            return 'q-' + Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
+        }
+        
+        function emptySqlQueryResults() {
+            return {
+                data: null,
+                columns: [],
+                rowCount: 0,
+                error: null,
+                hasMore: false,
+                cursorId: null
+            };
+        }
+        
         // Execute SQL Query
         $scope.executeSqlQuery = function() {
             if (!$scope.sqlQuery || !$scope.selectedDatabase) return;
             
+            closeSqlCursor();
             $scope.sqlQueryStatus.executing = true;
-            $scope.sqlQueryResults = {
-                data: null,
-                columns: [],
-                rowCount: 0,
-                error: null
-            };
+            $scope.sqlQueryResults = emptySqlQueryResults();
             
             var environment = SharedDataService.getSelectedEnvironment();
             var selectedDb = environment.databases.find(db => db.type === $scope.selectedDatabase);
             
+            $scope.sqlQueryStatus.queryId = generateQueryId();
+            
             var payload = {
                 database_config: selectedDb,
-                sql_query: $scope.sqlQuery
+                sql_query: $scope.sqlQuery,
+                query_id: $scope.sqlQueryStatus.queryId,
+                page_size: SQL_PAGE_SIZE,
+                // Compact encoding: column names once, rows as value arrays
+                format: 'columnar',
+                typed: true
             };
             
             console.log('Executing SQL query:', $scope.sqlQuery);
@@ -384,6 +423,8 @@ angular.module('appLensApp')
                         $scope.sqlQueryResults.data = response.data.data;
                         $scope.sqlQueryResults.columns = response.data.columns;
                         $scope.sqlQueryResults.rowCount = response.data.row_count;
+                        $scope.sqlQueryResults.hasMore = response.data.has_more;
+                        $scope.sqlQueryResults.cursorId = response.data.cursor_id;
                         console.log('Query executed successfully:', $scope.sqlQueryResults.rowCount + ' rows');
                     } else {
                         $scope.sqlQueryResults.error = response.data.error;
@@ -396,15 +437,50 @@ angular.module('appLensApp')
                 });
         };
         
+        // Cancel the running SQL query
+        $scope.cancelSqlQuery = function() {
+            if (!$scope.sqlQueryStatus.executing || !$scope.sqlQueryStatus.queryId) return;
+            
+            $http.post('/api/database/execute-sql/cancel', {
+                query_id: $scope.sqlQueryStatus.queryId
+            }).catch(function(error) {
+                console.error('Error cancelling SQL query:', error);
+            });
+        };
+        
+        // Load the next page of a paginated query
+        $scope.loadMoreSqlResults = function() {
+            var results = $scope.sqlQueryResults;
+            if (!results.cursorId || $scope.sqlQueryStatus.loadingMore) return;
+            
+            $scope.sqlQueryStatus.loadingMore = true;
+            
+            $http.post('/api/database/execute-sql/page', {
+                cursor_id: results.cursorId,
+                page_size: SQL_PAGE_SIZE
+            }).then(function(response) {
+                $scope.sqlQueryStatus.loadingMore = false;
+                if (response.data.success) {
+                    results.data = results.data.concat(response.data.data);
+                    results.rowCount += response.data.row_count;
+                    results.hasMore = response.data.has_more;
+                    results.cursorId = response.data.cursor_id;
+                } else {
+                    results.hasMore = false;
+                    results.cursorId = null;
+                    results.error = response.data.error;
+                }
+            }).catch(function(error) {
+                $scope.sqlQueryStatus.loadingMore = false;
+                console.error('Error loading more SQL results:', error);
+            });
+        };
+        
         // Clear SQL Query
         $scope.clearSqlQuery = function() {
+            closeSqlCursor();
             $scope.sqlQuery = '';
-            $scope.sqlQueryResults = {
-                data: null,
-                columns: [],
-                rowCount: 0,
-                error: null
-            };
+            $scope.sqlQueryResults = emptySqlQueryResults();
         };
         
         // Open SQL Editor in New Tab
@@ -427,10 +503,13 @@ angular.module('appLensApp')
                 var csvContent = '';
                 // Add headers
                 csvContent += $scope.sqlQueryResults.columns.join(',') + '\n';
-                // Add data rows
+                // Add data rows (columnar results: one value array per row)
                 $scope.sqlQueryResults.data.forEach(function(row) {
-                    var rowData = $scope.sqlQueryResults.columns.map(function(col) {
-                        var value = row[col] || '';
+                    var rowData = $scope.sqlQueryResults.columns.map(function(col, index) {
+                        var value = row[index];
+                        if (value === null || value === undefined) {
+                            value = '';
+                        }
                         // Escape commas and quotes in CSV
                         if (typeof value === 'string' && (value.includes(',') || value.includes('"'))) {
                             value = '"' + value.replace(/"/g, '""') + '"';
@@ -669,24 +748,140 @@ angular.module('appLensApp')
                 return;
             }
             
+            // Without a background monitor there is no cached status to read
+            if ($scope.healthMonitorRunning === false) {
+                $scope.probeMicroserviceHealth(environment.microservices);
+                return;
+            }
+            
+            // Serve cached results from the background monitor first and
+            // only probe services it has no fresh status for
+            var params = {
+                url: environment.microservices.map(function(service) { return service.server_url; })
+            };
+            
+            $http.get('/api/microservice/health-status', { params: params })
+                .then(function(response) {
+                    var monitor = response.data && response.data.monitor;
+                    $scope.healthMonitorRunning = !!(monitor && monitor.running);
+                    var cached = (response.data && response.data.health_status) || {};
+                    var unresolved = [];
+                    
+                    environment.microservices.forEach(function(service) {
+                        var entry = cached[service.server_url];
+                        if (entry && !entry.stale && entry.status !== 'unknown') {
+                            service.status = entry.status;
+                            service.latency_ms = entry.latency_ms;
+                            service.checked_at = entry.checked_at;
+                        } else {
+                            unresolved.push(service);
+                        }
+                    });
+                    
+                    if (unresolved.length > 0) {
+                        $scope.probeMicroserviceHealth(unresolved);
+                    }
+                }).catch(function(error) {
+                    console.error('Error loading cached microservice health:', error);
+                    $scope.probeMicroserviceHealth(environment.microservices);
+                });
+        };
+        
+        // Probe microservices directly, painting each result as it arrives
+        $scope.probeMicroserviceHealth = function(microservices) {
+            if (!window.fetch || !window.ReadableStream || !window.TextDecoder) {
+                $scope.probeMicroserviceHealthBatch(microservices);
+                return;
+            }
+            
+            var servicesByName = {};
+            microservices.forEach(function(service) {
+                servicesByName[service.name] = service;
+            });
+            
+            function applyResult(result) {
+                var service = servicesByName[result.name];
+                if (service) {
+                    service.status = result.status;
+                    service.latency_ms = result.latency_ms;
+                }
+            }
+            
+            function markUnresolvedOffline() {
+                microservices.forEach(function(service) {
+                    if (service.status === 'checking') {
+                        service.status = 'offline';
+                    }
+                });
+            }
+            
+            fetch('/api/microservice/health-check/stream', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ microservices: microservices })
+            }).then(function(response) {
+                if (!response.ok || !response.body) {
+                    throw new Error('Health stream failed with status ' + response.status);
+                }
+                
+                var reader = response.body.getReader();
+                var decoder = new TextDecoder();
+                var buffer = '';
+                
+                function read() {
+                    return reader.read().then(function(chunk) {
+                        if (chunk.done) {
+                            $scope.$applyAsync(markUnresolvedOffline);
+                            return;
+                        }
+                        
+                        buffer += decoder.decode(chunk.value, { stream: true });
+                        var lines = buffer.split('\n');
+                        buffer = lines.pop();
+                        
+                        $scope.$applyAsync(function() {
+                            lines.forEach(function(line) {
+                                if (!line.trim()) return;
+                                var message = JSON.parse(line);
+                                if (message.type === 'result') {
+                                    applyResult(message);
+                                }
+                            });
+                        });
+                        
+                        return read();
+                    });
+                }
+                
+                return read();
+            }).catch(function(error) {
+                console.error('Error streaming microservice health:', error);
+                $scope.$applyAsync(markUnresolvedOffline);
+            });
+        };
+        
+        // Probe microservices directly and wait for all results
+        $scope.probeMicroserviceHealthBatch = function(microservices) {
             $http.post('/api/microservice/health-check', {
-                microservices: environment.microservices
+                microservices: microservices
             }).then(function(response) {
                 if (response.data.success) {
                     // Update status for each microservice
-                    environment.microservices.forEach(function(service) {
+                    var details = response.data.details || {};
+                    microservices.forEach(function(service) {
                         service.status = response.data.health_status[service.name] || 'offline';
+                        service.latency_ms = details[service.name] ? details[service.name].latency_ms : null;
                     });
                 } else {
                     // Set all to offline if health check failed
-                    environment.microservices.forEach(function(service) {
+                    microservices.forEach(function(service) {
                         service.status = 'offline';
                     });
                 }
             }).catch(function(error) {
                 console.error('Error checking microservice health:', error);
                 // Set all to offline if request failed
-                environment.microservices.forEach(function(service) {
+                microservices.forEach(function(service) {
                     service.status = 'offline';
                 });
             });
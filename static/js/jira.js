@@ -197,6 +197,7 @@ angular.module('appLensApp')
             $scope.isAnalyzing = true;
             $scope.analysisResults = null;
             $scope.analysisError = null;
+            $scope.analysisProgress = null;
             
             // Check configuration first
             $http.get('/api/jira/config')
@@ -207,15 +208,22 @@ angular.module('appLensApp')
                         return;
                     }
                     
-                    // Make API call to analyze ticket
-                    return $http.post('/api/jira/analyze', {ticket_id: ticketId});
+                    // Stream the hierarchy where the browser can read response
+                    // bodies incrementally, otherwise run a background job and poll it
+                    if (window.ReadableStream && window.TextDecoder) {
+                        return streamAnalysis(ticketId);
+                    }
+                    return $http.post('/api/jira/analyze', {ticket_id: ticketId, async: true})
+                        .then(function(response) {
+                            return pollAnalysisJob(response.data.status_url);
+                        });
                 })
-                .then(function(response) {
-                    if (response && response.data) {
-                        if (response.data.error) {
-                            $scope.analysisError = response.data.error;
+                .then(function(job) {
+                    if (job) {
+                        if (job.status === 'failed') {
+                            $scope.analysisError = job.error;
                         } else {
-                            $scope.analysisResults = response.data;
+                            $scope.analysisResults = job.result;
                         }
                     }
                     $scope.isAnalyzing = false;
@@ -231,6 +239,98 @@ angular.module('appLensApp')
                 });
         };
         
+        // Stream an analysis, showing tickets and their git links as they arrive
+        function streamAnalysis(ticketId) {
+            // Expanded node of every ticket, and every node showing a ticket
+            const expanded = {};
+            const nodesByKey = {};
+            let ticketsVisited = 0;
+            
+            function applyEvent(message) {
+                if (message.type === 'ticket') {
+                    const ticket = message.ticket;
+                    (nodesByKey[ticket.key] = nodesByKey[ticket.key] || []).push(ticket);
+                    if (message.parent === null) {
+                        $scope.analysisResults = {summary: null, tickets: [ticket]};
+                    } else if (expanded[message.parent]) {
+                        expanded[message.parent].children.push(ticket);
+                    }
+                    if (!ticket.cyclicReference && !ticket.duplicateReference) {
+                        expanded[ticket.key] = ticket;
+                        ticketsVisited++;
+                    }
+                    $scope.analysisProgress = {ticketsVisited: ticketsVisited};
+                } else if (message.type === 'fetchError') {
+                    if (expanded[message.key]) {
+                        expanded[message.key].fetchError = message.error;
+                    }
+                } else if (message.type === 'links') {
+                    (nodesByKey[message.key] || []).forEach(function(node) {
+                        node.gitLinks = message.gitLinks;
+                    });
+                } else if (message.type === 'done') {
+                    $scope.analysisResults.summary = message.summary;
+                } else if (message.type === 'error') {
+                    $scope.analysisResults = null;
+                    $scope.analysisError = message.error;
+                }
+            }
+            
+            return fetch('/api/jira/analyze/stream', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ ticket_id: ticketId })
+            }).then(function(response) {
+                if (!response.ok || !response.body) {
+                    return response.json().then(function(data) {
+                        throw { status: response.status, data: data };
+                    });
+                }
+                
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                
+                function read() {
+                    return reader.read().then(function(chunk) {
+                        if (chunk.done) {
+                            return;
+                        }
+                        
+                        buffer += decoder.decode(chunk.value, { stream: true });
+                        const lines = buffer.split('\n');
+                        buffer = lines.pop();
+                        
+                        $scope.$applyAsync(function() {
+                            lines.forEach(function(line) {
+                                if (line.trim()) {
+                                    applyEvent(JSON.parse(line));
+                                }
+                            });
+                        });
+                        
+                        return read();
+                    });
+                }
+                
+                return read();
+            });
+        }
+        
+        // Poll an analysis job until it finishes, publishing its progress
+        function pollAnalysisJob(statusUrl) {
+            return $http.get(statusUrl).then(function(response) {
+                const job = response.data;
+                if (job.status === 'completed' || job.status === 'failed') {
+                    return job;
+                }
+                $scope.analysisProgress = job.progress;
+                return $timeout(function() {
+                    return pollAnalysisJob(statusUrl);
+                }, 1000);
+            });
+        }
+        
         // Show sample data for demonstration
         $scope.showSampleData = function() {
             $scope.isAnalyzing = false;
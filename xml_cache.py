@@ -0,0 +1,193 @@
+"""
+XML Configuration Cache
+Size-bounded LRU cache with TTL and validator-based revalidation
+"""
+
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate the memory held by a cached value in bytes"""
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class XmlConfigCache:
+    """
+    LRU + TTL cache for XML configuration lists and contents
+
+    Every entry carries a validator (a content hash or rowversion read from
+    the database). Once an entry's TTL expires it is not dropped; callers
+    re-read only the validator and, if it is unchanged, renew the entry
+    instead of re-fetching and re-formatting the XML. Concurrent get_or_load()
+    calls for the same key share one validate/load round trip.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, default_ttl: float = 300):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Key -> in-progress get_or_load() refresh that other callers wait for
+        self._flights: Dict[Hashable, Dict[str, Any]] = {}
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "refreshed": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "coalesced": 0
+        }
+
+    def lookup(self, key: Hashable) -> Tuple[Optional[Any], Optional[Any], bool]:
+        """
+        Look up an entry without fetching anything
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (value, validator, fresh). value is None on a miss;
+            fresh is False when the TTL expired and the caller should
+            revalidate.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None, None, False
+
+            self._entries.move_to_end(key)
+            fresh = time.monotonic() < entry["expires"]
+            if fresh:
+                self._stats["hits"] += 1
+            return entry["value"], entry["validator"], fresh
+
+    def put(self, key: Hashable, value: Any, validator: Any = None, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting least recently used entries to stay under max_bytes"""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            # Never cache something that would evict the whole cache
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old["size"]
+
+            self._entries[key] = {
+                "value": value,
+                "validator": validator,
+                "size": size,
+                "ttl": ttl or self.default_ttl,
+                "expires": time.monotonic() + (ttl or self.default_ttl)
+            }
+            self._bytes += size
+
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted["size"]
+                self._stats["evictions"] += 1
+
+    def renew(self, key: Hashable) -> None:
+        """Restart an entry's TTL after its validator was confirmed unchanged"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["expires"] = time.monotonic() + entry["ttl"]
+                self._stats["revalidated"] += 1
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Tuple[Any, Any]],
+                    validate: Optional[Callable[[], Any]] = None, ttl: Optional[float] = None) -> Any:
+        """
+        Return a cached value, revalidating or loading it as needed
+
+        Only one caller per key revalidates or loads at a time; the others
+        wait for it and share its result.
+
+        Args:
+            key: Cache key
+            load: Callable returning (value, validator) from the source
+            validate: Callable returning the current validator from the source;
+                if omitted, expired entries are always reloaded
+            ttl: Optional TTL override for this entry
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        while True:
+            value, validator, fresh = self.lookup(key)
+            if value is not None and fresh:
+                return value
+
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = self._flights[key] = {"done": threading.Event(), "ok": False, "value": None}
+                    break
+                self._stats["coalesced"] += 1
+
+            flight["done"].wait()
+            if flight["ok"]:
+                return flight["value"]
+            # The refresh we waited for failed; try again ourselves
+
+        try:
+            value = self._refresh(key, value, validator, load, validate, ttl)
+            flight["ok"], flight["value"] = True, value
+            return value
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight["done"].set()
+
+    def _refresh(self, key: Hashable, value: Any, validator: Any, load: Callable[[], Tuple[Any, Any]],
+                 validate: Optional[Callable[[], Any]], ttl: Optional[float]) -> Any:
+        """Revalidate an expired entry or load a missing one (see get_or_load)"""
+        if value is not None and validate is not None and validator is not None and validate() == validator:
+            self.renew(key)
+            return value
+
+        value, validator = load()
+        if value is not None:
+            self.put(key, value, validator, ttl)
+            with self._lock:
+                self._stats["refreshed"] += 1
+        return value
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Drop entries matching a predicate (all entries if omitted)
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate is None or predicate(key)]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)["size"]
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                **self._stats
+            }
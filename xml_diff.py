@@ -0,0 +1,131 @@
+"""
+XML Configuration Diff
+Structural, element- and attribute-aware comparison of parsed configurations
+"""
+
+import logging
+import xml.etree.ElementTree as ET
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from xml_query import ParsedXml
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Attributes that identify a child among siblings with the same tag
+IDENTITY_ATTRIBUTES = ('name', 'id', 'key')
+
+# Serialized subtrees in added/removed entries are cut to this length
+MAX_VALUE_CHARS = 1000
+
+
+def _child_key(elem: ET.Element) -> Tuple[str, Optional[str], Optional[str]]:
+    """Return the (tag, identity attribute, value) used to pair siblings"""
+    for attribute in IDENTITY_ATTRIBUTES:
+        if attribute in elem.attrib:
+            return elem.tag, attribute, elem.attrib[attribute]
+    return elem.tag, None, None
+
+
+def _step(key: Tuple[str, Optional[str], Optional[str]], occurrence: int, repeated: bool) -> str:
+    """Render a path step such as service[@name='api'] or property[3]"""
+    tag, attribute, value = key
+    step = f"{tag}[@{attribute}='{value}']" if attribute else tag
+    if repeated:
+        step += f"[{occurrence + 1}]"
+    return step
+
+
+def _serialize(elem: ET.Element) -> str:
+    xml = ET.tostring(elem, encoding='unicode').strip()
+    return xml if len(xml) <= MAX_VALUE_CHARS else xml[:MAX_VALUE_CHARS] + '...'
+
+
+class _Differ:
+    """Collects changes between two trees, skipping subtrees whose hashes match"""
+
+    def __init__(self, left: ParsedXml, right: ParsedXml, max_changes: int):
+        self.left_hashes = left.subtree_hashes()
+        self.right_hashes = right.subtree_hashes()
+        self.max_changes = max_changes
+        self.changes: List[Dict[str, Any]] = []
+        self.truncated = False
+
+    def add(self, op: str, path: str, old: Any = None, new: Any = None) -> None:
+        if len(self.changes) >= self.max_changes:
+            self.truncated = True
+            return
+        self.changes.append({"op": op, "path": path, "old": old, "new": new})
+
+    def compare(self, left: ET.Element, right: ET.Element, path: str) -> None:
+        if self.truncated or self.left_hashes[left] == self.right_hashes[right]:
+            return
+
+        for name in sorted(set(left.attrib) | set(right.attrib)):
+            old, new = left.attrib.get(name), right.attrib.get(name)
+            if old == new:
+                continue
+            op = "added" if old is None else "removed" if new is None else "changed"
+            self.add(op, f"{path}/@{name}", old, new)
+
+        old_text, new_text = (left.text or '').strip(), (right.text or '').strip()
+        if old_text != new_text:
+            self.add("changed", f"{path}/text()", old_text or None, new_text or None)
+
+        self._compare_children(left, right, path)
+
+    def _compare_children(self, left: ET.Element, right: ET.Element, path: str) -> None:
+        """Pair children by tag, identity attribute and occurrence, so reordering is not a change"""
+        left_keys = [_child_key(child) for child in left]
+        right_keys = [_child_key(child) for child in right]
+        left_counts, right_counts = Counter(left_keys), Counter(right_keys)
+
+        right_by_key: Dict[Tuple, ET.Element] = {}
+        seen: Counter = Counter()
+        for key, child in zip(right_keys, right):
+            right_by_key[key + (seen[key],)] = child
+            seen[key] += 1
+
+        seen = Counter()
+        for key, child in zip(left_keys, left):
+            occurrence = seen[key]
+            seen[key] += 1
+            repeated = max(left_counts[key], right_counts[key]) > 1
+            child_path = f"{path}/{_step(key, occurrence, repeated)}"
+
+            match = right_by_key.pop(key + (occurrence,), None)
+            if match is None:
+                self.add("removed", child_path, _serialize(child), None)
+            else:
+                self.compare(child, match, child_path)
+
+        for (tag, attribute, value, occurrence), child in right_by_key.items():
+            key = (tag, attribute, value)
+            repeated = max(left_counts[key], right_counts[key]) > 1
+            self.add("added", f"{path}/{_step(key, occurrence, repeated)}", None, _serialize(child))
+
+
+def diff_xml(left: ParsedXml, right: ParsedXml, max_changes: int = 500) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Compare two parsed configurations
+
+    Children are paired by tag and their name/id/key attribute (then by
+    occurrence), so reordered siblings are not reported as changes.
+
+    Args:
+        left: Baseline configuration
+        right: Configuration compared against the baseline
+        max_changes: Maximum number of changes to report
+
+    Returns:
+        Tuple of (changes, truncated). Each change has op (added, removed or
+        changed), path, old and new.
+    """
+    differ = _Differ(left, right, max_changes)
+    if left.root.tag != right.root.tag:
+        differ.add("changed", "/", _serialize(left.root), _serialize(right.root))
+    else:
+        differ.compare(left.root, right.root, f"/{left.root.tag}")
+    return differ.changes, differ.truncated
@@ -0,0 +1,176 @@
+"""
+XML Configuration Queries
+Evaluates element paths (the ElementTree XPath subset) against parsed configurations
+"""
+
+import hashlib
+import logging
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ParsedXml:
+    """A parsed configuration held in the XML cache"""
+
+    # A parsed ElementTree holds roughly this many times its source size
+    MEMORY_FACTOR = 8
+
+    def __init__(self, xml_content: str):
+        self.root = ET.fromstring(xml_content)
+        self.source_size = len(xml_content)
+        self._parents: Optional[Dict[ET.Element, ET.Element]] = None
+        self._hashes: Optional[Dict[ET.Element, bytes]] = None
+
+    def __sizeof__(self) -> int:
+        # Lets the XML cache account for the tree rather than this wrapper
+        return self.source_size * self.MEMORY_FACTOR
+
+    def parent_map(self) -> Dict[ET.Element, ET.Element]:
+        """Map every element to its parent, built on first use"""
+        if self._parents is None:
+            self._parents = {child: parent for parent in self.root.iter() for child in parent}
+        return self._parents
+
+    def subtree_hashes(self) -> Dict[ET.Element, bytes]:
+        """Map every element to a digest of its tag, attributes, text and children, built on first use"""
+        if self._hashes is None:
+            hashes = {}
+            # Children are always finished before their parent in post-order
+            for elem in _iter_post_order(self.root):
+                digest = hashlib.sha1(elem.tag.encode())
+                for key, value in sorted(elem.attrib.items()):
+                    digest.update(b'\0@' + key.encode() + b'=' + value.encode())
+                digest.update(b'\0#' + (elem.text or '').strip().encode())
+                for child in elem:
+                    digest.update(hashes[child])
+                hashes[elem] = digest.digest()
+            self._hashes = hashes
+        return self._hashes
+
+    def element_path(self, elem: ET.Element) -> str:
+        """Return an absolute, position-qualified path such as /config/db[2]"""
+        parents = self.parent_map()
+        steps = []
+        while elem is not None:
+            parent = parents.get(elem)
+            step = elem.tag
+            if parent is not None:
+                siblings = [child for child in parent if child.tag == elem.tag]
+                if len(siblings) > 1:
+                    step += f"[{siblings.index(elem) + 1}]"
+            steps.append(step)
+            elem = parent
+        return '/' + '/'.join(reversed(steps))
+
+
+def _iter_post_order(root: ET.Element) -> Iterator[ET.Element]:
+    """Yield elements children-first without recursion"""
+    stack = [(root, False)]
+    while stack:
+        elem, visited = stack.pop()
+        if visited:
+            yield elem
+        else:
+            stack.append((elem, True))
+            stack.extend((child, False) for child in reversed(elem))
+
+
+def split_path(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Prepare a query for ElementTree
+
+    Absolute paths (/config/db, //db) are made relative to a wrapper around
+    the root so the root element itself can match, and a trailing /@name
+    step, which ElementTree does not support, is split off.
+
+    Returns:
+        Tuple of (element path, attribute name or None)
+    """
+    path = path.strip()
+    if not path:
+        raise ValueError("Path is required")
+
+    attribute = None
+    head, sep, tail = path.rpartition('/@')
+    if sep and tail and all(ch.isalnum() or ch in '_-.:{}' for ch in tail):
+        path, attribute = head or '.', tail
+
+    if path.startswith('/'):
+        path = '.' + path
+    return path, attribute
+
+
+def evaluate(parsed: ParsedXml, path: str, namespaces: Optional[Dict[str, str]] = None,
+             limit: int = 100, include_xml: bool = True, max_xml_chars: int = 65536) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Evaluate an element path against a parsed configuration
+
+    Args:
+        parsed: Parsed configuration
+        path: Element path, e.g. //db[@host='a'] or /config/cache/@size
+        namespaces: Optional prefix -> URI map used by the path
+        limit: Maximum number of matches to return
+        include_xml: Include each matched subtree serialized as XML
+        max_xml_chars: Serialized subtrees longer than this are truncated
+
+    Returns:
+        Tuple of (matches, truncated). Raises ValueError for invalid paths.
+    """
+    element_path, attribute = split_path(path)
+
+    # Wrapping the root lets "./config" and ".//x" match the root itself.
+    # Elements do not point to their parents, so sharing the cached root
+    # with a per-query wrapper is safe across threads
+    wrapper = ET.Element('document')
+    wrapper.append(parsed.root)
+
+    matches = []
+    truncated = False
+    try:
+        for elem in wrapper.iterfind(element_path, namespaces):
+            if elem is wrapper:
+                elem = parsed.root
+            if attribute is not None and attribute not in elem.attrib:
+                continue
+            if len(matches) >= limit:
+                truncated = True
+                break
+            matches.append(_describe_match(parsed, elem, attribute, include_xml, max_xml_chars))
+    except (SyntaxError, KeyError) as e:
+        raise ValueError(f"Invalid path '{path}': {e}")
+    except TypeError:
+        # ElementPath's tokenizer runs off the end of unterminated predicates
+        raise ValueError(f"Invalid path '{path}': incomplete expression")
+
+    return matches, truncated
+
+
+def _describe_match(parsed: ParsedXml, elem: ET.Element, attribute: Optional[str],
+                    include_xml: bool, max_xml_chars: int) -> Dict[str, Any]:
+    """Convert a matched element (or one of its attributes) into a result dictionary"""
+    node_path = parsed.element_path(elem)
+    if attribute is not None:
+        return {
+            "path": f"{node_path}/@{attribute}",
+            "type": "attribute",
+            "name": attribute,
+            "value": elem.attrib[attribute]
+        }
+
+    match = {
+        "path": node_path,
+        "type": "element",
+        "tag": elem.tag,
+        "attributes": dict(elem.attrib),
+        "text": (elem.text or '').strip() or None,
+        "children": len(elem)
+    }
+    if include_xml:
+        xml = ET.tostring(elem, encoding='unicode').strip()
+        match["xml"] = xml[:max_xml_chars]
+        match["xml_truncated"] = len(xml) > max_xml_chars
+    return match
@@ -0,0 +1,284 @@
+"""
+XML Configuration Search Index
+SQLite FTS5 sidecar index of configuration names, element paths, attributes and text
+"""
+
+import io
+import time
+import sqlite3
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def extract_xml_fields(xml_content: str) -> Tuple[str, str, str]:
+    """
+    Split an XML document into searchable element paths, attributes and text
+
+    Args:
+        xml_content: Raw XML content string
+
+    Returns:
+        Tuple of newline-separated (paths, attributes, text). Documents that
+        fail to parse are indexed as plain text.
+    """
+    paths: Dict[str, None] = {}
+    attributes: List[str] = []
+    texts: List[str] = []
+    stack: List[str] = []
+
+    try:
+        for event, elem in ET.iterparse(io.StringIO(xml_content), events=('start', 'end')):
+            if event == 'start':
+                # Drop "{namespace}" prefixes so paths read like the document
+                stack.append(elem.tag.rsplit('}', 1)[-1])
+                path = '/'.join(stack)
+                paths[path] = None
+                for key, value in elem.attrib.items():
+                    attributes.append(f"{path}@{key.rsplit('}', 1)[-1]}=\"{value}\"")
+            else:
+                text = (elem.text or '').strip()
+                if text:
+                    texts.append(f"{'/'.join(stack)}: {text}")
+                stack.pop()
+                elem.clear()
+    except ET.ParseError:
+        return '', '', xml_content
+
+    return '\n'.join(paths), '\n'.join(attributes), '\n'.join(texts)
+
+
+class XmlSearchIndex:
+    """
+    Full-text index of XML configurations kept in a local SQLite database
+
+    Documents are grouped by source (one per database/table) and stored with
+    the validator they were indexed at, so a sync only re-reads the
+    configurations whose validator changed. The FTS5 trigram tokenizer keeps
+    the substring semantics of the LIKE search it replaces.
+    """
+
+    # bm25 weights for the name, paths, attributes and text columns
+    COLUMN_WEIGHTS = (10.0, 3.0, 2.0, 1.0)
+
+    # Trigram queries need at least this many characters to use the index
+    MIN_INDEXED_TERM = 3
+
+    def __init__(self, path: str = 'xml_search_index.db', sync_interval: float = 300):
+        self.path = path
+        self.sync_interval = sync_interval
+
+        self._lock = threading.Lock()
+        self._sync_locks: Dict[str, threading.Lock] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Return True if this SQLite build has FTS5 with the trigram tokenizer"""
+        try:
+            conn = sqlite3.connect(':memory:')
+            conn.execute("CREATE VIRTUAL TABLE probe USING fts5(body, tokenize='trigram')")
+            conn.close()
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def _create_schema(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                name TEXT NOT NULL,
+                validator TEXT,
+                indexed_at REAL NOT NULL,
+                UNIQUE (source, name)
+            )
+            """)
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sources (
+                source TEXT PRIMARY KEY,
+                synced_at REAL NOT NULL
+            )
+            """)
+            self._conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS xml_fts USING fts5(
+                name, paths, attributes, text, tokenize='trigram'
+            )
+            """)
+
+    def last_synced(self, source: str) -> Optional[float]:
+        """Return the wall-clock time of the last completed sync of a source"""
+        with self._lock:
+            row = self._conn.execute("SELECT synced_at FROM sources WHERE source = ?", (source,)).fetchone()
+        return row[0] if row else None
+
+    def needs_sync(self, source: str) -> bool:
+        synced_at = self.last_synced(source)
+        return synced_at is None or time.time() - synced_at > self.sync_interval
+
+    def is_syncing(self, source: str) -> bool:
+        with self._lock:
+            sync_lock = self._sync_locks.get(source)
+        return bool(sync_lock and sync_lock.locked())
+
+    def sync(self, source: str, validators: Dict[str, str],
+             load: Callable[[List[str]], Iterable[Tuple[str, str]]]) -> Dict[str, int]:
+        """
+        Bring a source up to date with the given name -> validator map
+
+        Args:
+            source: Source identifier (database and table)
+            validators: Current validator of every configuration in the source
+            load: Callable taking a list of names and yielding (name, xml_content)
+                for the configurations that must be (re)indexed
+
+        Returns:
+            Dictionary with added, updated, removed and unchanged counts
+        """
+        with self._lock:
+            sync_lock = self._sync_locks.setdefault(source, threading.Lock())
+
+        # One sync per source at a time; concurrent searches wait for it
+        with sync_lock:
+            with self._lock:
+                indexed = dict(self._conn.execute(
+                    "SELECT name, validator FROM documents WHERE source = ?", (source,)
+                ).fetchall())
+
+            changed = [name for name, validator in validators.items() if indexed.get(name) != validator]
+            removed = [name for name in indexed if name not in validators]
+
+            for name, xml_content in load(changed) if changed else ():
+                paths, attributes, text = extract_xml_fields(xml_content or '')
+                with self._lock, self._conn:
+                    self._delete(source, name)
+                    cursor = self._conn.execute(
+                        "INSERT INTO documents (source, name, validator, indexed_at) VALUES (?, ?, ?, ?)",
+                        (source, name, validators.get(name), time.time())
+                    )
+                    self._conn.execute(
+                        "INSERT INTO xml_fts (rowid, name, paths, attributes, text) VALUES (?, ?, ?, ?, ?)",
+                        (cursor.lastrowid, name, paths, attributes, text)
+                    )
+
+            with self._lock, self._conn:
+                for name in removed:
+                    self._delete(source, name)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sources (source, synced_at) VALUES (?, ?)",
+                    (source, time.time())
+                )
+
+        result = {
+            "added": sum(1 for name in changed if name not in indexed),
+            "updated": sum(1 for name in changed if name in indexed),
+            "removed": len(removed),
+            "unchanged": len(validators) - len(changed)
+        }
+        logger.info(f"Synced XML search index for {source}: {result}")
+        return result
+
+    def _delete(self, source: str, name: str) -> None:
+        """Remove one document; caller must hold the lock inside a transaction"""
+        row = self._conn.execute(
+            "SELECT id FROM documents WHERE source = ? AND name = ?", (source, name)
+        ).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM xml_fts WHERE rowid = ?", (row[0],))
+            self._conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+
+    def search(self, source: str, term: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Find configurations whose name or content contains the term
+
+        Args:
+            source: Source identifier to search within
+            term: Case-insensitive substring to look for
+            limit: Maximum number of results
+
+        Returns:
+            List of result dictionaries with name, match_type, snippet and score,
+            best matches first
+        """
+        lowered = term.lower()
+        match_type = """
+            CASE
+                WHEN instr(lower(xml_fts.name), :lowered) THEN 'name'
+                WHEN instr(lower(xml_fts.paths), :lowered) THEN 'element'
+                WHEN instr(lower(xml_fts.attributes), :lowered) THEN 'attribute'
+                ELSE 'text'
+            END
+        """
+        params = {"source": source, "lowered": lowered, "limit": limit}
+
+        if len(term) >= self.MIN_INDEXED_TERM:
+            params["query"] = '"' + term.replace('"', '""') + '"'
+            query = f"""
+            SELECT documents.name, {match_type} AS match_type,
+                   snippet(xml_fts, -1, '', '', '...', 48) AS snippet,
+                   bm25(xml_fts, {', '.join(str(weight) for weight in self.COLUMN_WEIGHTS)}) AS score
+            FROM xml_fts
+            JOIN documents ON documents.id = xml_fts.rowid
+            WHERE xml_fts MATCH :query
+            AND documents.source = :source
+            ORDER BY score
+            LIMIT :limit
+            """
+        else:
+            # Too short for trigrams; scan the local index instead of the source
+            params["pattern"] = '%' + lowered.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            query = f"""
+            SELECT documents.name, {match_type} AS match_type,
+                   '' AS snippet, 0 AS score
+            FROM xml_fts
+            JOIN documents ON documents.id = xml_fts.rowid
+            WHERE documents.source = :source
+            AND (xml_fts.name LIKE :pattern ESCAPE '\\'
+                 OR xml_fts.paths LIKE :pattern ESCAPE '\\'
+                 OR xml_fts.attributes LIKE :pattern ESCAPE '\\'
+                 OR xml_fts.text LIKE :pattern ESCAPE '\\')
+            ORDER BY documents.name
+            LIMIT :limit
+            """
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        return [
+            {
+                "name": name,
+                "match_type": row_match_type,
+                "snippet": snippet.strip() if snippet else "",
+                "score": round(-score, 3)
+            }
+            for name, row_match_type, snippet, score in rows
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sources = self._conn.execute("""
+            SELECT sources.source, sources.synced_at, COUNT(documents.id)
+            FROM sources
+            LEFT JOIN documents ON documents.source = sources.source
+            GROUP BY sources.source
+            """).fetchall()
+        return {
+            "path": self.path,
+            "sync_interval": self.sync_interval,
+            "sources": [
+                {"source": source, "synced_at": synced_at, "documents": count}
+                for source, synced_at, count in sources
+            ]
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()